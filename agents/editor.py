@@ -17,6 +17,8 @@ ROLE:
 
 YOUR TASK:
   There is exactly ONE bug in the editor_node function below.
+  (aeditor_node, its async twin at the bottom, repeats the same
+  line — fix it there too.)
   The agent has access to all the data it needs, but it is
   not making full use of it when building the prompt.
 
@@ -25,11 +27,11 @@ YOUR TASK:
         Is anything being left out?
 """
 
-from config.settings import llm, DigestState
+from config.settings import llm, DigestState, announce
 
 
 def editor_node(state: DigestState) -> dict:
-    print("\n✍️  [EDITOR] Writing headline...")
+    announce("\n✍️  [EDITOR] Writing headline...")
 
     summary = state["summary"]
     tags = state["tags"]   # fetched but... is it used?
@@ -42,3 +44,20 @@ def editor_node(state: DigestState) -> dict:
     response = llm.invoke(prompt)
 
     return {"headline": response.content}
+
+
+async def aeditor_node(state: DigestState) -> dict:
+    """Async twin of editor_node — same prompt, awaits llm.ainvoke()."""
+    announce("\n✍️  [EDITOR] Writing headline...")
+
+    summary = state["summary"]
+    tags = state["tags"]
+
+    # 🐛 SAME BUG AS ABOVE — fix it in both places
+    prompt = (
+        f"Write ONE punchy headline (max 12 words). "
+        f"Use this summary: {summary}"
+    )
+    response = await llm.ainvoke(prompt)
+
+    return {"headline": response.content}
@@ -13,6 +13,8 @@ ROLE:
 
 YOUR TASK:
   There is exactly ONE bug in the fetcher_node function below.
+  (afetcher_node, its async twin at the bottom, repeats the same
+  line — fix it there too.)
   The function runs without crashing, but its output is wrong.
 
   Clue: Run the full pipeline and look closely at what
@@ -21,14 +23,25 @@ YOUR TASK:
         or does it look like something else entirely?
 """
 
-from config.settings import llm, DigestState
+from config.settings import llm, DigestState, announce
 
 
 def fetcher_node(state: DigestState) -> dict:
-    print("\n📡 [FETCHER] Summarizing topic...")
+    announce("\n📡 [FETCHER] Summarizing topic...")
 
     prompt = f"Write a 2-3 sentence news summary about: {state['topic']}"
     response = llm.invoke(prompt)
 
     # 🐛 BUG IS HERE — something is wrong with what this returns
     return {"summary": state["topic"]}
+
+
+async def afetcher_node(state: DigestState) -> dict:
+    """Async twin of fetcher_node — same prompt, awaits llm.ainvoke()."""
+    announce("\n📡 [FETCHER] Summarizing topic...")
+
+    prompt = f"Write a 2-3 sentence news summary about: {state['topic']}"
+    response = await llm.ainvoke(prompt)
+
+    # 🐛 SAME BUG AS ABOVE — fix it in both places
+    return {"summary": state["topic"]}
@@ -0,0 +1,72 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  agents/fused.py  —  FAST MODE: The Fused Digester          ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Does the work of all three agents in ONE LLM call. A single
+  structured prompt asks for the summary, the tags and the headline
+  together as JSON, and the answer is unpacked back into the same
+  DigestState fields the three-agent chain would fill.
+
+  Input  → state["topic"]
+  Output → state["summary"], state["tags"], state["headline"]
+
+  One round-trip instead of three, at the price of a longer
+  prompt and a single model having to juggle all three tasks.
+  Pick it with:  python main.py --mode fused
+"""
+
+import json
+import re
+
+from config.settings import llm, DigestState, announce
+
+FUSED_PROMPT = (
+    "You are a news desk. For the topic below, reply with ONLY a JSON object "
+    "with exactly these string fields:\n"
+    '  "summary":  a 2-3 sentence news summary,\n'
+    '  "tags":     "Keywords: <kw1>, <kw2>, <kw3>. Category: <category>" where '
+    "category is one of Technology/Politics/Science/Business/Entertainment,\n"
+    '  "headline": ONE punchy headline (max 12 words) built from the summary and tags.\n'
+    "Topic: {topic}"
+)
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_fused_response(text: str) -> dict:
+    """Unpack the model's JSON answer into summary / tags / headline.
+
+    Tolerates markdown code fences and chatter around the object. If no
+    JSON can be found, the whole answer becomes the summary so the run
+    still produces something useful.
+    """
+    cleaned = _FENCE.sub("", text.strip())
+    match = _OBJECT.search(cleaned)
+    try:
+        data = json.loads(match.group(0) if match else cleaned)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return {"summary": text.strip(), "tags": "", "headline": ""}
+
+    return {field: str(data.get(field, "")).strip() for field in ("summary", "tags", "headline")}
+
+
+def fused_node(state: DigestState) -> dict:
+    announce("\n⚡ [FUSED] Summarizing, tagging and writing the headline...")
+
+    response = llm.invoke(FUSED_PROMPT.format(topic=state["topic"]))
+
+    return parse_fused_response(response.content)
+
+
+async def afused_node(state: DigestState) -> dict:
+    """Async twin of fused_node — same prompt, awaits llm.ainvoke()."""
+    announce("\n⚡ [FUSED] Summarizing, tagging and writing the headline...")
+
+    response = await llm.ainvoke(FUSED_PROMPT.format(topic=state["topic"]))
+
+    return parse_fused_response(response.content)
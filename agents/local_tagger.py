@@ -0,0 +1,254 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  agents/local_tagger.py  —  AGENT 2, Local Engine           ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Same job as agents/tagger.py — 3 keywords + 1 category from the
+  Fetcher's summary — but computed on the spot, with no Gemini
+  round-trip:
+
+    keywords → RAKE-style: the text is cut into candidate phrases at
+               stopwords and punctuation, each word scores
+               degree / frequency, and words that are common in news
+               copy anyway (COMMON_WORDS) are damped, IDF-style
+    category → a prebuilt term index (CATEGORY_TERMS): every category
+               sums the weights of its terms found in the text
+
+  When the classifier is not sure — too little evidence, or two
+  categories too close to call — the node falls back to the regular
+  LLM tagger, so quality never drops below the LLM path.
+
+  Input  → state["summary"]
+  Output → state["tags"], e.g.
+           "Keywords: deep-sea creature, volcanic vents, scientists. Category: Science"
+
+HOW TO USE:
+  python main.py --tagger local
+  build_graph(tagger="local")
+"""
+
+import re
+
+from agents.tagger import atagger_node, tagger_node
+from config.settings import DigestState, announce
+
+CATEGORIES = ("Technology", "Politics", "Science", "Business", "Entertainment")
+
+# Below this much evidence, or this relative lead over the runner-up,
+# the category is left to the LLM.
+MIN_CATEGORY_SCORE = 2.0
+MIN_CATEGORY_MARGIN = 0.25
+KEYWORD_COUNT = 3
+MAX_PHRASE_WORDS = 2
+
+# ─── PRECOMPUTED VOCABULARY ───────────────────────────────────────────────────
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers herself him himself his how
+i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves new says said say according amid among per
+via its it's may might must shall upon within without yet near across around
+""".split())
+
+# Words that show up in most news copy: they end a phrase and only win
+# as keywords when nothing better is around (weight = COMMON_WEIGHT).
+COMMON_WORDS = frozenset("""
+year years time times day days week weeks month months today yesterday first last
+next many much several one two three four five people report reports reported news
+world country countries government company companies group number part way state
+states city officials official week's percent million billion thousands hundreds
+announced announce announces make makes made take takes took use used using set sets
+living sending beating urged passed rose fell discovered reported found
+major big large small high low long latest recent recently early late plan plans
+""".split())
+COMMON_WEIGHT = 0.3
+
+# Term → weight per category. Terms are matched after _stem(), so list
+# them in their base form.
+CATEGORY_TERMS = {
+    "Technology": {
+        "ai": 2, "artificial": 1, "intelligence": 1, "software": 2, "app": 2, "smartphone": 2,
+        "chip": 2, "semiconductor": 2, "computer": 2, "internet": 2, "online": 1, "cyber": 2,
+        "cyberattack": 2, "hacker": 2, "data": 1, "cloud": 2, "algorithm": 2, "robot": 2,
+        "robotics": 2, "startup": 1, "tech": 2, "technology": 2, "digital": 1, "device": 1,
+        "google": 2, "apple": 1, "microsoft": 2, "openai": 2, "meta": 1, "nvidia": 2,
+        "processor": 2, "network": 1, "5g": 2, "quantum": 1, "model": 1, "platform": 1,
+        "encryption": 2, "browser": 2, "gadget": 2, "satellite": 1, "electric": 1, "battery": 1,
+    },
+    "Politics": {
+        "election": 2, "vote": 2, "voter": 2, "parliament": 2, "congress": 2, "senate": 2,
+        "president": 2, "minister": 2, "prime": 1, "government": 1, "policy": 1, "law": 1,
+        "bill": 1, "legislation": 2, "campaign": 1, "party": 1, "democrat": 2, "republican": 2,
+        "opposition": 2, "coalition": 2, "diplomat": 2, "diplomacy": 2, "treaty": 2,
+        "sanction": 2, "protest": 1, "referendum": 2, "governor": 2, "mayor": 2, "council": 1,
+        "court": 1, "supreme": 1, "constitution": 2, "lawmaker": 2, "cabinet": 2, "ballot": 2,
+        "war": 1, "ceasefire": 2, "military": 1, "nato": 2, "summit": 1, "candidate": 2,
+    },
+    "Science": {
+        "scientist": 2, "research": 1, "researcher": 2, "study": 1, "discovery": 1, "species": 2,
+        "climate": 2, "space": 1, "nasa": 2, "planet": 2, "galaxy": 2, "telescope": 2,
+        "astronomer": 2, "physics": 2, "physicist": 2, "biology": 2, "chemistry": 2,
+        "gene": 2, "genetic": 2, "dna": 2, "vaccine": 2, "virus": 1, "disease": 1, "cell": 1,
+        "fossil": 2, "dinosaur": 2, "ocean": 1, "deep-sea": 2, "volcanic": 1, "earthquake": 1,
+        "experiment": 2, "laboratory": 2, "lab": 1, "mars": 2, "moon": 1, "asteroid": 2,
+        "particle": 2, "evolution": 2, "ecosystem": 2, "creature": 1, "medical": 1, "health": 1,
+    },
+    "Business": {
+        "market": 2, "stock": 2, "share": 1, "investor": 2, "earning": 2, "revenue": 2,
+        "profit": 2, "loss": 1, "economy": 2, "economic": 2, "inflation": 2, "interest": 1,
+        "rate": 1, "bank": 2, "central": 1, "trade": 2, "tariff": 2, "merger": 2,
+        "acquisition": 2, "deal": 1, "ceo": 2, "company": 1, "firm": 1, "industry": 1,
+        "sales": 2, "retail": 2, "price": 1, "oil": 1, "dollar": 1, "gdp": 2, "recession": 2,
+        "quarter": 2, "ipo": 2, "valuation": 2, "layoff": 2, "job": 1, "unemployment": 2,
+        "supply": 1, "consumer": 1, "export": 2, "funding": 1, "billion": 1,
+    },
+    "Entertainment": {
+        "film": 2, "movie": 2, "music": 2, "album": 2, "song": 2, "singer": 2, "concert": 2,
+        "tour": 1, "actor": 2, "actress": 2, "celebrity": 2, "hollywood": 2, "oscar": 2,
+        "grammy": 2, "award": 1, "festival": 2, "television": 2, "tv": 2, "series": 1,
+        "show": 1, "streaming": 1, "netflix": 2, "box": 1, "office": 1, "premiere": 2,
+        "director": 1, "star": 1, "fan": 1, "game": 1, "gaming": 2, "video": 1, "band": 2,
+        "theater": 2, "theatre": 2, "comedy": 2, "drama": 1, "sequel": 2, "franchise": 1,
+        "sport": 1, "football": 1, "league": 1, "champion": 1,
+    },
+}
+
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9'\-]*")
+_BREAK = re.compile(r"[.,;:!?()\[\]\"“”…—–]")
+
+
+def _stem(word: str) -> str:
+    """Crude plural/possessive folding so "investors'" matches "investor"."""
+    word = word.lower().strip("'-")
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+# ─── KEYWORDS ─────────────────────────────────────────────────────────────────
+
+def _candidate_phrases(text: str) -> list[list[str]]:
+    """Runs of content words between stopwords and punctuation."""
+    phrases = []
+    for chunk in _BREAK.split(text):
+        current = []
+        for token in _TOKEN.findall(chunk):
+            word = token.lower().strip("'-")
+            if word in STOPWORDS or word.isdigit() or len(word) < 2:
+                if current:
+                    phrases.append(current)
+                current = []
+            elif word in COMMON_WORDS:
+                # Generic words stand alone so they don't pad real phrases.
+                if current:
+                    phrases.append(current)
+                phrases.append([word])
+                current = []
+            else:
+                current.append(word)
+        if current:
+            phrases.append(current)
+    # Long runs are split so a keyword stays a short phrase.
+    return [p[i:i + MAX_PHRASE_WORDS] for p in phrases for i in range(0, len(p), MAX_PHRASE_WORDS)]
+
+
+def extract_keywords(text: str, count: int = KEYWORD_COUNT) -> list[str]:
+    """The ``count`` best RAKE phrases of ``text``, best first."""
+    phrases = _candidate_phrases(text)
+    frequency, degree = {}, {}
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] = frequency.get(word, 0) + 1
+            degree[word] = degree.get(word, 0) + len(phrase)
+
+    def word_score(word: str) -> float:
+        weight = COMMON_WEIGHT if word in COMMON_WORDS else 1.0
+        return degree[word] / frequency[word] * weight
+
+    scored = {}
+    for position, phrase in enumerate(phrases):
+        key = " ".join(phrase)
+        if key not in scored:
+            # Ties go to the phrase that appears first.
+            scored[key] = (sum(word_score(w) for w in phrase), -position)
+
+    keywords, seen = [], set()
+    for phrase, _ in sorted(scored.items(), key=lambda item: item[1], reverse=True):
+        stems = {_stem(w) for w in phrase.split()}
+        if stems & seen:
+            continue
+        keywords.append(phrase)
+        seen |= stems
+        if len(keywords) == count:
+            break
+    return keywords
+
+
+# ─── CATEGORY ─────────────────────────────────────────────────────────────────
+
+def _build_index() -> dict:
+    index = {}
+    for category, terms in CATEGORY_TERMS.items():
+        for term, weight in terms.items():
+            index.setdefault(_stem(term), {})[category] = weight
+    return index
+
+
+# stem → {category: weight}, built once at import.
+TERM_INDEX = _build_index()
+
+
+def classify(text: str) -> tuple[str, float, dict]:
+    """(best category, confidence 0-1, score per category).
+
+    Confidence is the winner's relative lead over the runner-up, and
+    0.0 when the winner has less than MIN_CATEGORY_SCORE of evidence.
+    """
+    scores = dict.fromkeys(CATEGORIES, 0.0)
+    for token in _TOKEN.findall(text):
+        for category, weight in TERM_INDEX.get(_stem(token), {}).items():
+            scores[category] += weight
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, top), (_, runner_up) = ranked[0], ranked[1]
+    if top < MIN_CATEGORY_SCORE:
+        return best, 0.0, scores
+    return best, (top - runner_up) / top, scores
+
+
+def local_tags(text: str):
+    """The tags string for ``text``, or None when the LLM should decide."""
+    keywords = extract_keywords(text)
+    category, confidence, _ = classify(text)
+    if len(keywords) < KEYWORD_COUNT or confidence < MIN_CATEGORY_MARGIN:
+        return None
+    return f"Keywords: {', '.join(keywords)}. Category: {category}"
+
+
+# ─── THE NODES ────────────────────────────────────────────────────────────────
+
+def local_tagger_node(state: DigestState) -> dict:
+    tags = local_tags(state["summary"])
+    if tags is None:
+        announce("\n🏷️  [TAGGER] Low confidence locally — falling back to the LLM")
+        return tagger_node(state)
+    announce("\n🏷️  [TAGGER] Extracting tags locally...")
+    return {"tags": tags}
+
+
+async def alocal_tagger_node(state: DigestState) -> dict:
+    """Async twin of local_tagger_node — only the LLM fallback awaits."""
+    tags = local_tags(state["summary"])
+    if tags is None:
+        announce("\n🏷️  [TAGGER] Low confidence locally — falling back to the LLM")
+        return await atagger_node(state)
+    announce("\n🏷️  [TAGGER] Extracting tags locally...")
+    return {"tags": tags}
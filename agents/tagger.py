@@ -15,6 +15,8 @@ ROLE:
 
 YOUR TASK:
   There is exactly ONE bug in the tagger_node function below.
+  (atagger_node, its async twin at the bottom, repeats the same
+  line — fix it there too.)
   The function runs and produces output, but it is tagging
   the WRONG piece of data.
 
@@ -23,11 +25,11 @@ YOUR TASK:
         actually reading from state. Are they the same key?
 """
 
-from config.settings import llm, DigestState
+from config.settings import llm, DigestState, announce
 
 
 def tagger_node(state: DigestState) -> dict:
-    print("\n🏷️  [TAGGER] Extracting tags...")
+    announce("\n🏷️  [TAGGER] Extracting tags...")
 
     # 🐛 BUG IS HERE — this prompt is reading from the wrong state key
     prompt = (
@@ -38,3 +40,18 @@ def tagger_node(state: DigestState) -> dict:
     response = llm.invoke(prompt)
 
     return {"tags": response.content}
+
+
+async def atagger_node(state: DigestState) -> dict:
+    """Async twin of tagger_node — same prompt, awaits llm.ainvoke()."""
+    announce("\n🏷️  [TAGGER] Extracting tags...")
+
+    # 🐛 SAME BUG AS ABOVE — fix it in both places
+    prompt = (
+        f"From this text, extract 3 keywords and assign one category "
+        f"(Technology/Politics/Science/Business/Entertainment). "
+        f"Text: {state['topic']}"
+    )
+    response = await llm.ainvoke(prompt)
+
+    return {"tags": response.content}
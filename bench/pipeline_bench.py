@@ -0,0 +1,170 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  bench/pipeline_bench.py  —  Offline Throughput Benchmark   ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Measures the pipeline's orchestration cost without Gemini: the
+  REAL graph from main.py runs against clients/fake.py's seeded
+  FakeChatModel, over a grid of concurrency levels × topic counts.
+
+  For each cell it reports:
+    runs/s          → completed digests per wall-clock second
+    p50/p95/p99     → per-run latency
+    overhead p50    → run latency minus time spent inside the LLM
+                      (LangGraph + our own code — the part that
+                      regressions show up in)
+    errors          → runs that failed (see --error-rate)
+    maxrss MB       → peak resident memory of the process so far
+    traced peak MB  → peak Python allocation in the cell
+                      (only with --trace-memory; it slows runs down)
+
+HOW TO RUN:
+  python -m bench.pipeline_bench
+  python -m bench.pipeline_bench --concurrency 1,8,64 --topics 100,1000 \\
+      --latency-ms 80 --latency-dist lognormal --error-rate 0.01 --async
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import config.settings as settings
+from clients.fake import LATENCY_DISTRIBUTIONS, FakeChatModel
+from pipeline.aio import arun_batch
+from pipeline.batch import run_batch
+from pipeline.metrics import MetricsRecorder, percentile
+
+
+@contextmanager
+def use_llm(model):
+    """Point every agent at ``model`` for the duration of the block."""
+    previous = settings.set_llm(model)
+    try:
+        yield model
+    finally:
+        settings.set_llm(previous)
+
+
+def synthetic_topics(count: int) -> list[str]:
+    return [f"Synthetic news topic #{i}: developments in sector {i % 17}" for i in range(count)]
+
+
+def _maxrss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_cell(graph, topics: list[str], concurrency: int, use_async: bool = False,
+               trace_memory: bool = False, fake: FakeChatModel = None) -> dict:
+    """Run one batch and summarize it.
+
+    ``fake`` has its call counts reset first, so every cell gets the
+    same draws for the same topics.
+    """
+    if fake is not None:
+        fake.reset_calls()
+    with MetricsRecorder(trace_memory=trace_memory, keep_records=True,
+                         concurrency=concurrency) as metrics:
+        if trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        if use_async:
+            asyncio.run(arun_batch(graph, topics, max_concurrency=concurrency, metrics=metrics))
+        else:
+            run_batch(graph, topics, max_concurrency=concurrency, metrics=metrics)
+        elapsed = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else None
+        records = metrics.records
+
+    latencies = [r["latency_s"] for r in records]
+    overheads = [max(0.0, r["latency_s"] - r["llm_seconds"]) for r in records]
+    return {
+        "topics": len(topics),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "runs_per_s": len(records) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "overhead_p50": percentile(overheads, 50),
+        "errors": sum(1 for r in records if not r["ok"]),
+        "maxrss_mb": _maxrss_mb(),
+        "traced_peak_mb": traced_peak,
+    }
+
+
+def run_bench(concurrencies, topic_counts, fake: FakeChatModel, mode: str = "chain",
+              use_async: bool = False, trace_memory: bool = False) -> list[dict]:
+    """Every (topic count, concurrency) cell against the same fake model."""
+    from main import build_graph
+
+    graph = build_graph(mode)
+    rows = []
+    verbose, settings.VERBOSE = settings.VERBOSE, False
+    try:
+        with use_llm(fake):
+            for count in topic_counts:
+                topics = synthetic_topics(count)
+                for concurrency in concurrencies:
+                    rows.append(bench_cell(graph, topics, concurrency, use_async,
+                                           trace_memory, fake=fake))
+    finally:
+        settings.VERBOSE = verbose
+    return rows
+
+
+def format_table(rows: list[dict]) -> str:
+    header = (f"{'topics':>7} {'conc':>5} {'runs/s':>9} {'p50 s':>8} {'p95 s':>8} "
+              f"{'p99 s':>8} {'ovh p50 ms':>11} {'errors':>7} {'maxrss MB':>10} {'traced MB':>10}")
+    lines = [header, "─" * len(header)]
+    for r in rows:
+        traced = f"{r['traced_peak_mb']:>10.1f}" if r["traced_peak_mb"] is not None else f"{'-':>10}"
+        lines.append(
+            f"{r['topics']:>7} {r['concurrency']:>5} {r['runs_per_s']:>9.1f} {r['p50']:>8.3f} "
+            f"{r['p95']:>8.3f} {r['p99']:>8.3f} {r['overhead_p50'] * 1000:>11.2f} "
+            f"{r['errors']:>7} {r['maxrss_mb']:>10.1f} {traced}"
+        )
+    return "\n".join(lines)
+
+
+def _int_list(text: str) -> list[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the digest graph against a fake LLM.")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32],
+                        help="comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--topics", type=_int_list, default=[64],
+                        help="comma-separated topic counts (default: 64)")
+    parser.add_argument("--mode", choices=("chain", "fused"), default="chain")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="use the asyncio runner instead of threads")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="uniform: ± fraction of latency; lognormal: sigma (default: 0.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-words", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the tracemalloc peak per cell (slower)")
+    args = parser.parse_args(argv)
+
+    fake = FakeChatModel(
+        latency_ms=args.latency_ms, latency_dist=args.latency_dist, jitter=args.jitter,
+        error_rate=args.error_rate, response_words=args.response_words, seed=args.seed,
+    )
+    print(f"🏁 {args.mode} graph · {'asyncio' if args.use_async else 'threads'} · "
+          f"fake LLM {args.latency_dist} {args.latency_ms:.0f}ms, "
+          f"{args.error_rate:.1%} errors, {args.response_words} words")
+    rows = run_bench(args.concurrency, args.topics, fake, args.mode, args.use_async, args.trace_memory)
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
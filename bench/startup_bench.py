@@ -0,0 +1,105 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  bench/startup_bench.py  —  Import & Startup Benchmark      ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Keeps startup honest. For each target it starts a FRESH
+  interpreter several times and reports the median of:
+
+    import targets  → cumulative import time from `python -X importtime`
+    commands        → wall-clock time of the whole process
+                      (e.g. `main.py --help`, collecting the tests)
+
+  With --top N it also lists the N slowest modules behind the first
+  import target, which is where to look when a number regresses.
+
+HOW TO RUN:
+  python -m bench.startup_bench
+  python -m bench.startup_bench --repeat 9 --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TARGETS = ("config.settings", "agents.fetcher", "pipeline.batch", "main")
+COMMANDS = {
+    "main.py --help": [sys.executable, "main.py", "--help"],
+    "pytest --collect-only tests/test_fetcher.py": [
+        sys.executable, "-m", "pytest", "--collect-only", "-q", "tests/test_fetcher.py"],
+    # langsmith ships a pytest plugin that pytest auto-loads and that costs
+    # over a second on its own; this row shows what is left without it.
+    "  … with -p no:langsmith_plugin": [
+        sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:langsmith_plugin",
+        "tests/test_fetcher.py"],
+}
+
+# "import time:       self [us] |  cumulative | package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def importtime(module: str) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import behind ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def import_ms(module: str) -> float:
+    """Cumulative import time of ``module`` itself, in ms."""
+    for name, _, cumulative in reversed(importtime(module)):
+        if name == module:
+            return cumulative / 1000
+    return 0.0
+
+
+def command_ms(argv: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(argv, cwd=ROOT, capture_output=True, check=False)
+    return (time.perf_counter() - started) * 1000
+
+
+def run(repeat: int = 5) -> list[tuple[str, float]]:
+    """Median ms for every import target and command."""
+    rows = []
+    for module in IMPORT_TARGETS:
+        rows.append((f"import {module}", statistics.median(import_ms(module) for _ in range(repeat))))
+    for label, argv in COMMANDS.items():
+        rows.append((label, statistics.median(command_ms(argv) for _ in range(repeat))))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import and startup time.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target (default: 5)")
+    parser.add_argument("--top", type=int, default=0, metavar="N",
+                        help=f"also list the N slowest modules behind `import {IMPORT_TARGETS[-1]}`")
+    args = parser.parse_args(argv)
+
+    print(f"⏱️  median of {args.repeat} fresh interpreters")
+    for label, ms in run(args.repeat):
+        print(f"  {label:<48} {ms:>9.1f} ms")
+
+    if args.top:
+        print(f"\n🐢 slowest imports (self time) behind `import {IMPORT_TARGETS[-1]}`")
+        rows = sorted(importtime(IMPORT_TARGETS[-1]), key=lambda r: r[1], reverse=True)
+        for name, self_us, cumulative_us in rows[: args.top]:
+            print(f"  {name:<48} {self_us / 1000:>9.1f} ms self  {cumulative_us / 1000:>9.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
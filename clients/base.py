@@ -0,0 +1,45 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/base.py  —  Base Class for LLM Layers              ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  A layer sits between the agents and the chat model and changes how
+  calls are made (pacing, retries, …) without the agents noticing.
+  Layers are installed with config.settings.add_llm_layer().
+
+  LLMWrapper forwards every call and attribute to the wrapped client;
+  a layer overrides only the methods it cares about (usually invoke
+  and ainvoke).
+"""
+
+
+class LLMWrapper:
+    """Forward everything to ``inner``; subclasses override what they change."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.inner.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.inner.ainvoke(input, config, **kwargs)
+
+    def batch(self, inputs, config=None, **kwargs):
+        return self.inner.batch(inputs, config, **kwargs)
+
+    async def abatch(self, inputs, config=None, **kwargs):
+        return await self.inner.abatch(inputs, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        return self.inner.stream(input, config, **kwargs)
+
+    def astream(self, input, config=None, **kwargs):
+        return self.inner.astream(input, config, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.inner!r})"
@@ -0,0 +1,292 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/cache.py  —  Persistent LLM Response Cache         ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Remembers every LLM answer so an identical prompt never pays
+  for a second Gemini round-trip.
+
+  It plugs into LangChain's global cache hook, so ALL three agents
+  share it without touching their code: the chat model looks the
+  prompt up here before going to the network, and a hit returns
+  straight away.
+
+  Key   → model name + temperature (+ stop words) + the exact prompt
+  Tiers → 1. in-memory LRU  (microseconds, per process)
+          2. SQLite on disk (survives restarts, shared by processes)
+
+  Entries expire after ``ttl`` seconds and each tier is capped at a
+  maximum number of entries (least recently used go first).
+
+USAGE (opt-in):
+  from clients.cache import enable_llm_cache
+
+  cache = enable_llm_cache(".cache/llm.sqlite", ttl=6 * 3600)
+  ...
+  print(cache.stats())   # {'memory_hits': ..., 'disk_hits': ..., 'misses': ...}
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from config.settings import LLM_CACHE_PATH as DEFAULT_CACHE_PATH
+DEFAULT_MEMORY_ENTRIES = 1_024
+DEFAULT_DISK_ENTRIES = 100_000
+DEFAULT_TTL = 24 * 3600      # seconds; None = never expire
+
+# A request timeout in LangChain's call params: "('timeout', 1.25)" and its separator.
+_TIMEOUT_PARAM = re.compile(r"(, )?\('timeout', [^()]*\)(?(1)|(, )?)")
+
+
+# ─── KEYING ──────────────────────────────────────────────────────────────────
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Hash of model name, temperature, stop words and the exact prompt.
+
+    ``llm_string`` is LangChain's serialized model config. Only the
+    fields that change the answer are kept, so e.g. bumping
+    max_retries does not throw the whole cache away — and a per-call
+    request timeout (see pipeline/deadline.py) is not part of the key.
+    """
+    llm_string = _TIMEOUT_PARAM.sub("", llm_string)
+    config, _, call_params = llm_string.partition("---")
+    try:
+        kwargs = json.loads(config).get("kwargs", {})
+        model = kwargs.get("model") or kwargs.get("model_name")
+        identity = json.dumps([model, kwargs.get("temperature"), call_params])
+    except (ValueError, AttributeError):
+        identity = llm_string
+    return hashlib.sha256(f"{identity}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _encode(generations) -> str:
+    payload = []
+    for gen in generations:
+        if isinstance(gen, ChatGeneration):
+            payload.append({"message": message_to_dict(gen.message)})
+        else:
+            payload.append({"text": gen.text})
+    return json.dumps(payload)
+
+
+def _decode(blob: str) -> list:
+    generations = []
+    for item in json.loads(blob):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message))
+        else:
+            generations.append(Generation(text=item["text"]))
+    return generations
+
+
+# ─── THE CACHE ───────────────────────────────────────────────────────────────
+class TieredLLMCache(BaseCache):
+    """In-memory LRU in front of an SQLite table, with TTL and size caps."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_entries: int = DEFAULT_DISK_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key → (stored_at, generations)
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                        "writes": 0, "evictions": 0, "expired": 0}
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_used ON llm_cache(used_at)")
+            self._disk_size = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    # ── BaseCache API ────────────────────────────────────────────────────────
+    def lookup(self, prompt: str, llm_string: str):
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            expired = False
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._counts["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                expired = True
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, stored_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if self._is_fresh(row[1], now):
+                        generations = _decode(row[0])
+                        self._db.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+                        self._remember(key, row[1], generations)
+                        self._counts["disk_hits"] += 1
+                        return generations
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._disk_size -= 1
+                    expired = True
+
+            self._counts["expired" if expired else "misses"] += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, now, list(return_val))
+            self._counts["writes"] += 1
+            if self._db is None:
+                return
+
+            existed = self._db.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, _encode(return_val), now, now),
+            )
+            if not existed:
+                self._disk_size += 1
+            if self._disk_size > self.disk_entries:
+                self._evict_disk()
+
+    def contains(self, prompt: str, llm_string: str) -> bool:
+        """Whether lookup() would hit — without counting it or touching the LRU."""
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._is_fresh(entry[0], now):
+                return True
+            if self._db is None:
+                return False
+            row = self._db.execute(
+                "SELECT stored_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            return row is not None and self._is_fresh(row[0], now)
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._disk_size = 0
+
+    # ── Helpers ──────────────────────────────────────────────────────────────
+    def _is_fresh(self, stored_at: float, now: float) -> bool:
+        return self.ttl is None or now - stored_at < self.ttl
+
+    def _remember(self, key: str, stored_at: float, generations) -> None:
+        self._memory[key] = (stored_at, generations)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def _evict_disk(self) -> None:
+        # Trim to 90% in one statement so we don't evict on every write.
+        target = int(self.disk_entries * 0.9)
+        excess = self._disk_size - target
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN "
+            "(SELECT key FROM llm_cache ORDER BY used_at LIMIT ?)",
+            (excess,),
+        )
+        self._disk_size = target
+        self._counts["evictions"] += excess
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus the current size of each tier."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["memory_size"] = len(self._memory)
+            counts["disk_size"] = self._disk_size if self._db is not None else 0
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"] + counts["expired"]
+        counts["hit_rate"] = (counts["memory_hits"] + counts["disk_hits"]) / lookups if lookups else 0.0
+        return counts
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def is_cached(client, input, **kwargs) -> bool:
+    """Whether ``client.invoke(input, **kwargs)`` would be answered from a cache.
+
+    Follows BaseChatModel's own lookup (same prompt, same llm_string)
+    on the chat model under any layers, so a layer like the rate
+    limiter can let cache hits through without booking quota. A
+    TieredLLMCache is asked with contains(), so its stats only count
+    the real lookup.
+    """
+    from clients.base import LLMWrapper
+
+    while isinstance(client, LLMWrapper):
+        # A LatencyRouter may answer from either model.
+        fallback = vars(client).get("fallback")
+        if fallback is not None and not is_cached(fallback, input, **kwargs):
+            return False
+        client = client.inner
+    if not isinstance(client, BaseChatModel) or client.cache is False:
+        return False
+    cache = client.cache if isinstance(client.cache, BaseCache) else get_llm_cache()
+    if cache is None:
+        return False
+    kwargs = dict(kwargs)
+    stop = kwargs.pop("stop", None)
+    try:
+        messages = client._convert_input(input).to_messages()
+    except ValueError:
+        return False
+    messages = [m.model_copy(update={"id": None}) if getattr(m, "id", None) is not None else m
+                for m in messages]
+    prompt, llm_string = dumps(messages), client._get_llm_string(stop=stop, **kwargs)
+    if isinstance(cache, TieredLLMCache):
+        return cache.contains(prompt, llm_string)
+    return isinstance(cache.lookup(prompt, llm_string), list)
+
+
+def enable_llm_cache(path: str = DEFAULT_CACHE_PATH, **options) -> TieredLLMCache:
+    """Turn the cache on for every LangChain chat model in this process."""
+    cache = TieredLLMCache(path, **options)
+    set_llm_cache(cache)
+    return cache
+
+
+def disable_llm_cache() -> None:
+    set_llm_cache(None)
@@ -0,0 +1,332 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/cassette.py  —  Record / Replay LLM Cassettes      ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Replays a realistic end-to-end run without the network. Useful for
+  full-pipeline tests and profiling runs that must be fast, offline
+  and the same every time.
+
+    record → a layer next to the real client writes down every
+             prompt/answer pair: the answer's text, its token usage,
+             which node asked and how long Gemini took
+    replay → CassetteChatModel answers from the cassette instead of
+             Gemini. It is a real LangChain chat model, so callbacks,
+             usage counts and metrics behave exactly as they did live.
+             By default it answers at once; latency_scale=1.0 sleeps
+             for the recorded latency (0.5 → half of it, …)
+
+  Index → sha256 of the prompt's messages (role + content). The same
+          prompt gets the same answer whatever model or node served
+          it; when a prompt was recorded twice, the first answer wins.
+  File  → gzip-compressed JSON lines, one per answer, written when
+          recording stops. Until then every answer is also appended
+          to a plain "<cassette>.journal" file the moment it arrives,
+          so a crash or Ctrl-C loses nothing: the next load reads the
+          journal too, and the next save folds it in. Recording into
+          an existing cassette adds to it.
+
+  A prompt missing from the cassette raises CassetteMiss, so a test
+  fails loudly instead of quietly reaching for the network.
+
+HOW TO USE:
+  python main.py --topics topics.txt --record runs.cassette      ← live, once
+  python main.py --topics topics.txt --replay runs.cassette      ← offline, instant
+  python main.py --topics topics.txt --replay runs.cassette --replay-latency
+
+  or from code:
+    from clients.cassette import enable_recording, disable_recording, replay_cassette
+    cassette = enable_recording("runs.cassette")
+    ...
+    disable_recording(cassette)      # stops and saves
+
+    replay_cassette("runs.cassette", latency_scale=1.0)
+
+NOTE:
+  Add the recording layer BEFORE every other layer (main.py does), so
+  it sees what the real client saw. Streamed calls are recorded once
+  the stream ends.
+"""
+
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import operator
+import os
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, convert_to_messages
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import config.settings as settings
+from clients.base import LLMWrapper
+
+FORMAT_VERSION = 1
+
+
+class CassetteMiss(KeyError):
+    """Raised on replay for a prompt the cassette has no answer for."""
+
+
+# ─── KEYING ──────────────────────────────────────────────────────────────────
+def _messages(input) -> list:
+    if isinstance(input, str):
+        return [HumanMessage(content=input)]
+    if hasattr(input, "to_messages"):         # a PromptValue
+        return input.to_messages()
+    return convert_to_messages(input)
+
+
+def prompt_key(messages) -> str:
+    """Hash of the prompt's messages — role and content, nothing else."""
+    payload = json.dumps([[m.type, m.content] for m in _messages(messages)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _node() -> str:
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    config = var_child_runnable_config.get() or {}
+    return (config.get("metadata") or {}).get("langgraph_node")
+
+
+# ─── THE CASSETTE ────────────────────────────────────────────────────────────
+class Cassette:
+    """Recorded answers keyed by prompt_key(), loaded from and saved to ``path``."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}          # prompt key → entry dict
+        self._counts = {"loaded": 0, "recorded": 0, "hits": 0, "misses": 0}
+        self._journal = None        # open while there are unsaved answers
+        if path and os.path.exists(path):
+            self._load(path)
+        if path and os.path.exists(self._journal_path(path)):
+            self._load_journal(self._journal_path(path))
+        self._counts["loaded"] = len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _journal_path(path: str) -> str:
+        return f"{path}.journal"
+
+    def _load(self, path: str) -> None:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline() or "{}")
+            if header.get("cassette") != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} cassette")
+            for line in file:
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], entry)
+
+    def _load_journal(self, path: str) -> None:
+        """Answers recorded by a run that never saved (it crashed or was stopped)."""
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue                   # the line a crash cut short
+                self._entries.setdefault(entry["key"], entry)
+
+    def add(self, input, response, latency_s: float) -> None:
+        """Remember ``response`` (an AIMessage) as the answer to ``input``."""
+        entry = {
+            "key": prompt_key(input),
+            "node": _node(),
+            "latency_ms": round(latency_s * 1000, 1),
+            "content": response.content,
+            "usage": getattr(response, "usage_metadata", None),
+        }
+        with self._lock:
+            if entry["key"] not in self._entries:
+                self._entries[entry["key"]] = entry
+                self._counts["recorded"] += 1
+                self._write_journal(entry)
+
+    def _write_journal(self, entry: dict) -> None:
+        if self.path is None:
+            return
+        if self._journal is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._journal = open(self._journal_path(self.path), "a", encoding="utf-8")
+            self._journal.write("\n")         # in case a crash cut the last line short
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def lookup(self, messages) -> dict:
+        """The recorded entry for ``messages``; CassetteMiss if there is none."""
+        key = prompt_key(messages)
+        with self._lock:
+            entry = self._entries.get(key)
+            self._counts["hits" if entry is not None else "misses"] += 1
+        if entry is None:
+            preview = " ".join(str(_messages(messages)[-1].content).split())[:80]
+            raise CassetteMiss(f"no recorded answer for prompt {key[:12]}… ({preview!r})")
+        return entry
+
+    def save(self, path: str = None) -> str:
+        """Write every entry to ``path`` (default: where it was loaded from)."""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            entries = list(self._entries.values())
+            partial = f"{path}.partial"
+            with gzip.open(partial, "wt", encoding="utf-8") as file:
+                file.write(json.dumps({"cassette": FORMAT_VERSION, "entries": len(entries)}) + "\n")
+                for entry in entries:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(partial, path)       # a crash mid-write keeps the old cassette
+            # Everything in the journal is in the cassette now.
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if path == self.path and os.path.exists(self._journal_path(path)):
+                os.remove(self._journal_path(path))
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "entries": len(self._entries)}
+
+
+# ─── RECORD ──────────────────────────────────────────────────────────────────
+class RecordingLLM(LLMWrapper):
+    """Passes every call through and writes the answer into a Cassette."""
+
+    def __init__(self, inner, cassette: Cassette):
+        super().__init__(inner)
+        self.cassette = cassette
+
+    def invoke(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        response = self.inner.invoke(input, config, **kwargs)
+        self.cassette.add(input, response, time.perf_counter() - started)
+        return response
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        response = await self.inner.ainvoke(input, config, **kwargs)
+        self.cassette.add(input, response, time.perf_counter() - started)
+        return response
+
+    def batch(self, inputs, config=None, **kwargs):
+        started = time.perf_counter()
+        responses = self.inner.batch(inputs, config, **kwargs)
+        self._add_all(inputs, responses, time.perf_counter() - started)
+        return responses
+
+    async def abatch(self, inputs, config=None, **kwargs):
+        started = time.perf_counter()
+        responses = await self.inner.abatch(inputs, config, **kwargs)
+        self._add_all(inputs, responses, time.perf_counter() - started)
+        return responses
+
+    def stream(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        chunks = []
+        for chunk in self.inner.stream(input, config, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.cassette.add(input, _joined(chunks), time.perf_counter() - started)
+
+    async def astream(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.inner.astream(input, config, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.cassette.add(input, _joined(chunks), time.perf_counter() - started)
+
+    def _add_all(self, inputs, responses, latency_s: float) -> None:
+        # Every prompt of a batch waited for the whole batch.
+        for input, response in zip(inputs, responses):
+            if not isinstance(response, Exception):     # return_exceptions=True
+                self.cassette.add(input, response, latency_s)
+
+
+def _joined(chunks):
+    """A whole streamed answer: the chunks added up (content and usage)."""
+    return functools.reduce(operator.add, chunks)
+
+
+def enable_recording(path: str) -> Cassette:
+    """Record every agent's LLM answers; returns the Cassette (saved on disable)."""
+    cassette = Cassette(path)
+
+    def layer(client):
+        return RecordingLLM(client, cassette)
+
+    cassette.layer = layer
+    settings.add_llm_layer(layer)
+    return cassette
+
+
+def disable_recording(cassette: Cassette) -> str:
+    """Stop recording and save the cassette; returns its path."""
+    settings.remove_llm_layer(cassette.layer)
+    return cassette.save()
+
+
+# ─── REPLAY ──────────────────────────────────────────────────────────────────
+class CassetteChatModel(BaseChatModel):
+    """Answers every prompt from a Cassette — no key, no network."""
+
+    cassette: Cassette
+    latency_scale: float = 0.0     # 1.0 → sleep for the recorded latency
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @classmethod
+    def from_file(cls, path: str, latency_scale: float = 0.0) -> "CassetteChatModel":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"no cassette at {path}")
+        return cls(cassette=Cassette(path), latency_scale=latency_scale)
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"cassette": self.cassette.path}
+
+    def _replay(self, messages):
+        """(seconds to wait, ChatResult) for ``messages``."""
+        entry = self.cassette.lookup(messages)
+        message = AIMessage(content=entry["content"], usage_metadata=entry.get("usage"))
+        return entry["latency_ms"] / 1000 * self.latency_scale, \
+            ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, result = self._replay(messages)
+        if delay > 0:
+            time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, result = self._replay(messages)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return result
+
+
+def replay_cassette(path: str, latency_scale: float = 0.0) -> CassetteChatModel:
+    """Serve every node from the cassette at ``path``; returns the replaying model."""
+    model = CassetteChatModel.from_file(path, latency_scale)
+    settings.set_llm(model)
+    return model
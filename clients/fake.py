@@ -0,0 +1,230 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/fake.py  —  Deterministic Offline Chat Model       ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  A stand-in for Gemini that needs no key and no network, for
+  benchmarks and end-to-end tests. It is a real LangChain chat
+  model, so callbacks, caching and LangGraph treat it exactly like
+  the real client.
+
+  The text of an answer is derived from (seed, prompt), so the same
+  prompt always gets the same text. Its latency and outcome come from
+  (seed, prompt, n) for the prompt's n-th call since reset_calls(): a
+  run replays exactly, yet a retry or a hedged duplicate of a prompt
+  that failed or was slow gets a fresh draw, as it would from a real
+  API. The call counts are kept per prompt hash; reset them between
+  runs that reuse the same prompts to give each the same draws:
+
+    latency_ms / latency_dist  → "constant", "uniform" (±jitter),
+                                 "exponential" or "lognormal" around
+                                 latency_ms
+    error_rate / error_code    → fraction of prompts that fail with
+                                 FakeLLMError (code 503 by default)
+    response_words             → answer length
+    first_token_share          → when streamed, the share of the latency
+                                 before the first word; the other words
+                                 follow evenly over the rest of it
+
+  Like a real client, a call made with ``timeout=SECONDS`` gives up
+  with TimeoutError once that is shorter than its latency.
+
+  Answers are shaped like the real agents' output: the tagger gets
+  "Keywords: …. Category: …", the fused prompt gets JSON, everything
+  else gets plain sentences.
+
+USAGE:
+  from clients.fake import FakeChatModel
+  fake = FakeChatModel(latency_ms=80, latency_dist="lognormal", error_rate=0.01)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+CATEGORIES = ("Technology", "Politics", "Science", "Business", "Entertainment")
+
+_WORDS = (
+    "researchers report markets policy launch study officials data growth "
+    "species climate network device election audience release investors "
+    "council orbit vaccine platform tariff festival engine ocean signal "
+    "budget record patent satellite protest museum startup reactor"
+).split()
+
+
+class FakeLLMError(RuntimeError):
+    """Raised for the prompts the fake model decides to fail."""
+
+    def __init__(self, message: str, code: int = 503):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeChatModel(BaseChatModel):
+    """Seeded, latency-configurable chat model that never touches the network."""
+
+    model: str = "fake-digest"
+    temperature: float = 0.0
+    seed: int = 0
+    latency_ms: float = 50.0
+    latency_dist: str = "constant"
+    jitter: float = 0.5          # uniform: ± fraction of latency_ms; lognormal: sigma
+    error_rate: float = 0.0
+    error_code: int = 503
+    response_words: int = 60
+    first_token_share: float = 0.3
+
+    _calls: Counter = PrivateAttr(default_factory=Counter)    # prompt hash → calls so far
+    _calls_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-digest"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model, "temperature": self.temperature, "seed": self.seed}
+
+    # ── Deterministic choices ────────────────────────────────────────────────
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}\x00{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _call_rng(self, prompt: str) -> random.Random:
+        """The draw for this call of ``prompt``: the first call's as before, then a new one each time."""
+        key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest()
+        with self._calls_lock:
+            n = self._calls[key]
+            self._calls[key] += 1
+        return self._rng(prompt if n == 0 else f"{prompt}\x00call {n}")
+
+    def reset_calls(self) -> None:
+        """Forget how often each prompt was called: the next call of any prompt is its first."""
+        with self._calls_lock:
+            self._calls.clear()
+
+    def _latency(self, rng: random.Random) -> float:
+        base = self.latency_ms / 1000
+        if self.latency_dist == "constant":
+            return base
+        if self.latency_dist == "uniform":
+            return max(0.0, base * (1 + rng.uniform(-self.jitter, self.jitter)))
+        if self.latency_dist == "exponential":
+            return rng.expovariate(1 / base) if base > 0 else 0.0
+        if self.latency_dist == "lognormal":
+            # Median of latency_ms, with a long right tail like a real API.
+            return rng.lognormvariate(math.log(base), self.jitter) if base > 0 else 0.0
+        raise ValueError(f"unknown latency_dist {self.latency_dist!r} — pick one of {LATENCY_DISTRIBUTIONS}")
+
+    def _text(self, prompt: str, rng: random.Random) -> str:
+        words = [rng.choice(_WORDS) for _ in range(self.response_words)]
+        if "JSON" in prompt:
+            keywords = ", ".join(words[:3])
+            return json.dumps({
+                "summary": " ".join(words).capitalize() + ".",
+                "tags": f"Keywords: {keywords}. Category: {rng.choice(CATEGORIES)}",
+                "headline": " ".join(words[:8]).title(),
+            })
+        if "keywords" in prompt.lower():
+            return f"Keywords: {', '.join(words[:3])}. Category: {rng.choice(CATEGORIES)}"
+        if "headline" in prompt.lower():
+            return " ".join(words[: min(10, len(words))]).title()
+        return " ".join(words).capitalize() + "."
+
+    def _plan(self, messages) -> tuple[float, str, Exception]:
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = self._call_rng(prompt)
+        latency = self._latency(rng)
+        if rng.random() < self.error_rate:
+            return latency, prompt, FakeLLMError(f"fake upstream error {self.error_code}", self.error_code)
+        return latency, prompt, None
+
+    def _result(self, prompt: str) -> ChatResult:
+        text = self._text(prompt, self._rng(prompt + "\x00text"))
+        usage = {
+            "input_tokens": max(1, len(prompt) // 4),
+            "output_tokens": max(1, len(text) // 4),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _pieces(self, prompt: str, latency: float):
+        """(first-token wait, gap between words, chunks) for a streamed answer."""
+        message = self._result(prompt).generations[0].message
+        words = re.findall(r"\S+\s*", message.content) or [message.content]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=word)) for word in words]
+        # Usage rides on the last chunk, as with a real streamed response.
+        chunks[-1].message.usage_metadata = message.usage_metadata
+        first = latency * self.first_token_share
+        return first, (latency - first) / max(1, len(chunks) - 1), chunks
+
+    @staticmethod
+    def _times_out(wait: float, timeout) -> bool:
+        return timeout is not None and wait > timeout
+
+    # ── BaseChatModel API ────────────────────────────────────────────────────
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        latency, prompt, error = self._plan(messages)
+        timeout = kwargs.get("timeout")
+        if self._times_out(latency, timeout):
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"fake request timed out after {timeout:.3f}s")
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        return self._result(prompt)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        latency, prompt, error = self._plan(messages)
+        timeout = kwargs.get("timeout")
+        if self._times_out(latency, timeout):
+            await asyncio.sleep(max(0.0, timeout))
+            raise TimeoutError(f"fake request timed out after {timeout:.3f}s")
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        return self._result(prompt)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        latency, prompt, error = self._plan(messages)
+        first, gap, chunks = self._pieces(prompt, latency)
+        timeout = kwargs.get("timeout")
+        if self._times_out(latency, timeout):
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"fake request timed out after {timeout:.3f}s")
+        time.sleep(first)
+        if error is not None:
+            raise error
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(gap)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        latency, prompt, error = self._plan(messages)
+        first, gap, chunks = self._pieces(prompt, latency)
+        timeout = kwargs.get("timeout")
+        if self._times_out(latency, timeout):
+            await asyncio.sleep(max(0.0, timeout))
+            raise TimeoutError(f"fake request timed out after {timeout:.3f}s")
+        await asyncio.sleep(first)
+        if error is not None:
+            raise error
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(gap)
+            yield chunk
@@ -0,0 +1,266 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/hedge.py  —  Hedged LLM Requests                   ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  A digest makes three LLM calls one after another, so one slow
+  Gemini answer in any of them sets the run's p99. Hedging races it:
+
+    1. The call goes out as usual.
+    2. If it hasn't answered after `delay` — the `percentile` of that
+       client's recent latencies — an identical duplicate goes out.
+    3. Whichever answers first wins; the other is cancelled.
+
+  The delay adapts: every client (so every node with its own model)
+  keeps a rolling window of its latencies, and no hedge is sent
+  until the window has `min_samples` in it.
+
+  Duplicates cost money, so HedgePolicy caps them: at most
+  `max_extra` hedges per call (0.1 → at most 10% extra requests),
+  counted over the whole process. It also counts how often a hedge
+  was sent and how often it won — if hedges rarely win, the tail
+  isn't random slowness and hedging won't help.
+
+  Both attempts show up in per-run usage: both are billed. A loser
+  that is cancelled still adds the time it ran to the window, so the
+  slow calls that were hedged keep counting toward the percentile.
+
+HOW TO USE:
+  python main.py --topics topics.txt --hedge          ← hedge at p95
+  python main.py --topics topics.txt --hedge 90 --hedge-budget 0.05
+
+  or from code:
+    from clients.hedge import enable_hedging
+    policy = enable_hedging(percentile=95, max_extra=0.1)
+    ...
+    print(policy.stats())
+
+NOTE:
+  Add this layer BEFORE clients/ratelimit.py (main.py does), so it
+  sits below the limiter: the hedge clock starts once the limiter has
+  let the call through, and time spent queueing for quota neither
+  triggers a hedge nor enters the latency window. The duplicate books
+  its own request from the limiter (set policy.limiter), so it is
+  still paced. A sync invoke() can't interrupt a request already on
+  the wire: the loser finishes in the background and its answer is
+  dropped. ainvoke() cancels the loser outright.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import config.settings as settings
+from clients.base import LLMWrapper
+from clients.ratelimit import estimate_tokens
+from pipeline.metrics import percentile as nearest_rank
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MAX_EXTRA = 0.1
+DEFAULT_WINDOW = 200
+DEFAULT_MIN_SAMPLES = 20
+# Never hedge sooner than this, whatever the percentile says.
+MIN_DELAY_S = 0.05
+# Threads for sync attempts; each in-flight invoke() holds at most two.
+ATTEMPT_THREADS = 256
+
+
+# ─── POLICY ───────────────────────────────────────────────────────────────────
+class HedgePolicy:
+    """The hedging settings, the extra-request budget and the counters,
+    shared by every hedged client."""
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, max_extra: float = DEFAULT_MAX_EXTRA,
+                 window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 min_delay_s: float = MIN_DELAY_S, limiter=None):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if max_extra < 0:
+            raise ValueError("max_extra can't be negative")
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self.limiter = limiter    # clients.ratelimit.RateLimiter that paces the duplicates
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0           # duplicates sent
+        self.hedge_wins = 0       # …that answered first
+        self.denied = 0           # slow calls that were NOT hedged: budget spent
+
+    def start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def try_hedge(self) -> bool:
+        """Take one hedge from the budget, if there is one left."""
+        with self._lock:
+            if self.hedged + 1 > self.max_extra * self.calls:
+                self.denied += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def hedge_won(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "denied": self.denied,
+                "extra_rate": self.hedged / self.calls if self.calls else 0.0,
+                "win_rate": self.hedge_wins / self.hedged if self.hedged else 0.0,
+            }
+
+
+# ─── THE LAYER ────────────────────────────────────────────────────────────────
+_attempt_pool = None
+_attempt_pool_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _attempt_pool
+    with _attempt_pool_lock:
+        if _attempt_pool is None:
+            _attempt_pool = ThreadPoolExecutor(max_workers=ATTEMPT_THREADS,
+                                               thread_name_prefix="hedge")
+        return _attempt_pool
+
+
+class HedgedLLM(LLMWrapper):
+    """Sends a duplicate of calls that run past the recent latency percentile."""
+
+    def __init__(self, inner, policy: HedgePolicy):
+        super().__init__(inner)
+        self.policy = policy
+        self._latencies = deque(maxlen=policy.window)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None while there is too little history."""
+        with self._lock:
+            if len(self._latencies) < self.policy.min_samples:
+                return None
+            samples = list(self._latencies)
+        return max(self.policy.min_delay_s, nearest_rank(samples, self.policy.percentile))
+
+    def _record(self, started: float) -> None:
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+
+    def _timed_invoke(self, input, config, kwargs):
+        started = time.perf_counter()
+        result = self.inner.invoke(input, config, **kwargs)
+        self._record(started)
+        return result
+
+    async def _timed_ainvoke(self, input, config, kwargs):
+        started = time.perf_counter()
+        try:
+            result = await self.inner.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            self._record(started)    # a loser: it took at least this long
+            raise
+        self._record(started)
+        return result
+
+    def _paced_invoke(self, input, config, kwargs):
+        """The duplicate: book its own request from the limiter, then time the call."""
+        if self.policy.limiter is not None:
+            self.policy.limiter.acquire(estimate_tokens(input))
+        return self._timed_invoke(input, config, kwargs)
+
+    async def _paced_ainvoke(self, input, config, kwargs):
+        if self.policy.limiter is not None:
+            await self.policy.limiter.aacquire(estimate_tokens(input))
+        return await self._timed_ainvoke(input, config, kwargs)
+
+    # ── Sync path ────────────────────────────────────────────────────────────
+    def invoke(self, input, config=None, **kwargs):
+        self.policy.start_call()
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed_invoke(input, config, kwargs)
+
+        # Each attempt runs in a copy of the caller's context, so LangChain
+        # still sees the caller's run (callbacks, node metadata).
+        def attempt(call):
+            return _pool().submit(contextvars.copy_context().run, call, input, config, kwargs)
+
+        primary = attempt(self._timed_invoke)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.policy.try_hedge():
+            return primary.result()
+
+        hedge = attempt(self._paced_invoke)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None:
+                for loser in pending:
+                    loser.cancel()       # only stops it if it hasn't started
+                if winner is hedge:
+                    self.policy.hedge_won()
+                return winner.result()
+        return primary.result()          # both failed: report the original error
+
+    # ── Async path ───────────────────────────────────────────────────────────
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.policy.start_call()
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed_ainvoke(input, config, kwargs)
+
+        primary = asyncio.ensure_future(self._timed_ainvoke(input, config, kwargs))
+        attempts = [primary]
+        try:
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done or not self.policy.try_hedge():
+                return await primary
+
+            hedge = asyncio.ensure_future(self._paced_ainvoke(input, config, kwargs))
+            attempts.append(hedge)
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is not None:
+                    if winner is hedge:
+                        self.policy.hedge_won()
+                    return winner.result()
+            return primary.result()
+        finally:
+            for task in attempts:
+                task.cancel()        # the loser — or both, if our caller gave up
+
+
+def enable_hedging(percentile: float = DEFAULT_PERCENTILE, max_extra: float = DEFAULT_MAX_EXTRA,
+                   **options) -> HedgePolicy:
+    """Hedge every agent's slow LLM calls; returns the shared HedgePolicy.
+
+    ``options`` go to HedgePolicy (window, min_samples, min_delay_s,
+    limiter). Enable the rate limit after this, and hand its limiter to
+    the policy, so the duplicates are paced too.
+    """
+    policy = HedgePolicy(percentile, max_extra, **options)
+
+    def layer(client):
+        return HedgedLLM(client, policy)
+
+    policy.layer = layer
+    settings.add_llm_layer(layer)
+    return policy
+
+
+def disable_hedging(policy: HedgePolicy) -> None:
+    settings.remove_llm_layer(policy.layer)
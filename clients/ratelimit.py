@@ -0,0 +1,405 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/ratelimit.py  —  Shared Quota-Aware Rate Limiter   ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Gemini enforces per-minute quotas on requests AND on tokens. With
+  many pipelines running at once, plain llm.invoke() calls overshoot
+  them, get 429s and fail. This module keeps every agent in the
+  process under one shared budget:
+
+    RateLimiter     → two token buckets (requests/min, tokens/min).
+                      Each call reserves one request and an estimate
+                      of its tokens, then waits until both buckets can
+                      pay. Reservations queue up in arrival order, so
+                      callers are spaced out evenly instead of
+                      stampeding when the bucket refills.
+
+    adaptive rate   → the buckets refill at `fraction` × the configured
+                      quota. A 429 halves the fraction; each success
+                      adds a little back (AIMD). The rate settles just
+                      under what the server actually allows.
+
+    RateLimitedLLM  → an LLMWrapper layer that goes through the limiter
+                      and retries 429 / 5xx answers with full-jitter
+                      exponential backoff. invoke, stream and batch
+                      all pay: a batch books one request per prompt,
+                      and a stream is retried until its first chunk.
+
+  After a call, the token estimate is corrected with the real usage
+  from the response, so the token bucket tracks what was billed. A
+  call the response cache will answer (clients/cache.py) books
+  nothing and never waits: it doesn't reach the provider.
+
+HOW TO USE:
+  python main.py --topics topics.txt --rate-limit
+  python main.py --topics topics.txt --rate-limit --rpm 1000 --tpm 1000000
+
+  or from code:
+    from clients.ratelimit import enable_rate_limit
+    limiter = enable_rate_limit(requests_per_minute=60)
+
+NOTE:
+  ChatGoogleGenerativeAI has its own retry loop. The limiter's retries
+  sit on top of it, so a request that still fails after the SDK gave
+  up is paced and retried here with the adapted rate.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import config.settings as settings
+from clients.base import LLMWrapper
+from clients.cache import is_cached
+from config.settings import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+
+# Rough prompt size: ~4 characters per token for English text.
+CHARS_PER_TOKEN = 4
+# What a reservation assumes a reply costs until the real usage is known.
+DEFAULT_OUTPUT_TOKENS = 256
+
+# gRPC-style status names (google.genai's APIError.status) → HTTP status.
+_STATUS_NAMES = {"RESOURCE_EXHAUSTED": 429, "INTERNAL": 500, "UNAVAILABLE": 503,
+                 "DEADLINE_EXCEEDED": 504}
+
+
+# ─── ERROR CLASSIFICATION ─────────────────────────────────────────────────────
+
+def status_of(exc: BaseException):
+    """HTTP-ish status code behind ``exc``, or None if there is none.
+
+    Looks at the usual attributes (code, status_code, response.status_code,
+    then a status name like "RESOURCE_EXHAUSTED") on the exception and
+    its causes. The message text is never parsed: "processed 503 items"
+    is not a 503.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        for candidate in (getattr(exc, "code", None), getattr(exc, "status_code", None),
+                          getattr(getattr(exc, "response", None), "status_code", None)):
+            # google.api_core codes are enums with an int value.
+            candidate = getattr(candidate, "value", candidate)
+            if isinstance(candidate, int) and not isinstance(candidate, bool) \
+                    and 100 <= candidate < 600:
+                return candidate
+        name = getattr(exc, "status", None)
+        if isinstance(name, str) and name in _STATUS_NAMES:
+            return _STATUS_NAMES[name]
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def is_retryable(status) -> bool:
+    return status == 429 or (status is not None and 500 <= status < 600)
+
+
+# ─── LIMITER ──────────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """A bucket that refills at ``rate`` per second up to ``capacity``.
+
+    ``level`` may go negative: that is debt left by reservations which
+    later callers wait out.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = now
+
+    def refill(self, now: float, fraction: float = 1.0) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(self.capacity, self.level + elapsed * self.rate * fraction)
+        self.updated = now
+
+    def wait_for_debt(self, fraction: float = 1.0) -> float:
+        """Seconds until the level is back at zero."""
+        return -self.level / (self.rate * fraction) if self.level < 0 else 0.0
+
+
+class RateLimiter:
+    """Process-wide request + token budget with an AIMD-adapted rate.
+
+    ``burst_seconds`` is how much unused quota a bucket may bank; the
+    default of one second keeps calls evenly spaced.
+    """
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 burst_seconds: float = 1.0, min_fraction: float = 0.05,
+                 increase: float = 0.02, decrease: float = 0.5,
+                 clock=time.monotonic):
+        if requests_per_minute <= 0 or tokens_per_minute <= 0:
+            raise ValueError("requests_per_minute and tokens_per_minute must be positive")
+        self.clock = clock
+        now = clock()
+        req_rate, tok_rate = requests_per_minute / 60, tokens_per_minute / 60
+        self.requests = TokenBucket(req_rate, max(1.0, req_rate * burst_seconds), now)
+        self.tokens = TokenBucket(tok_rate, max(1.0, tok_rate * burst_seconds), now)
+        self.fraction = 1.0
+        self.min_fraction = min_fraction
+        self.increase = increase
+        self.decrease = decrease
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self.waited_s = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Book one request and ``tokens``; return how long to wait first."""
+        with self._lock:
+            now = self.clock()
+            for bucket in (self.requests, self.tokens):
+                bucket.refill(now, self.fraction)
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+            wait = max(self.requests.wait_for_debt(self.fraction),
+                       self.tokens.wait_for_debt(self.fraction))
+            self.calls += 1
+            self.waited_s += wait
+            return wait
+
+    def acquire(self, tokens: int, sleep=time.sleep) -> None:
+        wait = self.reserve(tokens)
+        if wait:
+            sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual) -> None:
+        """Correct a reservation once the real token count is known."""
+        if actual is None:
+            return
+        with self._lock:
+            self.tokens.level += estimated - actual
+
+    def on_success(self) -> None:
+        """Additive increase: creep back towards the configured quota."""
+        with self._lock:
+            self.fraction = min(1.0, self.fraction + self.increase)
+
+    def on_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def on_throttled(self) -> None:
+        """Multiplicative decrease, and drop any banked burst."""
+        with self._lock:
+            self.throttled += 1
+            self.fraction = max(self.min_fraction, self.fraction * self.decrease)
+            self.requests.level = min(self.requests.level, 0.0)
+            self.tokens.level = min(self.tokens.level, 0.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "waited_s": self.waited_s,
+                "rate_fraction": self.fraction,
+                "requests_per_minute": self.requests.rate * self.fraction * 60,
+                "tokens_per_minute": self.tokens.rate * self.fraction * 60,
+            }
+
+
+# ─── LLM LAYER ────────────────────────────────────────────────────────────────
+
+def estimate_tokens(prompt, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> int:
+    return len(str(prompt)) // CHARS_PER_TOKEN + output_tokens
+
+
+def _billed_tokens(response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def _add_billed(billed, chunk):
+    """Running token total of a stream; usage may ride on any chunk."""
+    tokens = _billed_tokens(chunk)
+    if tokens is None:
+        return billed
+    return (billed or 0) + tokens
+
+
+_NO_CHUNK = object()
+
+
+class RateLimitedLLM(LLMWrapper):
+    """Paces ``inner`` through a shared RateLimiter and retries 429 / 5xx."""
+
+    def __init__(self, inner, limiter: RateLimiter, max_retries: int = 6,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 output_tokens: int = DEFAULT_OUTPUT_TOKENS, sleep=time.sleep, rng=None):
+        super().__init__(inner)
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.output_tokens = output_tokens
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base · 2^attempt)]."""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _failed(self, exc: Exception, attempt: int) -> float:
+        """Record a failure; return the backoff delay or re-raise."""
+        status = status_of(exc)
+        if not is_retryable(status) or attempt >= self.max_retries:
+            raise exc
+        if status == 429:
+            self.limiter.on_throttled()
+        self.limiter.on_retry()
+        return self.backoff(attempt)
+
+    def invoke(self, input, config=None, **kwargs):
+        if is_cached(self.inner, input, **kwargs):
+            return self.inner.invoke(input, config, **kwargs)
+        estimated = estimate_tokens(input, self.output_tokens)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimated, self.sleep)
+            try:
+                response = self.inner.invoke(input, config, **kwargs)
+            except Exception as exc:
+                self.limiter.settle(estimated, 0)
+                self.sleep(self._failed(exc, attempt))
+                continue
+            self.limiter.settle(estimated, _billed_tokens(response))
+            self.limiter.on_success()
+            return response
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        if is_cached(self.inner, input, **kwargs):
+            return await self.inner.ainvoke(input, config, **kwargs)
+        estimated = estimate_tokens(input, self.output_tokens)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(estimated)
+            try:
+                response = await self.inner.ainvoke(input, config, **kwargs)
+            except Exception as exc:
+                self.limiter.settle(estimated, 0)
+                await asyncio.sleep(self._failed(exc, attempt))
+                continue
+            self.limiter.settle(estimated, _billed_tokens(response))
+            self.limiter.on_success()
+            return response
+
+    # ── Streams ──────────────────────────────────────────────────────────────
+    # A failure before the first chunk is retried like invoke(); once a
+    # chunk has reached the caller the stream can't be replayed.
+    def stream(self, input, config=None, **kwargs):
+        estimated = estimate_tokens(input, self.output_tokens)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimated, self.sleep)
+            chunks = iter(self.inner.stream(input, config, **kwargs))
+            try:
+                first = next(chunks, _NO_CHUNK)
+            except Exception as exc:
+                self.limiter.settle(estimated, 0)
+                self.sleep(self._failed(exc, attempt))
+                continue
+            billed = None
+            if first is not _NO_CHUNK:
+                billed = _add_billed(billed, first)
+                yield first
+                for chunk in chunks:
+                    billed = _add_billed(billed, chunk)
+                    yield chunk
+            self.limiter.settle(estimated, billed)
+            self.limiter.on_success()
+            return
+
+    async def astream(self, input, config=None, **kwargs):
+        estimated = estimate_tokens(input, self.output_tokens)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(estimated)
+            chunks = aiter(self.inner.astream(input, config, **kwargs))
+            try:
+                first = await anext(chunks, _NO_CHUNK)
+            except Exception as exc:
+                self.limiter.settle(estimated, 0)
+                await asyncio.sleep(self._failed(exc, attempt))
+                continue
+            billed = None
+            if first is not _NO_CHUNK:
+                billed = _add_billed(billed, first)
+                yield first
+                async for chunk in chunks:
+                    billed = _add_billed(billed, chunk)
+                    yield chunk
+            self.limiter.settle(estimated, billed)
+            self.limiter.on_success()
+            return
+
+    # ── Batches ──────────────────────────────────────────────────────────────
+    # One paced, retried invoke per prompt: the provider's batch() sends
+    # one request per prompt anyway, and each of them counts.
+    def batch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        from langchain_core.runnables.config import get_config_list, get_executor_for_config
+
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+
+        def one(input, config):
+            try:
+                return self.invoke(input, config, **kwargs)
+            except Exception as exc:
+                if return_exceptions:
+                    return exc
+                raise
+
+        with get_executor_for_config(configs[0]) as executor:
+            return list(executor.map(one, inputs, configs))
+
+    async def abatch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        from langchain_core.runnables.config import get_config_list
+        from langchain_core.runnables.utils import gather_with_concurrency
+
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+
+        async def one(input, config):
+            try:
+                return await self.ainvoke(input, config, **kwargs)
+            except Exception as exc:
+                if return_exceptions:
+                    return exc
+                raise
+
+        return await gather_with_concurrency(configs[0].get("max_concurrency"),
+                                             *(one(i, c) for i, c in zip(inputs, configs)))
+
+
+def enable_rate_limit(requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                      tokens_per_minute: float = LLM_TOKENS_PER_MINUTE, **options) -> RateLimiter:
+    """Route every agent's LLM calls through one shared limiter.
+
+    ``options`` go to RateLimitedLLM (max_retries, base_delay, …).
+    Returns the limiter so callers can read its stats().
+    """
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    def layer(client):
+        return RateLimitedLLM(client, limiter, **options)
+
+    limiter.layer = layer
+    settings.add_llm_layer(layer)
+    return limiter
+
+
+def disable_rate_limit(limiter: RateLimiter) -> None:
+    settings.remove_llm_layer(limiter.layer)
@@ -0,0 +1,158 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  clients/routing.py  —  Latency-Aware Model Routing         ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Sends a node's calls to its primary model while that model is
+  fast, and to a fallback model while it is slow:
+
+    healthy   → every call goes to the primary; its latency is
+                recorded in a rolling window (the last `window` calls)
+    degraded  → the window's p95 is above p95_threshold_s: calls go
+                to the fallback, except one in every `probe_every`,
+                which still goes to the primary so we notice when it
+                recovers
+
+  invoke, stream and batch are all routed: a stream is timed from the
+  call to its last chunk, and a batch routes (and times) each prompt
+  on its own.
+
+  Configured per node in config/settings.py:
+
+    NODE_MODELS = {
+        "fetcher": {"fallback_model": "gemini-2.5-flash-lite", "p95_threshold_s": 4.0},
+    }
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+from clients.base import LLMWrapper
+
+DEFAULT_WINDOW = 50
+DEFAULT_MIN_SAMPLES = 10
+DEFAULT_PROBE_EVERY = 10
+
+
+class LatencyRouter(LLMWrapper):
+    """Primary model while its recent p95 is under the threshold, fallback otherwise."""
+
+    def __init__(self, primary, fallback, p95_threshold_s: float, window: int = DEFAULT_WINDOW,
+                 min_samples: int = DEFAULT_MIN_SAMPLES, probe_every: int = DEFAULT_PROBE_EVERY):
+        super().__init__(primary)
+        self.fallback = fallback
+        self.p95_threshold_s = p95_threshold_s
+        self.min_samples = min_samples
+        self.probe_every = probe_every
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._since_probe = 0
+        self.to_primary = 0
+        self.to_fallback = 0
+
+    def p95(self) -> float:
+        with self._lock:
+            return self._p95()
+
+    def _p95(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[max(1, math.ceil(0.95 * len(ordered))) - 1]
+
+    def _choose(self):
+        with self._lock:
+            degraded = (len(self._latencies) >= self.min_samples
+                        and self._p95() > self.p95_threshold_s)
+            if degraded:
+                self._since_probe += 1
+                if self._since_probe < self.probe_every:
+                    self.to_fallback += 1
+                    return self.fallback
+                self._since_probe = 0
+            self.to_primary += 1
+            return self.inner
+
+    def _record(self, client, started: float) -> None:
+        # Failed calls count too: a timeout is the slowest answer of all.
+        if client is self.inner:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+
+    def invoke(self, input, config=None, **kwargs):
+        client = self._choose()
+        started = time.perf_counter()
+        try:
+            return client.invoke(input, config, **kwargs)
+        finally:
+            self._record(client, started)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        client = self._choose()
+        started = time.perf_counter()
+        try:
+            return await client.ainvoke(input, config, **kwargs)
+        finally:
+            self._record(client, started)
+
+    def stream(self, input, config=None, **kwargs):
+        client = self._choose()
+        started = time.perf_counter()
+        try:
+            yield from client.stream(input, config, **kwargs)
+        finally:
+            self._record(client, started)
+
+    async def astream(self, input, config=None, **kwargs):
+        client = self._choose()
+        started = time.perf_counter()
+        try:
+            async for chunk in client.astream(input, config, **kwargs):
+                yield chunk
+        finally:
+            self._record(client, started)
+
+    def batch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        from langchain_core.runnables.config import get_config_list, get_executor_for_config
+
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+
+        def one(input, config):
+            try:
+                return self.invoke(input, config, **kwargs)
+            except Exception as exc:
+                if return_exceptions:
+                    return exc
+                raise
+
+        with get_executor_for_config(configs[0]) as executor:
+            return list(executor.map(one, inputs, configs))
+
+    async def abatch(self, inputs, config=None, *, return_exceptions: bool = False, **kwargs):
+        from langchain_core.runnables.config import get_config_list
+        from langchain_core.runnables.utils import gather_with_concurrency
+
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+
+        async def one(input, config):
+            try:
+                return await self.ainvoke(input, config, **kwargs)
+            except Exception as exc:
+                if return_exceptions:
+                    return exc
+                raise
+
+        return await gather_with_concurrency(configs[0].get("max_concurrency"),
+                                             *(one(i, c) for i, c in zip(inputs, configs)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"to_primary": self.to_primary, "to_fallback": self.to_fallback,
+                    "primary_p95_s": self._p95()}
@@ -7,19 +7,197 @@
 ╚══════════════════════════════════════════════════════════════╝
 """
 
+import os
+import threading
 from typing import TypedDict
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+from typing_extensions import NotRequired
 
 # ─── 🔑 PUT YOUR KEY HERE ────────────────────────────────────────────────────
 # Get a free key at: https://aistudio.google.com
 GOOGLE_API_KEY = "PASTE-YOUR-KEY-HERE"
 
 # ─── LLM ─────────────────────────────────────────────────────────────────────
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.3,
-    google_api_key=GOOGLE_API_KEY
-)
+LLM_MODEL = "gemini-2.5-flash"
+LLM_TEMPERATURE = 0.3
+
+# Per-node model tiering. Nodes not listed use LLM_MODEL/LLM_TEMPERATURE.
+# Keys (all optional): model, temperature, max_output_tokens,
+# fallback_model + p95_threshold_s (see clients/routing.py), e.g.
+#   NODE_MODELS = {
+#       "tagger": {"model": "gemini-2.5-flash-lite", "max_output_tokens": 64},
+#       "editor": {"model": "gemini-2.5-flash-lite", "temperature": 0.7},
+#       "fetcher": {"fallback_model": "gemini-2.5-flash-lite", "p95_threshold_s": 4.0},
+#   }
+# The agents keep calling llm.invoke(): llm looks up which node is
+# running and hands over that node's client.
+NODE_MODELS = {}
+
+# Token budgets for --token-budget (pipeline/budget.py). Before a node
+# builds its prompt, every state field it reads is compacted to at
+# most this many tokens. The stored state keeps the full text.
+PROMPT_TOKEN_BUDGETS = {
+    "fetcher": {"topic": 120},
+    "tagger": {"topic": 120, "summary": 200},
+    "editor": {"summary": 200, "tags": 60},
+    "fused": {"topic": 120},
+}
+# Per-node caps on the answer, applied through NODE_MODELS unless a
+# node sets its own max_output_tokens. On gemini-2.5 models thinking
+# tokens count toward the cap too, so keep them generous.
+OUTPUT_TOKEN_CAPS = {"fetcher": 1024, "tagger": 512, "editor": 512, "fused": 1024}
+
+# Where clients/cache.py keeps its SQLite tier when --cache is given.
+LLM_CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite")
+
+# Where pipeline/checkpoint.py saves finished nodes when --checkpoint is given.
+CHECKPOINT_PATH = os.path.join(".cache", "checkpoints.sqlite")
+
+# Where pipeline/archive.py keeps finished digests when --archive is given.
+ARCHIVE_PATH = os.path.join(".cache", "digests")
+
+# Quota that clients/ratelimit.py paces requests to when --rate-limit
+# is given. These are the free-tier numbers — raise them on a paid plan.
+LLM_REQUESTS_PER_MINUTE = 10
+LLM_TOKENS_PER_MINUTE = 250_000
+
+# The Gemini client is NOT built at import time: langchain_google_genai
+# alone takes most of a second to import. It is created on first use,
+# so tests (which patch llm) and `main.py --help` never pay for it.
+_client = None               # serves every node without a client of its own
+_client_is_custom = False    # set_llm() replaced it → it serves ALL nodes
+_node_clients = {}           # node → its own client (NODE_MODELS or set_llm(node=…))
+_client_lock = threading.Lock()
+
+# Layers wrap the client, e.g. a rate limiter: layer(client) -> client.
+# The first layer added sits closest to the real client.
+_layers = []
+_wrapped = {}                # node (None = shared client) → client with every layer applied
+
+
+def _build_client(model=LLM_MODEL, temperature=LLM_TEMPERATURE, max_output_tokens=None,
+                  fallback_model=None, p95_threshold_s=None):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    def gemini(name):
+        return ChatGoogleGenerativeAI(
+            model=name,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            google_api_key=GOOGLE_API_KEY
+        )
+
+    if fallback_model and p95_threshold_s:
+        from clients.routing import LatencyRouter
+        return LatencyRouter(gemini(model), gemini(fallback_model), p95_threshold_s)
+    return gemini(model)
+
+
+def _build_default_client():
+    return _build_client()
+
+
+def _serving_key(node):
+    """Which client serves ``node``: its own, or the shared one (None)."""
+    if node in _node_clients or (node in NODE_MODELS and not _client_is_custom):
+        return node
+    return None
+
+
+def get_llm(node=None):
+    """The chat model ``node`` talks to, with all layers applied.
+
+    Without a node (or for a node without its own model) this is the
+    shared client. Built on first call.
+    """
+    global _client
+    key = _serving_key(node)
+    wrapped = _wrapped.get(key)
+    if wrapped is None:
+        with _client_lock:
+            wrapped = _wrapped.get(key)
+            if wrapped is None:
+                if key is None:
+                    if _client is None:
+                        _client = _build_default_client()
+                    wrapped = _client
+                else:
+                    if key not in _node_clients:
+                        _node_clients[key] = _build_client(**NODE_MODELS[key])
+                    wrapped = _node_clients[key]
+                for layer in _layers:
+                    wrapped = layer(wrapped)
+                _wrapped[key] = wrapped
+    return wrapped
+
+
+def set_llm(client, node=None):
+    """Swap the chat model behind ``llm`` — e.g. a fake one for benchmarks.
+
+    Without ``node`` the client serves EVERY node, NODE_MODELS included;
+    with ``node`` it serves only that node. Layers stay in place and
+    wrap the new client. Returns the previous client (None if it was
+    never built).
+    """
+    global _client, _client_is_custom
+    with _client_lock:
+        if node is None:
+            previous, _client = _client, client
+            _client_is_custom = client is not None
+            _node_clients.clear()
+        else:
+            previous = _node_clients.pop(node, None)
+            if client is not None:
+                _node_clients[node] = client
+        _wrapped.clear()
+    return previous
+
+
+def add_llm_layer(layer) -> None:
+    """Wrap every agent's client with ``layer(client) -> client``."""
+    with _client_lock:
+        _layers.append(layer)
+        _wrapped.clear()
+
+
+def remove_llm_layer(layer) -> None:
+    with _client_lock:
+        _layers.remove(layer)
+        _wrapped.clear()
+
+
+def reset_llm() -> None:
+    """Forget every client; the next call builds the defaults again."""
+    set_llm(None)
+
+
+def current_node():
+    """Name of the LangGraph node running in this context, if any."""
+    if not (NODE_MODELS or _node_clients):
+        return None          # nothing to route — don't pay for the lookup
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    config = var_child_runnable_config.get() or {}
+    return (config.get("metadata") or {}).get("langgraph_node")
+
+
+class _LazyLLM:
+    """Stands in for the chat model and forwards everything to get_llm().
+
+    Agents keep writing ``llm.invoke(prompt)``; the real client — the
+    one configured for the node that is running — is only created (and
+    can be replaced) behind this object.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_llm(current_node()), name)
+
+    def __repr__(self):
+        shared = _wrapped.get(None)
+        return f"<lazy llm → {shared!r}>" if shared is not None else "<lazy llm (not built yet)>"
+
+
+llm = _LazyLLM()
 
 # ─── SHARED STATE ─────────────────────────────────────────────────────────────
 # This is the "memory" that flows between all agents in the pipeline.
@@ -29,3 +207,19 @@ class DigestState(TypedDict):
     summary: str     # Agent 1 (Fetcher)  → writes here
     tags: str        # Agent 2 (Tagger)   → writes here
     headline: str    # Agent 3 (Editor)   → writes here
+    # Only in runs with a deadline (see pipeline/deadline.py):
+    deadline: NotRequired[float]         # time.time() to finish by
+    degraded: NotRequired[list[str]]     # nodes that fell back to local output
+
+
+# ─── CONSOLE BANNERS ──────────────────────────────────────────────────────────
+# Each agent announces itself with a one-line banner. Headless runs
+# (batches, services) switch these off and read pipeline/metrics.py
+# records instead.
+VERBOSE = True
+
+
+def announce(message: str) -> None:
+    """Print an agent banner unless the run is headless."""
+    if VERBOSE:
+        print(message)
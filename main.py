@@ -10,49 +10,658 @@
 ╚══════════════════════════════════════════════════════════════╝
 
 HOW TO RUN:
-  python main.py
+  python main.py                                   ← the demo topic
+  python main.py --topics topics.txt               ← one topic per line
+  python main.py --topics - --concurrency 32 < topics.jsonl
+  python main.py --topics topics.txt --ordered     ← results in input order
+  python main.py --topics topics.txt --async --concurrency 200
+  python main.py --topics topics.txt --cache       ← reuse earlier answers
+  python main.py --topics topics.txt --rate-limit --rpm 1000   ← stay under quota
+  python main.py --topics topics.txt --hedge       ← duplicate calls slower than p95
+  python main.py --topics topics.txt --deadline 2.5   ← local fallbacks past 2.5s
+  python main.py --topics topics.txt --checkpoint  ← re-run to resume a crash
+  python main.py --topics big.txt --workers 8 --concurrency 32   ← one graph per core
+  python main.py --topics topics.txt --archive     ← keep every digest, queryable
+  python main.py --lookup "Mars rover finds ice"   ← read it back (also mid-run)
+  python main.py --serve 8080                      ← HTTP service, graph compiled once
+  python main.py --serve 8080 --fake-llm           ← same, offline stub LLM
+  python main.py --mode fused                      ← one LLM call per digest
+  python main.py --tagger local                    ← tags without an LLM call
+  python main.py --node-model tagger=gemini-2.5-flash-lite   ← cheaper model per node
+  python main.py --topics topics.txt --metrics runs.jsonl --quiet
 """
 
-from langgraph.graph import StateGraph, END
-from config.settings import DigestState
-from agents.fetcher import fetcher_node
-from agents.tagger import tagger_node
-from agents.editor import editor_node
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+
+# Only cheap imports up here: LangGraph, LangChain and the agents are
+# imported where they are first needed, so `python main.py --help`
+# (and anything that imports main without running a graph) starts fast.
+import config.settings as settings
+from config.settings import (ARCHIVE_PATH, CHECKPOINT_PATH, LLM_CACHE_PATH, LLM_REQUESTS_PER_MINUTE,
+                             LLM_TOKENS_PER_MINUTE, DigestState)
+from pipeline.batch import DEFAULT_CONCURRENCY, initial_state, iter_topics
+
 
 # ─── BUILD THE GRAPH ─────────────────────────────────────────────────────────
-workflow = StateGraph(DigestState)
+# "chain" → fetcher → tagger → editor   (three LLM calls)
+# "fused" → one node, one structured LLM call for all three fields
+MODES = ("chain", "fused")
+# The nodes each mode's graph is built from — the names --node-model takes.
+MODE_NODES = {"chain": ("fetcher", "tagger", "editor"), "fused": ("fused",)}
+# Tagger engines for chain mode: "llm" asks Gemini, "local" extracts the
+# tags on the spot (agents/local_tagger.py) and only asks when unsure.
+TAGGERS = ("llm", "local")
+
+
+def make_node(name: str, func, afunc, hooks=()):
+    """Pair a node's sync and async versions, each wrapped by ``hooks``.
+
+    A hook is ``hook(name, fn) -> fn`` — e.g. pipeline.metrics.instrument_node.
+    It is applied to both versions, so it must handle coroutine functions.
+    pipeline.deadline.deadline_hook always goes on first (innermost).
+    """
+    from langchain_core.runnables import RunnableLambda
+    from pipeline.deadline import deadline_hook
+
+    for hook in (deadline_hook, *hooks):
+        func, afunc = hook(name, func), hook(name, afunc)
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
+def build_graph(mode: str = "chain", hooks=(), tagger: str = "llm"):
+    """Wire the agents for ``mode`` and compile the graph.
+
+    Every node carries its sync AND async version: app.invoke/stream
+    run the sync ones, app.ainvoke/astream await the async twins.
+    ``tagger`` picks the tagger engine in chain mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r} — pick one of {MODES}")
+    if tagger not in TAGGERS:
+        raise ValueError(f"unknown tagger {tagger!r} — pick one of {TAGGERS}")
+
+    from langgraph.graph import StateGraph, END
+
+    workflow = StateGraph(DigestState)
+
+    if mode == "fused":
+        from agents.fused import fused_node, afused_node
 
-workflow.add_node("fetcher", fetcher_node)
-workflow.add_node("tagger",  tagger_node)
-workflow.add_node("editor",  editor_node)
+        workflow.add_node("fused", make_node("fused", fused_node, afused_node, hooks))
+        workflow.set_entry_point("fused")
+        workflow.add_edge("fused", END)
+        return workflow.compile()
 
-workflow.set_entry_point("fetcher")
-workflow.add_edge("fetcher", "tagger")
-workflow.add_edge("tagger",  "editor")
-workflow.add_edge("editor",  END)
+    from agents.fetcher import fetcher_node, afetcher_node
+    from agents.editor import editor_node, aeditor_node
+    if tagger == "local":
+        from agents.local_tagger import local_tagger_node as tagger_node
+        from agents.local_tagger import alocal_tagger_node as atagger_node
+    else:
+        from agents.tagger import tagger_node, atagger_node
+
+    workflow.add_node("fetcher", make_node("fetcher", fetcher_node, afetcher_node, hooks))
+    workflow.add_node("tagger",  make_node("tagger",  tagger_node,  atagger_node,  hooks))
+    workflow.add_node("editor",  make_node("editor",  editor_node,  aeditor_node,  hooks))
+
+    workflow.set_entry_point("fetcher")
+    workflow.add_edge("fetcher", "tagger")
+    workflow.add_edge("tagger",  "editor")
+    workflow.add_edge("editor",  END)
+
+    return workflow.compile()
+
+
+def __getattr__(name):
+    # `from main import app` compiles the default graph on first access.
+    if name == "app":
+        globals()["app"] = build_graph()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-app = workflow.compile()
 
 # ─── RUN ─────────────────────────────────────────────────────────────────────
-if __name__ == "__main__":
-    inputs = {
-        "topic":    "Scientists discover a new deep-sea creature near volcanic vents",
-        "summary":  "",
-        "tags":     "",
-        "headline": ""
-    }
+DEMO_TOPIC = "Scientists discover a new deep-sea creature near volcanic vents"
+FIELD_LABELS = {"summary": "📋  Summary  : ", "tags": "🏷️   Tags     : ", "headline": "📰  Headline : "}
+
+
+def run_demo(graph, metrics=None, deadline_s: float = None, stream: bool = False):
+    from pipeline.deadline import deadline_in
+    from pipeline.usage import UsageTracker
+
+    inputs = initial_state(DEMO_TOPIC, deadline_in(deadline_s))
 
     print("🚀 Starting News Digest Pipeline...\n")
 
+    tracker = metrics.start_run(DEMO_TOPIC) if metrics else UsageTracker()
+    started = time.perf_counter()
     accumulated = {**inputs}
-    for step in app.stream(inputs):
-        for node_output in step.values():
-            accumulated.update(node_output)
+    first_token = None
+    if stream:
+        from pipeline.live import STREAMED_FIELDS, stream_digest
+
+        live = None      # the node whose answer is being printed
+        for kind, node, data in stream_digest(graph, DEMO_TOPIC, [tracker], inputs.get("deadline")):
+            if kind == "token":
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                if live != node:
+                    print(FIELD_LABELS[STREAMED_FIELDS[node]], end="")
+                    live = node
+                print(data, end="", flush=True)
+                continue
+            accumulated.update(data)
+            if live == node:
+                print()
+            elif node in STREAMED_FIELDS:      # nothing streamed, e.g. a local fallback
+                field = STREAMED_FIELDS[node]
+                print(f"{FIELD_LABELS[field]}{data.get(field, '')}")
+            live = None
+    else:
+        for step in graph.stream(inputs, config={"callbacks": [tracker]}):
+            for node_output in step.values():
+                accumulated.update(node_output)
+    elapsed = time.perf_counter() - started
+    usage = tracker.totals()
+    if metrics:
+        metrics.finish_run(tracker, {**accumulated, "error": None,
+                                     "usage": {"latency_s": round(elapsed, 4), **usage}})
 
     print("\n" + "═" * 55)
     print("📰  FINAL DIGEST")
     print("═" * 55)
-    print(f"📋  Summary  : {accumulated.get('summary',  '[missing]')}")
-    print(f"🏷️   Tags     : {accumulated.get('tags',     '[missing]')}")
-    print(f"📰  Headline : {accumulated.get('headline', '[missing]')}")
+    for field, label in FIELD_LABELS.items():
+        print(f"{label}{accumulated.get(field, '[missing]')}")
+    if accumulated.get("degraded"):
+        print(f"⏰  Degraded : {', '.join(accumulated['degraded'])} ran out of time")
     print("═" * 55)
+    print(f"⏱️   {elapsed:.2f}s · {usage['llm_calls']} LLM calls · "
+          f"{usage['input_tokens']} tokens in / {usage['output_tokens']} out"
+          + (f" · first token after {first_token:.2f}s" if first_token is not None else ""))
+
+
+def run_topics(graph, path: str, concurrency: int, output: str, use_async: bool = False,
+               metrics=None, checkpoint=None, ordered: bool = False, deadline_s: float = None,
+               archive=None):
+    """Stream topics from ``path`` and write each result as soon as it is ready."""
+    from pipeline.stream import astream_batch, stream_batch
+
+    source = "stdin" if path == "-" else path
+    print(f"🚀 Digesting topics from {source} ({concurrency} at a time)...", file=sys.stderr)
+
+    options = dict(max_concurrency=concurrency, ordered=ordered, metrics=metrics,
+                   checkpoint=checkpoint, deadline_s=deadline_s)
+    with ResultWriter(output, archive) as writer:
+        if use_async:
+            async def consume():
+                async for result in astream_batch(graph, iter_topics(path), **options):
+                    writer.write(result)
+
+            asyncio.run(consume())
+        else:
+            for result in stream_batch(graph, iter_topics(path), **options):
+                writer.write(result)
+
+
+def run_sharded(setup, path: str, workers: int, concurrency: int, output: str,
+                metrics=None, ordered: bool = False, archive=None):
+    """Like run_topics, but spread over ``workers`` processes (pipeline/shard.py)."""
+    from pipeline.shard import ShardStats, shard_batch
+
+    source = "stdin" if path == "-" else path
+    print(f"🚀 Digesting topics from {source} on {workers} workers "
+          f"({concurrency} at a time each)...", file=sys.stderr)
+
+    stats = ShardStats()
+    with ResultWriter(output, archive) as writer:
+        for result in shard_batch(setup, iter_topics(path), workers, concurrency, ordered,
+                                  metrics, stats):
+            writer.write(result)
+    return stats.summary()
+
+
+class ResultWriter:
+    """Writes one JSON result per line, flushed, and sums up usage on exit.
+
+    With a pipeline.archive.DigestArchive, every digest that finished
+    without an error is appended to it as well.
+    """
+
+    def __init__(self, output: str, archive=None):
+        from pipeline.usage import RunningUsage
+
+        self.usage = RunningUsage()
+        self.archive = archive
+        self.out = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+
+    def write(self, result: dict) -> None:
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+        self.usage.add(result)
+        if self.archive is not None and result.get("error") is None:
+            self.archive.append(result)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.out is not sys.stdout:
+            self.out.close()
+        if exc[0] is None:
+            self.report()
+
+    def report(self) -> None:
+        usage = self.usage
+        print(f"✅ {usage.topics - usage.failed} digested, ❌ {usage.failed} failed"
+              + (f", ⏰ {usage.degraded} degraded" if usage.degraded else "")
+              + (f", ♻️  {usage.resumed} from checkpoint" if usage.resumed else ""), file=sys.stderr)
+
+        summary = usage.summary()
+        if summary["runs"]:
+            print(f"⏱️  per topic: {summary['avg_latency_s']:.2f}s · "
+                  f"{summary['avg_llm_calls']:.1f} LLM calls · "
+                  f"{summary['avg_input_tokens']:.0f} tokens in / "
+                  f"{summary['avg_output_tokens']:.0f} out", file=sys.stderr)
+
+
+def _node_model(spec: str) -> tuple[str, str]:
+    node, _, model = spec.partition("=")
+    if not node or not model:
+        raise argparse.ArgumentTypeError(f"expected NODE=MODEL, got {spec!r}")
+    return node, model
+
+
+def _percentile(text: str) -> float:
+    value = float(text)
+    if not 0 < value < 100:
+        raise argparse.ArgumentTypeError(f"expected a percentile between 0 and 100, got {text}")
+    return value
+
+
+def _fraction(text: str) -> float:
+    value = float(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"expected a fraction >= 0, got {text}")
+    return value
+
+
+def _similarity(text: str) -> float:
+    value = float(text)
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"expected a similarity in (0, 1], got {text}")
+    return value
+
+
+def _seconds(text: str) -> float:
+    value = float(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"expected seconds >= 0, got {text}")
+    return value
+
+
+def _address(spec: str) -> str:
+    from pipeline.service import parse_address   # cheap: stdlib only until a request runs
+
+    try:
+        parse_address(spec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PORT or HOST:PORT, got {spec!r}") from None
+    return spec
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the News Digest pipeline.")
+    parser.add_argument("--topics", metavar="FILE",
+                        help="digest every topic in FILE (one per line, plain text or "
+                             "{\"topic\": ...} JSONL, '-' for stdin) and write one JSON "
+                             "result per line as each digest completes")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"pipelines in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="spread --topics over N processes, each running --concurrency "
+                             "pipelines with its own graph and LLM client (default: 1)")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", type=_address,
+                        help="run as a long-lived HTTP service: POST /digest {\"topic\": ...}, "
+                             "GET /stats (see pipeline/service.py)")
+    parser.add_argument("--fake-llm", action="store_true",
+                        help="answer with the offline FakeChatModel (clients/fake.py) — no API "
+                             "key, for trying things out locally")
+    parser.add_argument("--record", metavar="CASSETTE",
+                        help="write every LLM prompt/answer pair, with its latency, to "
+                             "CASSETTE (see clients/cassette.py)")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="answer every LLM call from CASSETTE instead of Gemini — offline "
+                             "and the same every time")
+    parser.add_argument("--replay-latency", nargs="?", type=_fraction, const=1.0, default=0.0,
+                        metavar="SCALE",
+                        help="with --replay, wait for the recorded latencies (times SCALE, "
+                             "default: 1.0) instead of answering at once")
+    parser.add_argument("--output", default="-", metavar="FILE",
+                        help="where batch results go (default: stdout)")
+    parser.add_argument("--ordered", action="store_true",
+                        help="write results in input order instead of completion order")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run the batch on one asyncio event loop instead of threads")
+    parser.add_argument("--mode", choices=MODES, default="chain",
+                        help="chain = fetcher → tagger → editor (3 LLM calls), "
+                             "fused = one structured call (default: chain)")
+    parser.add_argument("--tagger", choices=TAGGERS, default="llm",
+                        help="llm = ask Gemini for tags, local = extract them locally and "
+                             "ask Gemini only when unsure (chain mode; default: llm)")
+    parser.add_argument("--node-model", action="append", default=[], metavar="NODE=MODEL",
+                        type=_node_model,
+                        help="give one node its own model, e.g. tagger=gemini-2.5-flash-lite "
+                             "(repeatable; see NODE_MODELS in config/settings.py)")
+    parser.add_argument("--dedup", nargs="?", type=_similarity, const=0.7, metavar="THRESHOLD",
+                        help="reuse the digest of an earlier topic whose wording is at least "
+                             "THRESHOLD similar instead of running the pipeline again "
+                             "(default: 0.7; see pipeline/dedup.py)")
+    parser.add_argument("--cache", nargs="?", const=LLM_CACHE_PATH, metavar="PATH",
+                        help=f"cache LLM answers in memory and in SQLite at PATH "
+                             f"(default: {LLM_CACHE_PATH})")
+    parser.add_argument("--checkpoint", nargs="?", const=CHECKPOINT_PATH, metavar="PATH",
+                        help=f"save every finished node to SQLite at PATH and, when re-run, "
+                             f"skip completed topics and resume the rest (default: {CHECKPOINT_PATH})")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="pace every LLM call through one shared request/token budget "
+                             "and retry 429/5xx with backoff")
+    parser.add_argument("--rpm", type=float, metavar="N",
+                        help=f"requests per minute for --rate-limit (default: {LLM_REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tpm", type=float, metavar="N",
+                        help=f"tokens per minute for --rate-limit (default: {LLM_TOKENS_PER_MINUTE})")
+    parser.add_argument("--deadline", type=_seconds, metavar="SECONDS",
+                        help="give every digest this long; nodes that run out of time fall "
+                             "back to local output and the result is marked \"degraded\"")
+    parser.add_argument("--hedge", nargs="?", type=_percentile, const=95.0, metavar="PCT",
+                        help="when an LLM call runs past the PCT-th percentile of recent "
+                             "latencies, send a duplicate and keep the first answer (default: 95)")
+    parser.add_argument("--hedge-budget", type=_fraction, default=0.1, metavar="FRACTION",
+                        help="at most this many duplicates per LLM call (default: 0.1)")
+    parser.add_argument("--token-budget", action="store_true",
+                        help="compact what each agent puts in its prompt to a per-node token "
+                             "budget and cap its answer (see pipeline/budget.py)")
+    parser.add_argument("--archive", nargs="?", const=ARCHIVE_PATH, metavar="DIR",
+                        help="also append every finished digest to a compressed, indexed archive "
+                             f"(default {ARCHIVE_PATH}; see pipeline/archive.py)")
+    parser.add_argument("--lookup", metavar="TOPIC",
+                        help="print the archived digest of TOPIC as JSON and exit; reads the "
+                             "archive read-only, so a batch may be writing to it")
+    parser.add_argument("--scan", nargs="?", const="", metavar="CATEGORY",
+                        help="print every archived digest (of CATEGORY) as JSON lines and exit")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append one per-node latency/token/memory record per run to FILE "
+                             "(JSONL) and print p50/p95/p99 at the end")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --metrics, also record tracemalloc peaks (slower): per node "
+                             "at --concurrency 1, per run above it")
+    parser.add_argument("--stream", action="store_true",
+                        help="demo run: print the summary, tags and headline token by token "
+                             "as the agents' models stream them (see pipeline/live.py)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="headless: no agent banners on stdout")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not args.topics:
+        parser.error("--workers needs --topics")
+    if args.serve and args.topics:
+        parser.error("--serve and --topics don't mix")
+    if args.stream and (args.topics or args.serve):
+        parser.error("--stream is for the interactive demo run (drop --topics/--serve)")
+    if args.stream and args.mode == "fused":
+        parser.error("--stream needs --mode chain: the fused answer is one JSON object")
+    if args.replay and (args.record or args.fake_llm):
+        parser.error("--replay doesn't mix with --record or --fake-llm")
+    if args.replay and not os.path.exists(args.replay):
+        parser.error(f"no cassette at {args.replay}")
+    querying = args.lookup is not None or args.scan is not None
+    if querying and (args.topics or args.serve):
+        parser.error("--lookup/--scan read the archive; drop --topics/--serve")
+    if args.archive and not (args.topics or querying):
+        parser.error("--archive needs --topics (or --lookup/--scan)")
+    if args.trace_memory and not args.metrics:
+        parser.error("--trace-memory needs --metrics")
+    if args.record and args.workers > 1:
+        parser.error("--record needs a single process (drop --workers)")
+    nodes = MODE_NODES[args.mode]
+    for node, _ in args.node_model:
+        if node not in nodes:
+            parser.error(f"--node-model: no node {node!r} in --mode {args.mode} "
+                         f"(pick one of {', '.join(nodes)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.lookup is not None or args.scan is not None:
+        query_archive(args)
+        return
+    settings.VERBOSE = not args.quiet
+    for node, model in args.node_model:
+        settings.NODE_MODELS.setdefault(node, {})["model"] = model
+    fingerprint = ""
+    if args.checkpoint:
+        # Before any layer touches NODE_MODELS, so every process agrees on it.
+        from pipeline.checkpoint import run_fingerprint
+        fingerprint = run_fingerprint(args.mode, args.tagger, args.token_budget,
+                                      checkpoint_llm(args))
+
+    if args.workers > 1:
+        main_sharded(args, fingerprint)
+        return
+
+    cache = metrics = limiter = checkpoint = hedging = budget = None
+    recording = replay = archive = None
+    hooks = []
+    if args.fake_llm:
+        from clients.fake import FakeChatModel
+        settings.set_llm(FakeChatModel())
+    if args.replay:
+        from clients.cassette import replay_cassette
+        replay = replay_cassette(args.replay, args.replay_latency)
+    if args.record:
+        # The first layer: it records what the real client saw.
+        from clients.cassette import enable_recording
+        recording = enable_recording(args.record)
+    if args.cache:
+        from clients.cache import enable_llm_cache
+        cache = enable_llm_cache(args.cache)
+    if args.hedge:
+        # Below the rate limiter: the hedge clock starts once a call is let through.
+        from clients.hedge import enable_hedging
+        hedging = enable_hedging(args.hedge, args.hedge_budget)
+    if args.rate_limit or args.rpm or args.tpm:
+        from clients.ratelimit import enable_rate_limit
+        limiter = enable_rate_limit(args.rpm or LLM_REQUESTS_PER_MINUTE,
+                                    args.tpm or LLM_TOKENS_PER_MINUTE)
+        if hedging is not None:
+            hedging.limiter = limiter       # duplicates book their own request
+    if args.deadline or args.serve:
+        # Outermost, so the time left reaches the client through every layer.
+        # (The service takes a deadline per request.)
+        from pipeline.deadline import enable_request_timeouts
+        enable_request_timeouts()
+    if args.token_budget:
+        # Innermost of the hooks, so metrics time the node as it runs.
+        from pipeline.budget import TokenBudget, cap_output_tokens
+        cap_output_tokens()
+        budget = TokenBudget()
+        hooks.append(budget.node_hook)
+    if args.metrics:
+        from pipeline.metrics import MetricsRecorder, instrument_node
+        runs_at_once = args.concurrency if args.topics or args.serve else 1
+        metrics = MetricsRecorder(args.metrics, args.trace_memory, concurrency=runs_at_once)
+        hooks.append(instrument_node)
+    if args.checkpoint:
+        from pipeline.checkpoint import CheckpointStore
+        checkpoint = CheckpointStore(args.checkpoint, fingerprint)
+        hooks.append(checkpoint.node_hook)   # outermost: replayed nodes are not timed
+
+    graph = build_graph(args.mode, hooks, args.tagger)
+    if args.dedup:
+        from pipeline.dedup import DedupGraph
+        graph = DedupGraph(graph, args.dedup)
+    if args.archive:
+        from pipeline.archive import DigestArchive
+        archive = DigestArchive(args.archive)
+
+    if args.serve:
+        from pipeline.service import run_service
+        run_service(graph, args.serve, args.concurrency, metrics, checkpoint, args.deadline)
+    elif args.topics:
+        run_topics(graph, args.topics, args.concurrency, args.output, args.use_async, metrics,
+                   checkpoint, args.ordered, args.deadline, archive)
+    else:
+        run_demo(graph, metrics, args.deadline, args.stream)
+
+    if metrics is not None:
+        print(metrics.format_summary(), file=sys.stderr)
+        metrics.close()
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"🗄️  Cache: {stats['memory_hits'] + stats['disk_hits']} hits, "
+              f"{stats['misses']} misses ({stats['hit_rate']:.0%})", file=sys.stderr)
+
+    if checkpoint is not None:
+        report_checkpoint(checkpoint.stats())
+        checkpoint.close()
+
+    if limiter is not None:
+        stats = limiter.stats()
+        print(f"🚦 Rate limit: {stats['calls']} calls, {stats['throttled']} throttled, "
+              f"{stats['retries']} retries, waited {stats['waited_s']:.1f}s "
+              f"(now {stats['requests_per_minute']:.0f} req/min)", file=sys.stderr)
+
+    if hedging is not None:
+        stats = hedging.stats()
+        print(f"⏩ Hedging: {stats['hedged']} duplicates for {stats['calls']} calls "
+              f"({stats['extra_rate']:.1%} extra), {stats['hedge_wins']} won "
+              f"({stats['win_rate']:.0%}), {stats['denied']} over budget", file=sys.stderr)
+
+    if args.dedup:
+        stats = graph.index.stats()
+        print(f"🔁 Dedup: {stats['reused']} of {stats['lookups']} topics reused a digest "
+              f"({stats['hit_rate']:.0%}; {stats['exact']} same words, {stats['near']} near, "
+              f"{stats['waited']} waited for it), {stats['rerun']} rerun", file=sys.stderr)
+
+    if recording is not None:
+        from clients.cassette import disable_recording
+        path = disable_recording(recording)
+        stats = recording.stats()
+        print(f"📼 Recorded {stats['recorded']} new answers to {path} "
+              f"({stats['entries']} in all)", file=sys.stderr)
+
+    if replay is not None:
+        stats = replay.cassette.stats()
+        print(f"📼 Replayed {stats['hits']} answers from {args.replay}, "
+              f"{stats['misses']} not on the cassette", file=sys.stderr)
+
+    if budget is not None:
+        stats = budget.stats()
+        print(f"✂️  Token budget: {stats['compacted']} of {stats['fields']} prompt inputs compacted, "
+              f"{stats['tokens_saved']} tokens saved ({stats['saved_rate']:.0%})", file=sys.stderr)
+
+    if archive is not None:
+        report_archive(archive)
+
+
+def main_sharded(args, fingerprint: str = ""):
+    """--workers N: every worker process sets up its own client layers and graph."""
+    from pipeline.shard import WorkerSetup
+
+    llm_factory = None
+    if args.fake_llm:
+        from clients.fake import FakeChatModel
+        llm_factory = FakeChatModel
+    if args.replay:
+        from clients.cassette import CassetteChatModel
+        llm_factory = functools.partial(CassetteChatModel.from_file, args.replay,
+                                        args.replay_latency)
+    rate_limited = args.rate_limit or args.rpm or args.tpm
+    setup = WorkerSetup(
+        mode=args.mode, tagger=args.tagger, quiet=args.quiet,
+        llm_factory=llm_factory,
+        node_models=settings.NODE_MODELS, cache=args.cache,
+        rpm=(args.rpm or LLM_REQUESTS_PER_MINUTE) if rate_limited else None,
+        tpm=(args.tpm or LLM_TOKENS_PER_MINUTE) if rate_limited else None,
+        hedge=args.hedge, hedge_budget=args.hedge_budget,
+        metrics=bool(args.metrics), trace_memory=args.trace_memory, checkpoint=args.checkpoint,
+        fingerprint=fingerprint, use_async=args.use_async,
+        deadline_s=args.deadline, token_budget=args.token_budget, dedup=args.dedup,
+    )
+    metrics = None
+    if args.metrics:
+        from pipeline.metrics import MetricsRecorder
+        metrics = MetricsRecorder(args.metrics)     # workers trace their own memory
+
+    archive = None
+    if args.archive:
+        # Written by this process alone: workers hand their results back here.
+        from pipeline.archive import DigestArchive
+        archive = DigestArchive(args.archive)
+
+    stats = run_sharded(setup, args.topics, args.workers, args.concurrency, args.output,
+                        metrics, args.ordered, archive)
+    print(f"🧩 Shards: {stats['topics']} topics in {stats['chunks']} chunks "
+          f"(avg {stats['avg_chunk']:.0f}) over {args.workers} workers", file=sys.stderr)
+
+    if metrics is not None:
+        print(metrics.format_summary(), file=sys.stderr)
+        metrics.close()
+
+    if args.checkpoint:
+        from pipeline.checkpoint import CheckpointStore
+        with CheckpointStore(args.checkpoint, fingerprint) as checkpoint:
+            report_checkpoint({**checkpoint.stats(), **stats["checkpoint"]})
+
+    if archive is not None:
+        report_archive(archive)
+
+
+def checkpoint_llm(args) -> str:
+    """Which client answers this run, as far as its checkpoints care."""
+    if args.fake_llm:
+        return "fake"
+    return "replay" if args.replay else "live"
+
+
+def report_checkpoint(stats: dict) -> None:
+    print(f"♻️  Checkpoint: {stats['topics_skipped']} topics already done, "
+          f"{stats['nodes_replayed']} nodes restored, {stats['completed']} completed, "
+          f"{stats['partial']} partial", file=sys.stderr)
+
+
+def query_archive(args) -> None:
+    """--lookup / --scan: read the archive without locking or changing it."""
+    from pipeline.archive import DigestArchive
+
+    with DigestArchive(args.archive or ARCHIVE_PATH, readonly=True) as archive:
+        if args.lookup is not None:
+            digest = archive.get(args.lookup)
+            if digest is None:
+                print(f"🔍 {args.lookup!r} is not in {archive.path}", file=sys.stderr)
+                sys.exit(1)
+            print(json.dumps(digest, ensure_ascii=False))
+            return
+        for digest in archive.scan(args.scan or None):
+            print(json.dumps(digest, ensure_ascii=False))
+
+
+def report_archive(archive) -> None:
+    archive.close()
+    stats = archive.stats()
+    print(f"🗃️  Archive: {stats['appended']} digests added to {archive.path} "
+          f"({stats['records']} in all, {stats['segments']} segments, "
+          f"{stats['compression']:.1f}x compressed, {stats['buffered']} not sealed yet)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
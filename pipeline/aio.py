@@ -0,0 +1,86 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/aio.py  —  Asyncio Pipeline Runner                ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  The async cousin of pipeline/batch.py. Instead of one OS thread
+  per in-flight pipeline, every run is a coroutine on ONE event
+  loop, and the graph awaits the async node twins
+  (afetcher_node, atagger_node, aeditor_node → llm.ainvoke).
+
+  A thread pool tops out at tens of runs; a single loop can keep
+  hundreds of digests waiting on the network at once.
+
+USAGE:
+  import asyncio
+  from main import app
+  from pipeline.aio import arun_batch, astream_digest
+
+  results = asyncio.run(arun_batch(app, topics, max_concurrency=200))
+
+  async for node, accumulated in astream_digest(app, "some topic"):
+      print(node, "finished")
+"""
+
+import asyncio
+import time
+
+from pipeline.batch import DEFAULT_CONCURRENCY, finish_result, initial_state
+from pipeline.usage import UsageTracker
+
+
+async def adigest_topic(app, topic: str, metrics=None, checkpoint=None,
+                        deadline: float = None) -> dict:
+    """Await the whole graph for one topic and never raise."""
+    started = time.perf_counter()
+    tracker = None
+    try:
+        # Inside the try: a broken checkpoint store fails this topic, not the batch.
+        if checkpoint is not None:
+            saved = checkpoint.result(topic)
+            if saved is not None:
+                checkpoint.skipped()
+                return saved
+        tracker = metrics.start_run(topic) if metrics else UsageTracker()
+        state = await app.ainvoke(initial_state(topic, deadline), config={"callbacks": [tracker]})
+        result = finish_result(topic, state, None, started, tracker)
+    except Exception as exc:
+        if tracker is None:
+            tracker = metrics.start_run(topic) if metrics else UsageTracker()
+        result = finish_result(topic, None, exc, started, tracker)
+    if metrics:
+        metrics.finish_run(tracker, result)
+    if checkpoint is not None:
+        checkpoint.save_result(topic, result)
+    return result
+
+
+async def astream_digest(app, topic: str):
+    """Yield (node_name, accumulated_state) after every node finishes."""
+    accumulated = initial_state(topic)
+    async for step in app.astream(initial_state(topic)):
+        for node, node_output in step.items():
+            accumulated.update(node_output)
+            yield node, dict(accumulated)
+
+
+async def arun_batch(app, topics: list[str], max_concurrency: int = DEFAULT_CONCURRENCY,
+                     metrics=None, checkpoint=None, deadline_s: float = None) -> list[dict]:
+    """Digest every topic with at most ``max_concurrency`` coroutines in flight.
+
+    Same contract as pipeline.batch.run_batch: input order, one
+    result per topic, failures land in result["error"].
+    """
+    from pipeline.deadline import deadline_in
+
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    gate = asyncio.Semaphore(max_concurrency)
+
+    async def one(topic: str) -> dict:
+        async with gate:
+            return await adigest_topic(app, topic, metrics, checkpoint, deadline_in(deadline_s))
+
+    return list(await asyncio.gather(*(one(topic) for topic in topics)))
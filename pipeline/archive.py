@@ -0,0 +1,618 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/archive.py  —  Columnar Digest Archive            ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Finished digests used to live only as JSON lines on stdout. This
+  archive keeps millions of them on disk, small and quick to query:
+
+    segments → every SEGMENT_ROWS appended digests are sealed into one
+               immutable file, stored column by column (topic, summary,
+               tags, headline, error, the rest as JSON, and the category
+               parsed from "tags"). Each column is cut into pages of
+               PAGE_ROWS rows, zlib-compressed on its own.
+    index    → a hash table on the normalized topic in one memory-mapped
+               file: get(topic) probes a slot or two and decompresses
+               one page per column — constant time however big the
+               archive grows.
+    scan     → streams the digests of one category. Segments whose
+               header lists no such category are skipped unread, and
+               only the columns asked for are decompressed.
+
+  Appending is a list append plus one JSON line to a tail log; the
+  compression work happens once per sealed segment, when it holds
+  segment_rows digests. close() seals nothing: the rows not sealed yet
+  stay in the tail log, and the next open replays it — so many short
+  runs still fill full-sized segments. If the process dies, the next
+  open does the same, and rebuilds the index for any segment it
+  doesn't cover yet (the index is derived data).
+
+  A topic appended again wins on get(); scan() yields every record in
+  append order. One process writes an archive at a time: opening it takes
+  an exclusive lock on the directory (where fcntl exists) and a
+  second writer gets a RuntimeError.
+
+  readonly=True opens it for queries instead, even while a writer is
+  at work: no lock, nothing on disk is changed or repaired. It sees
+  the archive as it was when opened — segments the index doesn't
+  cover yet are indexed in memory, and the tail log is read, not
+  replayed into a new one.
+
+USAGE:
+  python main.py --topics feed.txt --archive              ← .cache/digests/
+  python main.py --topics feed.txt --archive runs/digests
+
+  python main.py --lookup "Mars rover finds ice"    ← read-only queries
+  python main.py --scan Science --archive runs/digests
+
+  with DigestArchive(".cache/digests") as archive:
+      archive.append(result)
+      archive.get("mars rover finds ice")        # → the result dict, or None
+  with DigestArchive(".cache/digests", readonly=True) as archive:
+      for digest in archive.scan("Science", fields=["headline"]):
+          print(digest["topic"], digest["headline"])
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from hashlib import blake2b
+
+from config.settings import ARCHIVE_PATH as DEFAULT_ARCHIVE_PATH
+
+try:
+    import fcntl
+except ImportError:      # Windows: no writer lock
+    fcntl = None
+
+SEGMENT_ROWS = 4096
+PAGE_ROWS = 256
+COMPRESSION_LEVEL = 6
+# Decompressed pages kept around for repeated lookups.
+PAGE_CACHE = 64
+
+# Digest fields with a column of their own; everything else ("usage",
+# "degraded", "duplicate_of", …) is kept as JSON in "extra".
+FIELDS = ("topic", "summary", "tags", "headline", "error")
+COLUMNS = FIELDS + ("extra", "category")
+
+_SEGMENT_MAGIC = b"DIGSEG1\n"
+_INDEX_MAGIC = b"DIGIDX1\n"
+_INDEX_HEADER = struct.Struct("<8sQQQ")   # magic, slots, used, segments indexed
+_SLOT = struct.Struct("<QII")             # topic hash (0 = empty), segment, row
+_INITIAL_SLOTS = 1024
+_NULL = 0xFFFFFFFF                        # string length that stands for None
+
+_WORD = re.compile(r"\w+")
+_CATEGORY = re.compile(r"Category:\s*([^.,;\n]+)", re.IGNORECASE)
+
+
+# ─── KEYS ─────────────────────────────────────────────────────────────────────
+def topic_key(topic: str) -> str:
+    """The topic as looked up: case, punctuation and spacing don't count."""
+    return " ".join(_WORD.findall(topic.casefold()))
+
+
+def parse_category(tags) -> str:
+    """"Keywords: a, b. Category: Science" → "Science" ("" if there is none)."""
+    match = _CATEGORY.search(tags or "")
+    return match.group(1).strip() if match else ""
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+
+# ─── COLUMN ENCODING ──────────────────────────────────────────────────────────
+def _little(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode_strings(values) -> bytes:
+    """uint32 lengths (_NULL for None), then the UTF-8 bytes back to back."""
+    lengths, parts = array("I"), []
+    for value in values:
+        if value is None:
+            lengths.append(_NULL)
+            continue
+        data = value.encode()
+        lengths.append(len(data))
+        parts.append(data)
+    return _little(lengths) + b"".join(parts)
+
+
+def _decode_strings(data: bytes, rows: int) -> list:
+    out, position = [], 4 * rows
+    for length in _from_little("I", data[:position]):
+        if length == _NULL:
+            out.append(None)
+            continue
+        out.append(data[position:position + length].decode())
+        position += length
+    return out
+
+
+def _row(result: dict) -> dict:
+    """A result dict as one row of column values."""
+    row = {name: None if result.get(name) is None else str(result[name]) for name in FIELDS}
+    extra = {k: v for k, v in result.items() if k not in FIELDS}
+    row["extra"] = json.dumps(extra, ensure_ascii=False, separators=(",", ":")) if extra else None
+    row["category"] = parse_category(row["tags"])
+    return row
+
+
+def _record(row: dict, fields=None) -> dict:
+    """Column values back into the result dict that was appended."""
+    record = {name: row[name] for name in FIELDS if row.get(name) is not None}
+    if "error" in row:
+        record["error"] = row["error"]
+    if row.get("extra"):
+        record.update(json.loads(row["extra"]))
+    if fields is not None:
+        record = {k: v for k, v in record.items() if k == "topic" or k in fields}
+    return record
+
+
+def _columns_for(fields) -> tuple:
+    if fields is None:
+        return COLUMNS[:-1]
+    wanted = {"topic", *fields}
+    if wanted - set(FIELDS):
+        wanted.add("extra")
+    return tuple(name for name in COLUMNS if name in wanted)
+
+
+# ─── SEGMENTS ─────────────────────────────────────────────────────────────────
+def _write_segment(path: str, rows: list, level: int) -> None:
+    categories = sorted({row["category"] for row in rows})
+    codes = {category: i for i, category in enumerate(categories)}
+    blobs, columns, offset, raw = [], {}, 0, 0
+    for name in COLUMNS:
+        pages = []
+        for start in range(0, len(rows), PAGE_ROWS):
+            chunk = rows[start:start + PAGE_ROWS]
+            if name == "category":
+                data = _little(array("H", (codes[row["category"]] for row in chunk)))
+            else:
+                data = _encode_strings(row[name] for row in chunk)
+            blob = zlib.compress(data, level)
+            pages.append([offset, len(blob)])
+            blobs.append(blob)
+            offset += len(blob)
+            raw += len(data)
+        columns[name] = pages
+    counts = Counter(row["category"] for row in rows)
+    header = json.dumps({
+        "rows": len(rows), "page_rows": PAGE_ROWS, "columns": columns, "raw_bytes": raw,
+        "categories": categories, "category_counts": [counts[c] for c in categories],
+    }).encode()
+
+    partial = path + ".partial"
+    with open(partial, "wb") as file:
+        file.write(_SEGMENT_MAGIC + struct.pack("<I", len(header)) + header)
+        for blob in blobs:
+            file.write(blob)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+
+
+class _Segment:
+    """One sealed segment file, memory-mapped read-only."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_SEGMENT_MAGIC)] != _SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not an archive segment")
+        start = len(_SEGMENT_MAGIC)
+        (length,) = struct.unpack_from("<I", self._map, start)
+        self.header = json.loads(self._map[start + 4:start + 4 + length])
+        self._base = start + 4 + length
+        self.rows = self.header["rows"]
+        self.pages = len(self.header["columns"]["topic"])
+        self.size = len(self._map)
+
+    def has(self, category: str) -> bool:
+        return any(c.casefold() == category for c in self.header["categories"])
+
+    def page(self, name: str, number: int) -> list:
+        """Decompress page ``number`` of column ``name``."""
+        offset, length = self.header["columns"][name][number]
+        data = zlib.decompress(self._map[self._base + offset:self._base + offset + length])
+        if name == "category":
+            categories = self.header["categories"]
+            return [categories[code] for code in _from_little("H", data)]
+        page_rows = self.header["page_rows"]
+        return _decode_strings(data, min(page_rows, self.rows - number * page_rows))
+
+    def close(self) -> None:
+        self._map.close()
+
+
+# ─── THE TOPIC INDEX ──────────────────────────────────────────────────────────
+class _HashIndex:
+    """Open-addressing hash table, topic hash → (segment, row), in an mmap'd file.
+
+    Two topics are told apart by their 64-bit hash alone when they are
+    written; lookups check the topic itself.
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        if not readonly and not self._valid(path):
+            self._create(path, _INITIAL_SLOTS)
+        self._open()
+
+    @staticmethod
+    def _valid(path: str) -> bool:
+        try:
+            with open(path, "rb") as file:
+                head = file.read(_INDEX_HEADER.size)
+                magic, slots, _, _ = _INDEX_HEADER.unpack(head)
+                file.seek(0, os.SEEK_END)
+                return magic == _INDEX_MAGIC and file.tell() == _INDEX_HEADER.size + slots * _SLOT.size
+        except (OSError, struct.error):
+            return False
+
+    @staticmethod
+    def _create(path: str, slots: int) -> None:
+        with open(path, "wb") as file:
+            file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, slots, 0, 0))
+            file.truncate(_INDEX_HEADER.size + slots * _SLOT.size)
+
+    def _open(self) -> None:
+        if self.readonly:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._file = open(self.path, "r+b")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        _, self.slots, self.used, self.segments = _INDEX_HEADER.unpack_from(self._map, 0)
+
+    def close(self) -> None:
+        if not self.readonly:
+            self.flush()
+        self._map.close()
+        self._file.close()
+
+    def flush(self) -> None:
+        _INDEX_HEADER.pack_into(self._map, 0, _INDEX_MAGIC, self.slots, self.used, self.segments)
+        self._map.flush()
+
+    def _probe(self, h: int):
+        """(slot, stored hash, segment, row) for ``h``, or the empty slot it would go in."""
+        mask = self.slots - 1
+        slot = h & mask
+        while True:
+            stored, segment, row = _SLOT.unpack_from(self._map, _INDEX_HEADER.size + slot * _SLOT.size)
+            if stored in (0, h):
+                return slot, stored, segment, row
+            slot = (slot + 1) & mask
+
+    def get(self, h: int):
+        _, stored, segment, row = self._probe(h)
+        return (segment, row) if stored else None
+
+    def put(self, h: int, segment: int, row: int) -> None:
+        if (self.used + 1) * 2 > self.slots:
+            self._grow()
+        slot, stored, _, _ = self._probe(h)
+        if not stored:
+            self.used += 1
+        _SLOT.pack_into(self._map, _INDEX_HEADER.size + slot * _SLOT.size, h, segment, row)
+
+    def entries(self):
+        for slot in range(self.slots):
+            entry = _SLOT.unpack_from(self._map, _INDEX_HEADER.size + slot * _SLOT.size)
+            if entry[0]:
+                yield entry
+
+    def _grow(self) -> None:
+        entries, segments = list(self.entries()), self.segments
+        partial = self.path + ".partial"
+        self._create(partial, self.slots * 2)
+        self._map.close()
+        self._file.close()
+        os.replace(partial, self.path)
+        self._open()
+        self.segments = segments
+        for h, segment, row in entries:
+            self.put(h, segment, row)
+
+
+# ─── THE ARCHIVE ──────────────────────────────────────────────────────────────
+class DigestArchive:
+    """Append-only, columnar, compressed store of digest results.
+
+    ``readonly=True`` queries an existing archive without locking or
+    changing it; append() and flush() then raise RuntimeError.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH, segment_rows: int = SEGMENT_ROWS,
+                 level: int = COMPRESSION_LEVEL, readonly: bool = False):
+        self.path = path
+        self.segment_rows = segment_rows
+        self.level = level
+        self.readonly = readonly
+        if readonly:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f"no archive at {path}")
+            self._writer = None
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._writer = self._lock_writer(path)
+
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()     # (segment, column, page) → values
+        self._buffer = []               # rows not sealed yet
+        self._pending = {}              # topic key → position in _buffer
+        self._appended = 0
+        self._unindexed = {}            # readonly: topic hash → (segment, row) the index lacks
+        self._closed = False
+
+        self._segments = []
+        while os.path.exists(self._segment_path(len(self._segments))):
+            self._segments.append(_Segment(self._segment_path(len(self._segments))))
+
+        if readonly:
+            self._open_readonly()
+            return
+        self._index = _HashIndex(os.path.join(path, "index.bin"))
+        if self._index.segments > len(self._segments):
+            self._index.close()
+            os.remove(self._index.path)
+            self._index = _HashIndex(self._index.path)
+        for number in range(self._index.segments, len(self._segments)):
+            self._index_segment(number)
+        self._index.flush()
+
+        self._open_tail()
+
+    def _open_readonly(self) -> None:
+        """Map what is on disk as it is; index in memory what the index file lacks."""
+        path = os.path.join(self.path, "index.bin")
+        self._index = _HashIndex(path, readonly=True) if _HashIndex._valid(path) else None
+        covered = self._index.segments if self._index is not None else 0
+        if covered > len(self._segments):          # not a snapshot we can trust
+            self._index.close()
+            self._index, covered = None, 0
+        for number in range(covered, len(self._segments)):
+            segment = self._segments[number]
+            for page in range(segment.pages):
+                for i, topic in enumerate(segment.page("topic", page)):
+                    self._unindexed[_hash(topic_key(topic))] = (number, page * PAGE_ROWS + i)
+
+        self._tail = None
+        current = self._tail_path(len(self._segments))
+        if os.path.exists(current):
+            with open(current, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        self._buffer_row(_row(json.loads(line)))
+                    except ValueError:
+                        pass                               # being written, or cut short
+
+    def _locate(self, h: int):
+        """(segment, row) of topic hash ``h``, or None."""
+        found = self._unindexed.get(h)
+        if found is None and self._index is not None:
+            found = self._index.get(h)
+        # A writer may have sealed segments since this read-only open.
+        if found is None or found[0] >= len(self._segments) \
+                or found[1] >= self._segments[found[0]].rows:
+            return None
+        return found
+
+    @staticmethod
+    def _lock_writer(path: str):
+        """The open lock file that makes this process the archive's one writer."""
+        writer = open(os.path.join(path, "LOCK"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(writer.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                writer.close()
+                raise RuntimeError(f"{path} is already open for writing elsewhere") from None
+        return writer
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.path, f"seg-{number:06d}.dseg")
+
+    def _tail_path(self, number: int) -> str:
+        return os.path.join(self.path, f"tail-{number:06d}.jsonl")
+
+    def _index_segment(self, number: int) -> None:
+        segment = self._segments[number]
+        for page in range(segment.pages):
+            for i, topic in enumerate(segment.page("topic", page)):
+                self._index.put(_hash(topic_key(topic)), number, page * PAGE_ROWS + i)
+        self._index.segments = number + 1
+
+    def _open_tail(self) -> None:
+        """Replay the tail log of the segment being filled; drop stale ones."""
+        current = self._tail_path(len(self._segments))
+        for name in os.listdir(self.path):
+            if name.startswith("tail-") and os.path.join(self.path, name) != current:
+                os.remove(os.path.join(self.path, name))   # its segment was sealed
+        line = "\n"
+        if os.path.exists(current):
+            with open(current, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        self._buffer_row(_row(json.loads(line)))
+                    except ValueError:
+                        pass                               # cut short by a crash
+        self._tail = open(current, "a", encoding="utf-8")
+        if not line.endswith("\n"):
+            self._tail.write("\n")
+
+    def _buffer_row(self, row: dict) -> None:
+        self._pending[topic_key(row["topic"])] = len(self._buffer)
+        self._buffer.append(row)
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+    def _writable(self) -> None:
+        if self.readonly:
+            raise RuntimeError(f"{self.path} is open read-only")
+
+    def append(self, result: dict) -> None:
+        """Add one result dict (at least a "topic")."""
+        self._writable()
+        row = _row(result)
+        line = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._tail.write(line + "\n")
+            self._tail.flush()
+            self._buffer_row(row)
+            self._appended += 1
+            if len(self._buffer) >= self.segment_rows:
+                self._seal()
+
+    def flush(self) -> None:
+        """Seal whatever is buffered into a segment, however few rows it holds."""
+        self._writable()
+        with self._lock:
+            if self._buffer:
+                self._seal()
+
+    def _seal(self) -> None:
+        number = len(self._segments)
+        _write_segment(self._segment_path(number), self._buffer, self.level)
+        self._segments.append(_Segment(self._segment_path(number)))
+        self._index_segment(number)
+        self._index.flush()
+        self._tail.close()
+        os.remove(self._tail_path(number))
+        self._buffer, self._pending = [], {}
+        self._tail = open(self._tail_path(number + 1), "a", encoding="utf-8")
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+    def _page(self, number: int, name: str, page: int) -> list:
+        key = (number, name, page)
+        values = self._pages.get(key)
+        if values is None:
+            values = self._segments[number].page(name, page)
+            self._pages[key] = values
+            if len(self._pages) > PAGE_CACHE:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(key)
+        return values
+
+    def get(self, topic: str):
+        """The latest result appended for ``topic``, or None."""
+        key = topic_key(topic)
+        with self._lock:
+            position = self._pending.get(key)
+            if position is not None:
+                return _record(self._buffer[position])
+            found = self._locate(_hash(key))
+            if found is None:
+                return None
+            number, row = found
+            page, i = divmod(row, PAGE_ROWS)
+            if topic_key(self._page(number, "topic", page)[i]) != key:
+                return None
+            return _record({name: self._page(number, name, page)[i] for name in COLUMNS[:-1]})
+
+    def __contains__(self, topic: str) -> bool:
+        return self.get(topic) is not None
+
+    def scan(self, category: str = None, fields=None):
+        """Yield every record (of ``category``, if given) in append order.
+
+        ``fields`` limits the records — and the columns decompressed —
+        to those keys (plus "topic").
+        """
+        wanted = category.strip().casefold() if category is not None else None
+        columns = _columns_for(fields)
+        with self._lock:
+            segments, buffered = list(self._segments), list(self._buffer)
+        for segment in segments:
+            if wanted is not None and not segment.has(wanted):
+                continue
+            for page in range(segment.pages):
+                rows = None
+                if wanted is not None:
+                    rows = [i for i, c in enumerate(segment.page("category", page))
+                            if c.casefold() == wanted]
+                    if not rows:
+                        continue
+                values = {name: segment.page(name, page) for name in columns}
+                for i in rows if rows is not None else range(len(values["topic"])):
+                    yield _record({name: values[name][i] for name in columns}, fields)
+        for row in buffered:
+            if wanted is None or row["category"].casefold() == wanted:
+                yield _record(row, fields)
+
+    def categories(self) -> Counter:
+        """Records per category, read from the segment headers alone."""
+        with self._lock:
+            counts = Counter(row["category"] for row in self._buffer)
+            for segment in self._segments:
+                counts.update(dict(zip(segment.header["categories"],
+                                       segment.header["category_counts"])))
+        return counts
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(segment.rows for segment in self._segments) + len(self._buffer)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = sum(segment.size for segment in self._segments)
+            raw = sum(segment.header["raw_bytes"] for segment in self._segments)
+            return {
+                "records": sum(segment.rows for segment in self._segments) + len(self._buffer),
+                "segments": len(self._segments),
+                "buffered": len(self._buffer),
+                "appended": self._appended,
+                "bytes": size,
+                "raw_bytes": raw,
+                "compression": raw / size if size else 0.0,
+            }
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+    def close(self) -> None:
+        """Release the archive; buffered rows wait in the tail log for the next open."""
+        if self._closed:
+            return
+        with self._lock:
+            self._closed = True
+            if self._tail is not None:
+                self._tail.close()
+            if self._index is not None:
+                self._index.close()
+            for segment in self._segments:
+                segment.close()
+            self._pages.clear()
+            if self._writer is not None:
+                self._writer.close()    # and with it the lock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
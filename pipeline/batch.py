@@ -0,0 +1,165 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/batch.py  —  Concurrent Batch Runner              ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Pushes many topics through ONE compiled graph at the same time.
+  Every topic gets its own DigestState, so the runs never share
+  data — they only share the worker threads.
+
+  Input  → a list of topic strings
+  Output → one result dict per topic, in the SAME order as the input
+
+  Each result is a full DigestState plus:
+    "error" → None when the run finished, or "Type: msg" when that
+              topic's run raised (the others carry on)
+    "usage" → latency_s, llm_calls, llm_seconds, input_tokens,
+              output_tokens for that one run
+
+USAGE:
+  from main import app
+  from pipeline.batch import run_batch
+
+  results = run_batch(app, ["topic one", "topic two"], max_concurrency=16)
+
+  Pass checkpoint=pipeline.checkpoint.CheckpointStore(...) to skip
+  topics a previous run already completed.
+"""
+
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import DigestState
+
+# How many pipelines may be in flight at once when the caller doesn't say.
+DEFAULT_CONCURRENCY = 8
+
+
+def initial_state(topic: str, deadline: float = None) -> DigestState:
+    """The empty DigestState every run starts from.
+
+    With a ``deadline`` (a time.time() timestamp), nodes that run out
+    of time fall back to local output — see pipeline/deadline.py.
+    """
+    state = {"topic": topic, "summary": "", "tags": "", "headline": ""}
+    if deadline is not None:
+        state.update(deadline=deadline, degraded=[])
+    return state
+
+
+def parse_topic_line(line: str):
+    """The topic on one input line, or None for blanks and "#" comments.
+
+    A line is either plain text or a JSON object with a "topic" key,
+    so topic files and JSONL feeds both work.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        topic = json.loads(line).get("topic")
+        if not isinstance(topic, str) or not topic.strip():
+            raise ValueError(f"JSONL line without a \"topic\" string: {line[:80]}")
+        return topic.strip()
+    return line
+
+
+def iter_topics(path: str):
+    """Yield topics one line at a time from a file ("-" means stdin).
+
+    Nothing is read ahead, so memory stays flat however long the input is.
+    A malformed line is reported on stderr, with its line number, and
+    skipped — one bad line must not end a run that is already paying
+    for the others.
+    """
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for number, line in enumerate(f, 1):
+            try:
+                topic = parse_topic_line(line)
+            except ValueError as exc:
+                print(f"⚠️  {path}:{number}: skipped — {exc}", file=sys.stderr)
+                continue
+            if topic is not None:
+                yield topic
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_topics(path: str) -> list[str]:
+    """Every topic in a file ("-" means stdin), as a list.
+
+    Blank lines, lines starting with "#" and malformed lines are skipped.
+    """
+    return list(iter_topics(path))
+
+
+def finish_result(topic: str, state, error, started: float, tracker) -> dict:
+    """Shape one run's outcome into the result dict both runners return."""
+    if error is not None:
+        result = {**initial_state(topic), "error": f"{type(error).__name__}: {error}"}
+    else:
+        result = {**state, "error": None}
+    result["usage"] = {"latency_s": round(time.perf_counter() - started, 4), **tracker.totals()}
+    return result
+
+
+def digest_topic(app, topic: str, metrics=None, checkpoint=None, deadline: float = None) -> dict:
+    """Run the whole graph for one topic and never raise.
+
+    With a pipeline.metrics.MetricsRecorder, the run also emits its
+    per-node record. With a pipeline.checkpoint.CheckpointStore, a
+    topic that already completed returns its saved result. With a
+    ``deadline``, the result may come back "degraded".
+    """
+    from pipeline.usage import UsageTracker   # langchain_core: import on first run, not at startup
+
+    started = time.perf_counter()
+    tracker = None
+    try:
+        # Inside the try: a broken checkpoint store fails this topic, not the batch.
+        if checkpoint is not None:
+            saved = checkpoint.result(topic)
+            if saved is not None:
+                checkpoint.skipped()
+                return saved
+        tracker = metrics.start_run(topic) if metrics else UsageTracker()
+        state = app.invoke(initial_state(topic, deadline), config={"callbacks": [tracker]})
+        result = finish_result(topic, state, None, started, tracker)
+    except Exception as exc:
+        if tracker is None:
+            tracker = metrics.start_run(topic) if metrics else UsageTracker()
+        result = finish_result(topic, None, exc, started, tracker)
+    if metrics:
+        metrics.finish_run(tracker, result)
+    if checkpoint is not None:
+        checkpoint.save_result(topic, result)
+    return result
+
+
+def run_batch(app, topics: list[str], max_concurrency: int = DEFAULT_CONCURRENCY,
+              metrics=None, checkpoint=None, deadline_s: float = None) -> list[dict]:
+    """Digest every topic with at most ``max_concurrency`` runs in flight.
+
+    Wall-clock time grows with len(topics) / max_concurrency, not with
+    len(topics). Results come back in input order. ``deadline_s`` gives
+    every run that many seconds from the moment it starts.
+    """
+    from pipeline.deadline import deadline_in, reserve_node_threads
+
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    if not topics:
+        return []
+
+    workers = min(max_concurrency, len(topics))
+    if deadline_s is not None:
+        reserve_node_threads(workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="digest") as pool:
+        return list(pool.map(
+            lambda topic: digest_topic(app, topic, metrics, checkpoint, deadline_in(deadline_s)),
+            topics))
@@ -0,0 +1,187 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/budget.py  —  Prompt Token Budgets                ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  The tagger and the editor paste the fetcher's summary (and the
+  tags) into their prompts word for word. A chatty answer — "Sure!
+  Here's a summary:", markdown, a closing "Let me know if…" — is
+  paid for again by every later call, in tokens and in latency.
+
+  TokenBudget is a build_graph() hook. Before a node runs, it counts
+  the tokens of every state field the node puts in its prompt
+  (PROMPT_TOKEN_BUDGETS in config/settings.py) and compacts them:
+
+    normalize   → runs of whitespace become one space
+    strip       → LLM boilerplate: preambles, "Summary:" labels,
+                  markdown emphasis, headings and bullets, sign-offs
+    cut         → whole sentences up to the field's budget; a single
+                  over-long sentence is cut on a word boundary
+
+  The node gets a compacted COPY of the state; the stored state, and
+  so the digest itself, keeps the full text. Saved tokens are credited
+  to the node in the run's metrics record ("tokens_saved").
+
+  cap_output_tokens() caps each node's answer (OUTPUT_TOKEN_CAPS) by
+  giving it a max_output_tokens in NODE_MODELS — a node that sets its
+  own keeps it.
+
+  Tokens are counted locally, without a tokenizer download: a word
+  piece of up to four characters or one punctuation mark per token,
+  which lands close to Gemini's own count on English news text.
+
+USAGE:
+  python main.py --topics topics.txt --token-budget --metrics runs.jsonl
+
+  budget = TokenBudget()
+  cap_output_tokens()
+  graph = build_graph(hooks=[budget.node_hook, instrument_node])
+  print(budget.stats())
+"""
+
+import functools
+import inspect
+import re
+import threading
+
+from config.settings import NODE_MODELS, OUTPUT_TOKEN_CAPS, PROMPT_TOKEN_BUDGETS
+from pipeline.metrics import record_tokens_saved
+
+_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+# LLM boilerplate at the start or the end of a line.
+_PREAMBLE = re.compile(
+    r"^[ \t]*(?:(?:sure|okay|ok|certainly|of course|absolutely)[!.,]*[ \t]+)?"
+    r"here(?:'s| is| are)\b[^:\n]*:[ \t]*"
+    r"|^[ \t]*(?:sure|okay|ok|certainly|of course|absolutely)[!.,]+[ \t]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+_SIGN_OFF = re.compile(
+    r"(?:^|(?<=[.!?])[ \t]+)(?:let me know|i hope (?:this|that)|hope (?:this|that) helps"
+    r"|feel free|would you like|if you(?:'d| would) like)\b[^\n]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_LABEL = re.compile(r"^\s*(?:summary|news summary|headline)\s*:\s*", re.IGNORECASE | re.MULTILINE)
+_MARKUP = re.compile(r"^\s*(?:#{1,6}|[-*•]|\d+[.)])\s+|\*\*|__|`", re.MULTILINE)
+
+
+def count_tokens(text: str) -> int:
+    """Local estimate of how many tokens ``text`` costs in a prompt."""
+    return len(_TOKEN.findall(text))
+
+
+def strip_boilerplate(text: str) -> str:
+    """``text`` without LLM preambles, labels, markdown and sign-offs."""
+    for pattern in (_PREAMBLE, _SIGN_OFF, _MARKUP, _LABEL):
+        text = pattern.sub("", text)
+    return text
+
+
+def _cut_words(text: str, budget: int) -> str:
+    kept, used = [], 0
+    for word in text.split(" "):
+        used += count_tokens(word)
+        if used > budget:
+            break
+        kept.append(word)
+    return " ".join(kept).rstrip(" ,;:") + "…"
+
+
+def compact(text: str, budget: int) -> str:
+    """``text`` stripped of boilerplate and cut to at most ``budget`` tokens."""
+    stripped = " ".join(strip_boilerplate(text).split())
+    # Boilerplate that was the whole answer is better than nothing.
+    text = stripped or " ".join(text.split())
+    if count_tokens(text) <= budget:
+        return text
+
+    kept, used = [], 0
+    for sentence in _SENTENCE_END.split(text):
+        cost = count_tokens(sentence)
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+    return _cut_words(text, budget - 1)      # one token for the "…"
+
+
+def cap_output_tokens(caps: dict = None) -> None:
+    """Give every node in ``caps`` (default OUTPUT_TOKEN_CAPS) a max_output_tokens.
+
+    Call it before the first LLM call: per-node clients are built once.
+    """
+    for node, cap in (OUTPUT_TOKEN_CAPS if caps is None else caps).items():
+        NODE_MODELS.setdefault(node, {}).setdefault("max_output_tokens", cap)
+
+
+# ─── THE NODE HOOK ────────────────────────────────────────────────────────────
+class TokenBudget:
+    """Compacts each node's prompt inputs to its budget and counts the savings."""
+
+    def __init__(self, budgets: dict = None):
+        self.budgets = PROMPT_TOKEN_BUDGETS if budgets is None else budgets
+        self._lock = threading.Lock()
+        self.fields = 0             # fields looked at
+        self.compacted = 0          # fields the node saw compacted
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def compact_state(self, name: str, state):
+        """A copy of ``state`` with node ``name``'s inputs within budget."""
+        compacted = dict(state)
+        before = after = changed = seen = 0
+        for field, budget in self.budgets.get(name, {}).items():
+            text = state.get(field)
+            if not isinstance(text, str) or not text:
+                continue
+            short = compact(text, budget)
+            seen += 1
+            before += count_tokens(text)
+            after += count_tokens(short)
+            if short != text:
+                compacted[field] = short
+                changed += 1
+
+        with self._lock:
+            self.fields += seen
+            self.compacted += changed
+            self.tokens_before += before
+            self.tokens_after += after
+        if before > after:
+            record_tokens_saved(name, before - after)
+        return compacted
+
+    def node_hook(self, name: str, fn):
+        """build_graph() hook: run ``fn`` on a compacted copy of the state.
+
+        Nodes without a budget run untouched.
+        """
+        if not self.budgets.get(name):
+            return fn
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def budgeted(state):
+                return await fn(self.compact_state(name, state))
+            return budgeted
+
+        @functools.wraps(fn)
+        def budgeted(state):
+            return fn(self.compact_state(name, state))
+        return budgeted
+
+    def stats(self) -> dict:
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "fields": self.fields,
+                "compacted": self.compacted,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": saved,
+                "saved_rate": saved / self.tokens_before if self.tokens_before else 0.0,
+            }
@@ -0,0 +1,240 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/checkpoint.py  —  Resumable Batch Checkpoints     ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  A long batch that dies at 80% should not start over. This store
+  writes every finished node's output to SQLite, keyed by topic:
+
+    node_outputs → what each node returned for a topic
+                   (written as soon as the node finishes)
+    results      → the final result dict of every topic that
+                   completed without an error
+
+  On the next run over the same store:
+    completed topic     → its saved result is returned, no graph run
+    half-finished topic → the graph runs again, but every node that
+                          already finished hands back its saved output
+                          instead of calling the LLM; work resumes at
+                          the first node that has no checkpoint
+
+  Two pieces do this:
+    CheckpointStore.node_hook  → a build_graph() hook around each node
+    run_batch(checkpoint=...)  → skips topics that already completed
+
+  Failed runs are not saved in `results`, so they are retried — from
+  their last finished node.
+
+  Every row is keyed by a run fingerprint as well as the topic: a hash
+  of what else decides the digest (mode, tagger, models, prompt
+  settings and the agents' prompt code, see run_fingerprint()). Change
+  any of them and the same store starts those topics afresh instead of
+  handing back digests made another way.
+
+  A saved result keeps no "usage" block — that run's cost was already
+  counted. It comes back marked "from_checkpoint": True instead.
+
+USAGE:
+  from main import build_graph
+  from pipeline.batch import run_batch
+  from pipeline.checkpoint import CheckpointStore
+
+  fingerprint = run_fingerprint(mode="chain", tagger="llm")
+  with CheckpointStore(".cache/checkpoints.sqlite", fingerprint) as store:
+      graph = build_graph(hooks=[store.node_hook])
+      results = run_batch(graph, topics, checkpoint=store)
+"""
+
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+
+import config.settings as settings
+from config.settings import CHECKPOINT_PATH as DEFAULT_CHECKPOINT_PATH
+from config.settings import announce
+
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents")
+
+
+def run_fingerprint(mode: str = "chain", tagger: str = "llm", token_budget: bool = False,
+                    llm: str = "live") -> str:
+    """A short hash of everything besides the topic that shapes a digest.
+
+    ``llm`` names the client ("live", "fake", "replay"). Models come
+    from settings.NODE_MODELS, so call this after --node-model is applied.
+    """
+    prompts = {}
+    for path in sorted(glob.glob(os.path.join(AGENTS_DIR, "*.py"))):
+        with open(path, "rb") as f:
+            prompts[os.path.basename(path)] = hashlib.sha256(f.read()).hexdigest()
+    inputs = {
+        "mode": mode,
+        "tagger": tagger if mode == "chain" else None,
+        "llm": llm,
+        "model": settings.LLM_MODEL,
+        "temperature": settings.LLM_TEMPERATURE,
+        "node_models": settings.NODE_MODELS,
+        "token_budget": ([settings.PROMPT_TOKEN_BUDGETS, settings.OUTPUT_TOKEN_CAPS]
+                         if token_budget else None),
+        "prompts": prompts,
+    }
+    blob = json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """Per-node outputs and final results of a batch, in one SQLite file.
+
+    ``fingerprint`` (from run_fingerprint()) scopes every row: rows saved
+    under another fingerprint are neither replayed nor counted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, fingerprint: str = ""):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._prefix = f"{fingerprint}:" if fingerprint else ""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counts = {"topics_skipped": 0, "nodes_replayed": 0, "nodes_saved": 0}
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS node_outputs ("
+            " topic TEXT NOT NULL, node TEXT NOT NULL, output TEXT NOT NULL,"
+            " PRIMARY KEY (topic, node))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (topic TEXT PRIMARY KEY, result TEXT NOT NULL)"
+        )
+
+    def _key(self, topic: str) -> str:
+        return self._prefix + topic
+
+    # ── Node outputs ─────────────────────────────────────────────────────────
+    def node_output(self, topic: str, node: str):
+        """What ``node`` returned for ``topic`` last time, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM node_outputs WHERE topic = ? AND node = ?",
+                (self._key(topic), node),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_node(self, topic: str, node: str, output: dict) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO node_outputs (topic, node, output) VALUES (?, ?, ?)",
+                (self._key(topic), node, json.dumps(output, ensure_ascii=False)),
+            )
+            self._counts["nodes_saved"] += 1
+
+    def finished_nodes(self, topic: str) -> list[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT node FROM node_outputs WHERE topic = ? ORDER BY rowid", (self._key(topic),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ── Final results ────────────────────────────────────────────────────────
+    def result(self, topic: str):
+        """The saved result of a topic that completed, or None.
+
+        It has no "usage" block and is marked "from_checkpoint": True.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM results WHERE topic = ?", (self._key(topic),)
+            ).fetchone()
+        return {**json.loads(row[0]), "from_checkpoint": True} if row else None
+
+    def save_result(self, topic: str, result: dict) -> None:
+        """Remember a completed topic; failed and degraded results are ignored."""
+        if result.get("error") is not None or result.get("degraded"):
+            return
+        saved = {key: value for key, value in result.items()
+                 if key not in ("usage", "from_checkpoint")}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (topic, result) VALUES (?, ?)",
+                (self._key(topic), json.dumps(saved, ensure_ascii=False)),
+            )
+
+    def skipped(self) -> None:
+        with self._lock:
+            self._counts["topics_skipped"] += 1
+
+    # ── The node hook ────────────────────────────────────────────────────────
+    def node_hook(self, name: str, fn):
+        """build_graph() hook: replay ``name``'s saved output, or run and save it."""
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def checkpointed(state):
+                saved = self._replay(name, state)
+                if saved is not None:
+                    return saved
+                output = await fn(state)
+                if not output.get("degraded"):      # a deadline fallback — redo it next time
+                    self.save_node(state["topic"], name, output)
+                return output
+            return checkpointed
+
+        @functools.wraps(fn)
+        def checkpointed(state):
+            saved = self._replay(name, state)
+            if saved is not None:
+                return saved
+            output = fn(state)
+            if not output.get("degraded"):
+                self.save_node(state["topic"], name, output)
+            return output
+        return checkpointed
+
+    def _replay(self, name: str, state):
+        saved = self.node_output(state["topic"], name)
+        if saved is not None:
+            announce(f"\n♻️  [{name.upper()}] Restored from checkpoint")
+            with self._lock:
+                self._counts["nodes_replayed"] += 1
+        return saved
+
+    # ── Housekeeping ─────────────────────────────────────────────────────────
+    def counts(self) -> dict:
+        """This process's topics_skipped / nodes_replayed / nodes_saved so far."""
+        with self._lock:
+            return dict(self._counts)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            scope = (self._prefix, len(self._prefix))
+            counts["completed"] = self._db.execute(
+                "SELECT COUNT(*) FROM results WHERE substr(topic, 1, ?2) = ?1", scope
+            ).fetchone()[0]
+            counts["partial"] = self._db.execute(
+                "SELECT COUNT(DISTINCT topic) FROM node_outputs"
+                " WHERE substr(topic, 1, ?2) = ?1 AND topic NOT IN (SELECT topic FROM results)",
+                scope,
+            ).fetchone()[0]
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,250 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/deadline.py  —  Per-Run Deadlines                 ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Some consumers need a digest within a hard latency budget, even
+  if it is a rougher one. A run with a deadline carries it in its
+  DigestState — state["deadline"], a time.time() timestamp, so it
+  means the same thing in every thread and process:
+
+    before a node → no time left: the node is skipped and its cheap
+                    local fallback is used instead
+    during a node → every LLM request the node makes gets what is left
+                    of the budget as its request timeout (timeout=…,
+                    added by the RequestTimeoutLLM layer, see
+                    enable_request_timeouts), so the call itself stops
+                    when the budget does; a node that fails that way
+                    falls back. An awaited node is also cancelled at
+                    the deadline, and a sync one is abandoned on its
+                    pool thread — a backstop for clients (or a missing
+                    layer) that ignore the timeout
+    fallbacks     → fetcher: the topic, clipped, as the summary
+                    tagger:  local keyword tags (agents/local_tagger.py),
+                             or empty tags when those are unsure
+                    editor:  the summary, clipped, as the headline
+                    fused:   all three
+    marking       → every fallback adds its node to state["degraded"],
+                    so the result says which fields are placeholders
+
+  build_graph() puts deadline_hook on every node; a run without a
+  deadline pays one dict lookup per node. Degraded outputs are never
+  checkpointed, so a later run redoes them properly.
+
+USAGE:
+  python main.py --topics topics.txt --deadline 2.5
+
+  layer = enable_request_timeouts()
+  results = run_batch(app, topics, deadline_s=2.5)
+  curl -s localhost:8080/digest -d '{"topic": "...", "deadline_ms": 2500}'
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from clients.base import LLMWrapper
+from config.settings import add_llm_layer, announce, remove_llm_layer
+
+# Fallback text lengths, in characters.
+SUMMARY_CHARS = 280
+HEADLINE_CHARS = 80
+# Threads for sync nodes that run under a deadline, at least; runs with
+# more in flight make room with reserve_node_threads().
+NODE_THREADS = 256
+
+
+def deadline_in(seconds):
+    """The deadline ``seconds`` from now, or None for no deadline."""
+    return None if seconds is None else time.time() + seconds
+
+
+def time_left(state):
+    """Seconds left before the run's deadline, or None if it has none."""
+    deadline = state.get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+
+# ─── REQUEST TIMEOUTS ─────────────────────────────────────────────────────────
+# The deadline of the node running in this context, for its LLM calls.
+_node_deadline = contextvars.ContextVar("digest_node_deadline", default=None)
+
+
+def request_timeout():
+    """Seconds an LLM request made now may take, or None without a deadline."""
+    deadline = _node_deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.time())
+
+
+class RequestTimeoutLLM(LLMWrapper):
+    """Passes the running node's remaining budget to the client as ``timeout``."""
+
+    def _with_timeout(self, kwargs: dict) -> dict:
+        timeout = request_timeout()
+        if timeout is None or "timeout" in kwargs:
+            return kwargs
+        return {**kwargs, "timeout": timeout}
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.inner.invoke(input, config, **self._with_timeout(kwargs))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.inner.ainvoke(input, config, **self._with_timeout(kwargs))
+
+    def batch(self, inputs, config=None, **kwargs):
+        return self.inner.batch(inputs, config, **self._with_timeout(kwargs))
+
+    async def abatch(self, inputs, config=None, **kwargs):
+        return await self.inner.abatch(inputs, config, **self._with_timeout(kwargs))
+
+    def stream(self, input, config=None, **kwargs):
+        return self.inner.stream(input, config, **self._with_timeout(kwargs))
+
+    def astream(self, input, config=None, **kwargs):
+        return self.inner.astream(input, config, **self._with_timeout(kwargs))
+
+
+def enable_request_timeouts():
+    """Give every agent's LLM requests the run's remaining budget as timeout.
+
+    Add it after the other layers, so the timeout reaches the client
+    through all of them. Returns the layer, for disable_request_timeouts().
+    """
+    add_llm_layer(RequestTimeoutLLM)
+    return RequestTimeoutLLM
+
+
+def disable_request_timeouts(layer=RequestTimeoutLLM) -> None:
+    remove_llm_layer(layer)
+
+
+# ─── FALLBACKS ────────────────────────────────────────────────────────────────
+def clip(text: str, limit: int) -> str:
+    """``text`` cut to at most ``limit`` characters, on a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+def _summary(state) -> str:
+    return state.get("summary") or clip(state["topic"], SUMMARY_CHARS)
+
+
+def _tags(state) -> str:
+    from agents.local_tagger import local_tags
+
+    return local_tags(_summary(state)) or ""
+
+
+def _headline(state) -> str:
+    return clip(_summary(state), HEADLINE_CHARS)
+
+
+FALLBACKS = {
+    "fetcher": lambda state: {"summary": clip(state["topic"], SUMMARY_CHARS)},
+    "tagger": lambda state: {"tags": _tags(state)},
+    "editor": lambda state: {"headline": _headline(state)},
+    "fused": lambda state: {"summary": _summary(state), "tags": _tags(state),
+                            "headline": _headline(state)},
+}
+
+
+def degrade(name: str, state) -> dict:
+    """The node's local fallback output, marked as degraded."""
+    announce(f"\n⏰ [{name.upper()}] Out of time — using a local fallback")
+    # Nodes run one after another, so appending here can't lose an entry.
+    return {**FALLBACKS[name](state), "degraded": [*state.get("degraded", ()), name]}
+
+
+# ─── THE NODE HOOK ────────────────────────────────────────────────────────────
+_node_pool = None
+_node_threads = NODE_THREADS
+_node_pool_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _node_pool
+    with _node_pool_lock:
+        if _node_pool is None:
+            _node_pool = ThreadPoolExecutor(max_workers=_node_threads, thread_name_prefix="deadline")
+        return _node_pool
+
+
+def reserve_node_threads(runs: int) -> None:
+    """Make room for ``runs`` sync runs holding a node on the pool at once.
+
+    A node waiting in the pool's queue would spend its budget there
+    and fall back for nothing, so batch runners call this with their
+    concurrency. The pool only ever grows; nodes already running on
+    the old one finish there.
+    """
+    global _node_pool, _node_threads
+    with _node_pool_lock:
+        if runs <= _node_threads:
+            return
+        _node_threads = runs
+        if _node_pool is not None:
+            _node_pool.shutdown(wait=False)
+            _node_pool = None
+
+
+def deadline_hook(name: str, fn):
+    """build_graph() hook: hold ``fn`` to the run's deadline, if it has one.
+
+    Nodes without a fallback in FALLBACKS run untouched.
+    """
+    if name not in FALLBACKS:
+        return fn
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def bounded(state):
+            left = time_left(state)
+            if left is None:
+                return await fn(state)
+            if left <= 0:
+                return degrade(name, state)
+            token = _node_deadline.set(state["deadline"])
+            try:
+                return await asyncio.wait_for(fn(state), left)
+            except asyncio.TimeoutError:
+                return degrade(name, state)
+            except Exception:
+                if time_left(state) > 0:
+                    raise
+                return degrade(name, state)      # its request timed out with the budget
+            finally:
+                _node_deadline.reset(token)
+        return bounded
+
+    @functools.wraps(fn)
+    def bounded(state):
+        left = time_left(state)
+        if left is None:
+            return fn(state)
+        if left <= 0:
+            return degrade(name, state)
+        # The node runs on a pool thread, in a copy of this context so
+        # LangChain still sees the run's callbacks and node metadata —
+        # and its LLM requests see the deadline.
+        context = contextvars.copy_context()
+        context.run(_node_deadline.set, state["deadline"])
+        future = _pool().submit(context.run, fn, state)
+        try:
+            return future.result(timeout=left)
+        except FutureTimeout:
+            future.cancel()                      # backstop: the request ignored its timeout
+            return degrade(name, state)
+        except Exception:
+            if time_left(state) > 0:
+                raise
+            return degrade(name, state)
+    return bounded
@@ -0,0 +1,266 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/dedup.py  —  Near-Duplicate Topic Detection       ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  News feeds carry the same story many times over ("New deep-sea
+  creature discovered near volcanic vents", "Scientists discover a
+  new deep-sea creature near volcanic vents", …). Each rephrasing
+  used to cost a full three-call pipeline run.
+
+  DedupGraph sits in front of the compiled graph. Before a topic
+  runs, it is compared with the topics digested so far:
+
+    normalize → lower case, punctuation and stopwords out, crude
+                suffix folding ("discovered" → "discover")
+    shingle   → the words plus their character 4-grams, so "vent"
+                and "vents" still overlap
+    index     → MinHash signatures in an LSH table find candidates
+                in constant time; each candidate is then checked
+                with the exact Jaccard similarity of the shingles
+    reuse     → at or above ``threshold``, the topic gets a copy of
+                that digest, marked "duplicate_of": <original topic>,
+                with no LLM call. A topic whose original is still
+                running waits for it instead of starting its own run.
+
+  Only clean results are reused: if the original failed or came back
+  degraded, the duplicate runs the graph itself. Every runner goes
+  through app.invoke()/ainvoke(), so batch, stream, async, service
+  and shard runs all get it. Each worker process keeps its own index.
+
+  The match is lexical: rephrasings that share most of their words
+  are found, synonyms ("volcanic" / "hydrothermal") are not.
+
+USAGE:
+  python main.py --topics feed.txt --dedup            ← threshold 0.7
+  python main.py --topics feed.txt --dedup 0.85       ← stricter
+
+  graph = DedupGraph(build_graph(), threshold=0.7)
+  results = run_batch(graph, topics)
+  print(graph.index.stats())   # {'lookups': …, 'reused': …, 'hit_rate': …}
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from agents.local_tagger import STOPWORDS
+from pipeline.deadline import time_left
+
+DEFAULT_THRESHOLD = 0.7
+NUM_PERM = 64
+SHINGLE_CHARS = 4
+# Oldest topics are forgotten beyond this many.
+MAX_TOPICS = 100_000
+
+_MERSENNE = (1 << 61) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+# ─── NORMALIZING ──────────────────────────────────────────────────────────────
+def _fold(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix) \
+                and not word.endswith(("ss", "us", "is")):
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize_topic(topic: str) -> list[str]:
+    """The topic's content words, lower-cased and suffix-folded."""
+    text = topic.lower().replace("'s", "")
+    return [_fold(word) for word in _WORD.findall(text) if word not in STOPWORDS]
+
+
+def shingles(topic: str) -> frozenset:
+    """Words plus their character 4-grams (padded, so short words count too)."""
+    words = normalize_topic(topic)
+    out = set(words)
+    for word in words:
+        padded = f" {word} "
+        out.update(padded[i:i + SHINGLE_CHARS] for i in range(max(1, len(padded) - SHINGLE_CHARS + 1)))
+    return frozenset(out)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# ─── MINHASH + LSH ────────────────────────────────────────────────────────────
+def _bands_for(threshold: float, num_perm: int) -> tuple[int, int]:
+    """(bands, rows) whose LSH threshold (1/bands)^(1/rows) sits a little
+    below ``threshold`` — candidates are verified exactly, so recall wins."""
+    target = max(0.05, threshold - 0.15)
+    return min(((num_perm // rows, rows) for rows in range(1, num_perm + 1)),
+               key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - target))
+
+
+class TopicIndex:
+    """Topics seen so far, searchable for near-duplicates."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                 max_topics: int = MAX_TOPICS, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.max_topics = max_topics
+        self.bands, self.rows = _bands_for(threshold, num_perm)
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE), rng.randrange(_MERSENNE))
+                       for _ in range(self.bands * self.rows)]
+        self._lock = threading.Lock()
+        self._topics = OrderedDict()   # topic → (shingles, band keys, entry)
+        self._buckets = {}             # band key → set of topics
+        self._counts = {"lookups": 0, "reused": 0, "exact": 0, "near": 0,
+                        "waited": 0, "rerun": 0}
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def _band_keys(self, grams: frozenset) -> list:
+        hashes = [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big")
+                  for g in grams] or [0]
+        signature = [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms]
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                for band in range(self.bands)]
+
+    def claim(self, topic: str):
+        """Look ``topic`` up, and register it if it is new.
+
+        Returns (entry, original, similarity). ``original`` is None when
+        the topic is new: the caller runs it and fills ``entry`` (a
+        Future) with the result. Otherwise ``entry`` is the original's
+        Future, maybe still running.
+        """
+        grams = shingles(topic)
+        keys = self._band_keys(grams)
+        with self._lock:
+            self._counts["lookups"] += 1
+            best, similarity = None, 0.0
+            candidates = set().union(*(self._buckets.get(key, ()) for key in keys))
+            for candidate in candidates:
+                score = jaccard(grams, self._topics[candidate][0])
+                if score >= self.threshold and score > similarity:
+                    best, similarity = candidate, score
+            if best is not None and not _reusable(self._topics[best][2]):
+                self._forget(best)           # its run failed: this one takes its place
+                best = None
+                self._counts["rerun"] += 1
+            if best is not None:
+                return self._topics[best][2], best, similarity
+
+            entry = Future()
+            self._add(topic, grams, keys, entry)
+            return entry, None, 1.0
+
+    def count(self, outcome: str, similarity: float = None, waited: bool = False) -> None:
+        """Tally a duplicate: "reused" (with its similarity) or "rerun"."""
+        with self._lock:
+            self._counts[outcome] += 1
+            if outcome == "reused":
+                self._counts["exact" if similarity == 1.0 else "near"] += 1
+                self._counts["waited"] += waited
+
+    def _add(self, topic: str, grams, keys, entry) -> None:
+        if topic in self._topics:
+            self._forget(topic)
+        self._topics[topic] = (grams, keys, entry)
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(topic)
+        while len(self._topics) > self.max_topics:
+            self._forget(next(iter(self._topics)))
+
+    def _forget(self, topic: str) -> None:
+        _, keys, _ = self._topics.pop(topic)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(topic)
+                if not bucket:
+                    del self._buckets[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["lookups"]
+            return {**self._counts, "topics": len(self._topics),
+                    "hit_rate": self._counts["reused"] / lookups if lookups else 0.0}
+
+
+def _reusable(entry: Future) -> bool:
+    """False once the original's run is known to have failed or degraded."""
+    if not entry.done():
+        return True
+    state = entry.result()
+    return state is not None and not state.get("degraded")
+
+
+# ─── IN FRONT OF THE GRAPH ────────────────────────────────────────────────────
+class DedupGraph:
+    """Wraps a compiled graph: near-duplicate topics reuse an earlier digest."""
+
+    def __init__(self, app, threshold: float = DEFAULT_THRESHOLD, index: TopicIndex = None):
+        self.app = app
+        self.index = index or TopicIndex(threshold)
+
+    def __getattr__(self, name):
+        return getattr(self.app, name)
+
+    def invoke(self, state, config=None, **kwargs):
+        entry, original, similarity = self.index.claim(state["topic"])
+        if original is None:
+            return _settle(entry, lambda: self.app.invoke(state, config, **kwargs))
+        waited = not entry.done()
+        try:
+            # A run with a deadline waits for the original only that long.
+            original_state = entry.result(timeout=time_left(state))
+        except FutureTimeout:
+            original_state = None
+        reused = self._reuse(original_state, state, original, similarity, waited)
+        return reused if reused is not None else self.app.invoke(state, config, **kwargs)
+
+    async def ainvoke(self, state, config=None, **kwargs):
+        entry, original, similarity = self.index.claim(state["topic"])
+        if original is None:
+            try:
+                result = await self.app.ainvoke(state, config, **kwargs)
+            except BaseException:
+                entry.set_result(None)
+                raise
+            entry.set_result(result)
+            return result
+        waited = not entry.done()
+        try:
+            original_state = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(entry)),
+                                                    time_left(state))
+        except asyncio.TimeoutError:
+            original_state = None
+        reused = self._reuse(original_state, state, original, similarity, waited)
+        return reused if reused is not None else await self.app.ainvoke(state, config, **kwargs)
+
+    def _reuse(self, original_state, state, original: str, similarity: float, waited: bool):
+        """The original's digest for this run's topic, or None if it can't be reused."""
+        if original_state is None or original_state.get("degraded"):
+            self.index.count("rerun")
+            return None
+        self.index.count("reused", similarity, waited)
+        return {**original_state, "topic": state["topic"], "duplicate_of": original,
+                "similarity": round(similarity, 3)}
+
+
+def _settle(entry: Future, run):
+    try:
+        result = run()
+    except BaseException:
+        entry.set_result(None)       # waiting duplicates run on their own
+        raise
+    entry.set_result(result)
+    return result
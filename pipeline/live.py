@@ -0,0 +1,68 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/live.py  —  Token Streaming for One Digest        ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  An interactive reader used to stare at nothing until fetcher →
+  tagger → editor had all finished. stream_digest() runs the graph
+  with LangGraph's "messages" stream mode on top of "updates": every
+  chat model called inside a node then streams, even though the
+  agents still just call llm.invoke(), and each piece of text is
+  handed over as soon as it arrives:
+
+    ("token",  node, text)    → a piece of the node's answer
+    ("update", node, output)  → the node finished; its state update
+
+  A node whose model can't stream (a cache hit, a replayed cassette)
+  sends its whole answer as one token; one that fell back to local
+  output (pipeline/deadline.py) sends only its update. Only the chain
+  graph's nodes stream: the fused node answers in JSON, which is no
+  use to a reader half-written, so it sends only its update too
+  (main.py refuses --stream --mode fused).
+
+  Pass a pipeline.metrics RunMetrics as a callback and the run's
+  record gets time to first token per node ("ttft_s"), generation
+  speed ("tokens_per_s") and the run's "first_token_s".
+
+USAGE:
+  python main.py --stream
+
+  for kind, node, data in stream_digest(app, "Mars rover finds ice"):
+      if kind == "token":
+          print(data, end="", flush=True)
+"""
+
+from pipeline.batch import initial_state
+
+# Which state field each node's streamed answer becomes.
+STREAMED_FIELDS = {"fetcher": "summary", "tagger": "tags", "editor": "headline"}
+
+
+def _event(mode: str, payload):
+    """Turn one LangGraph stream item into our events."""
+    if mode == "messages":
+        chunk, metadata = payload
+        node = metadata.get("langgraph_node")
+        if node in STREAMED_FIELDS and isinstance(chunk.content, str) and chunk.content:
+            yield "token", node, chunk.content
+        return
+    for node, output in (payload or {}).items():
+        yield "update", node, output or {}
+
+
+def stream_digest(app, topic: str, callbacks=(), deadline: float = None):
+    """Run the graph for ``topic``, yielding ("token" | "update", node, data) events."""
+    config = {"callbacks": list(callbacks)}
+    for mode, payload in app.stream(initial_state(topic, deadline), config=config,
+                                    stream_mode=["messages", "updates"]):
+        yield from _event(mode, payload)
+
+
+async def astream_digest(app, topic: str, callbacks=(), deadline: float = None):
+    """The asyncio twin of stream_digest (the graph awaits the async nodes)."""
+    config = {"callbacks": list(callbacks)}
+    async for mode, payload in app.astream(initial_state(topic, deadline), config=config,
+                                           stream_mode=["messages", "updates"]):
+        for event in _event(mode, payload):
+            yield event
@@ -0,0 +1,447 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/metrics.py  —  Per-Node Instrumentation           ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Answers "which agent eats our latency and our token bill?".
+
+  Two pieces work together for every pipeline run:
+    1. instrument_node — a hook wrapped around each node on the
+       StateGraph. Measures the node's wall time (and, with memory
+       tracing on, the peak traced allocation while it ran).
+    2. RunMetrics — a LangChain callback handler (an extended
+       UsageTracker) that times every LLM call and records prompt /
+       response sizes and token usage, attributed to the node that
+       made the call.
+
+  MetricsRecorder ties them together: one JSONL record per run, and
+  a p50 / p95 / p99 summary at the end of a batch. The summary is
+  kept as running totals plus a bounded sample per percentile, so a
+  long stream or a service never piles up its records in memory;
+  keep_records=True keeps them too (for tests and benchmarks).
+
+  Peak allocation comes from tracemalloc. It slows every allocation
+  down, so it is opt-in: MetricsRecorder(trace_memory=True), or
+  --trace-memory on the command line. Its peak is process-wide, so:
+    concurrency 1  → each node resets the peak when it starts, and
+                     every node gets its own figure
+    concurrency >1 → nothing is reset (runs would clobber each other's
+                     baselines); each RUN reports the traced peak by the
+                     time it finished, above the level it started at —
+                     an upper bound that includes its neighbours
+
+USAGE:
+  from main import build_graph
+  from pipeline.batch import run_batch
+  from pipeline.metrics import MetricsRecorder, instrument_node
+
+  graph = build_graph(hooks=[instrument_node])
+  with MetricsRecorder("metrics.jsonl") as metrics:
+      run_batch(graph, topics, metrics=metrics)
+      print(metrics.format_summary())
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import math
+import random
+import threading
+import time
+import tracemalloc
+
+from pipeline.usage import UsageTracker, usage_from_result
+
+# The RunMetrics of the pipeline run executing in this context.
+_current_run = contextvars.ContextVar("digest_current_run", default=None)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# Values kept per percentile: exact up to this many runs, a uniform
+# sample of them beyond.
+RESERVOIR_SIZE = 4096
+
+
+class Reservoir:
+    """A bounded uniform sample of a stream of values (Vitter's Algorithm R)."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.size = size
+        self.count = 0
+        self.values = []
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        slot = self._rng.randrange(self.count)
+        if slot < self.size:
+            self.values[slot] = value
+
+    def percentiles(self) -> dict:
+        return {f"p{q}": percentile(self.values, q) for q in (50, 95, 99)}
+
+
+def _empty_node() -> dict:
+    return {"wall_s": 0.0, "llm_s": 0.0, "llm_calls": 0, "prompt_chars": 0,
+            "response_chars": 0, "input_tokens": 0, "output_tokens": 0,
+            "tokens_saved": 0, "peak_alloc_bytes": 0,
+            "ttft_s": None, "tokens_per_s": None}     # set only for streamed calls
+
+
+# ─── PER-RUN COLLECTOR ───────────────────────────────────────────────────────
+class RunMetrics(UsageTracker):
+    """Everything measured during one pipeline run, broken down by node.
+
+    ``peaks`` is where memory peaks are taken: "node", "run" or None.
+    """
+
+    def __init__(self, topic: str, peaks: str = None):
+        super().__init__()
+        self.topic = topic
+        self.peaks = peaks
+        self.peak_alloc_bytes = 0    # peaks="run": set by MetricsRecorder.finish_run
+        self._alloc_start = _traced_now() if peaks == "run" else 0
+        self.nodes = {}          # node name → _empty_node() dict
+        self._llm_node = {}      # LLM run_id → (node name, start time)
+        self.started = time.perf_counter()
+        self.first_token_s = None    # run start → first streamed token of any node
+        self._first_token = {}   # LLM run_id → time of its first streamed token
+        self._chunks = {}        # LLM run_id → streamed chunks so far
+        self._streamed = {}      # node name → [tokens, seconds] after the first token
+
+    def _node(self, name: str) -> dict:
+        return self.nodes.setdefault(name, _empty_node())
+
+    # ── Node hook side ───────────────────────────────────────────────────────
+    def add_node_sample(self, name: str, wall_s: float, peak_bytes: int) -> None:
+        with self._lock:
+            node = self._node(name)
+            node["wall_s"] += wall_s
+            node["peak_alloc_bytes"] = max(node["peak_alloc_bytes"], peak_bytes)
+
+    def add_tokens_saved(self, name: str, saved: int) -> None:
+        with self._lock:
+            self._node(name)["tokens_saved"] += saved
+
+    # ── LLM callback side ────────────────────────────────────────────────────
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        super().on_chat_model_start(serialized, messages, run_id=run_id, **kwargs)
+        prompt_chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        self._start_llm(run_id, metadata, prompt_chars)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        super().on_llm_start(serialized, prompts, run_id=run_id, **kwargs)
+        self._start_llm(run_id, metadata, sum(len(p) for p in prompts))
+
+    def _start_llm(self, run_id, metadata, prompt_chars: int) -> None:
+        name = (metadata or {}).get("langgraph_node", "unknown")
+        with self._lock:
+            self._llm_node[run_id] = (name, time.perf_counter())
+            self._node(name)["prompt_chars"] += prompt_chars
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if not token:
+            return      # the empty chunk that closes a stream
+        now = time.perf_counter()
+        with self._lock:
+            if run_id not in self._first_token:
+                self._first_token[run_id] = now
+                if self.first_token_s is None:
+                    self.first_token_s = now - self.started
+            self._chunks[run_id] = self._chunks.get(run_id, 0) + 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        super().on_llm_end(response, run_id=run_id, **kwargs)
+        input_tokens, output_tokens = usage_from_result(response)
+        response_chars = sum(len(gen.text) for gens in response.generations for gen in gens)
+        now = time.perf_counter()
+        with self._lock:
+            name, started = self._llm_node.pop(run_id, ("unknown", now))
+            node = self._node(name)
+            node["llm_s"] += now - started
+            first = self._first_token.pop(run_id, None)
+            chunks = self._chunks.pop(run_id, 0)
+            if first is not None:
+                ttft = first - started
+                node["ttft_s"] = ttft if node["ttft_s"] is None else min(node["ttft_s"], ttft)
+                streamed = self._streamed.setdefault(name, [0, 0.0])
+                streamed[0] += output_tokens or chunks
+                streamed[1] += now - first
+            node["llm_calls"] += 1
+            node["response_chars"] += response_chars
+            node["input_tokens"] += input_tokens
+            node["output_tokens"] += output_tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        super().on_llm_error(error, run_id=run_id, **kwargs)
+        with self._lock:
+            self._first_token.pop(run_id, None)
+            self._chunks.pop(run_id, None)
+            entry = self._llm_node.pop(run_id, None)
+            if entry is not None:
+                self._node(entry[0])["llm_s"] += time.perf_counter() - entry[1]
+
+    def finish_peak(self) -> None:
+        """peaks="run": the traced peak so far, above where this run started."""
+        if self.peaks == "run" and tracemalloc.is_tracing():
+            self.peak_alloc_bytes = max(0, tracemalloc.get_traced_memory()[1] - self._alloc_start)
+
+    def record(self, result: dict) -> dict:
+        """The JSONL record for this run, given the runner's result dict."""
+        with self._lock:
+            nodes = {name: {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+                     for name, stats in self.nodes.items()}
+            for name, (tokens, seconds) in self._streamed.items():
+                if seconds > 0:
+                    nodes[name]["tokens_per_s"] = round(tokens / seconds, 1)
+            first_token_s = self.first_token_s
+            if self.peaks == "node":
+                peak = max((n["peak_alloc_bytes"] for n in nodes.values()), default=0)
+            else:
+                peak = self.peak_alloc_bytes
+                for node in nodes.values():
+                    node["peak_alloc_bytes"] = None
+        return {
+            "topic": self.topic,
+            "ok": result.get("error") is None,
+            "error": result.get("error"),
+            **result.get("usage", self.totals()),
+            "tokens_saved": sum(n["tokens_saved"] for n in nodes.values()),
+            "first_token_s": None if first_token_s is None else round(first_token_s, 4),
+            "peak_alloc_bytes": peak,
+            "nodes": nodes,
+        }
+
+
+# ─── THE NODE HOOK ───────────────────────────────────────────────────────────
+def _traced_now() -> int:
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _baseline(run: RunMetrics) -> int:
+    """Reset the traced peak and return current traced memory (per-node peaks only)."""
+    if run.peaks != "node" or not tracemalloc.is_tracing():
+        return 0
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _measure(run: RunMetrics, name: str, started: float, before: int) -> None:
+    wall = time.perf_counter() - started
+    peak = 0
+    if run.peaks == "node" and tracemalloc.is_tracing():
+        peak = max(0, tracemalloc.get_traced_memory()[1] - before)
+    run.add_node_sample(name, wall, peak)
+
+
+def record_tokens_saved(name: str, saved: int) -> None:
+    """Credit ``saved`` prompt tokens to node ``name`` of the run being recorded, if any."""
+    run = _current_run.get()
+    if run is not None:
+        run.add_tokens_saved(name, saved)
+
+
+def instrument_node(name: str, fn):
+    """build_graph() hook: time ``fn`` and sample its peak allocation.
+
+    Does nothing unless a run is being recorded (see MetricsRecorder.start_run).
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def timed(state):
+            run = _current_run.get()
+            if run is None:
+                return await fn(state)
+            before = _baseline(run)
+            started = time.perf_counter()
+            try:
+                return await fn(state)
+            finally:
+                _measure(run, name, started, before)
+        return timed
+
+    @functools.wraps(fn)
+    def timed(state):
+        run = _current_run.get()
+        if run is None:
+            return fn(state)
+        before = _baseline(run)
+        started = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            _measure(run, name, started, before)
+    return timed
+
+
+# ─── BATCH-LEVEL RECORDER ────────────────────────────────────────────────────
+def _node_totals() -> dict:
+    return {"wall_s": Reservoir(), "llm_s": Reservoir(), "ttft_s": Reservoir(),
+            "tokens_per_s": Reservoir(), "input_tokens": 0, "output_tokens": 0,
+            "tokens_saved": 0}
+
+
+class MetricsRecorder:
+    """Collects one record per run, appends it to a JSONL file and
+    summarizes the batch at the end.
+
+    Only the summary's running state is kept in memory; pass
+    ``keep_records=True`` to keep the records themselves as well.
+    ``trace_memory`` turns tracemalloc on; ``concurrency`` (how many
+    runs overlap) decides whether peaks are per node or per run.
+    """
+
+    def __init__(self, path: str = None, trace_memory: bool = False, keep_records: bool = False,
+                 concurrency: int = 1):
+        self.path = path
+        self.keep_records = keep_records
+        self.peaks = ("node" if concurrency <= 1 else "run") if trace_memory else None
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._records = []
+        self._runs = self._failed = 0
+        self._latency, self._first_token = Reservoir(), Reservoir()
+        self._tokens = {"input": 0, "output": 0, "saved": 0}
+        self._nodes = {}         # node name → _node_totals()
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def start_run(self, topic: str) -> RunMetrics:
+        """A fresh collector for one run, made current for this context."""
+        run = RunMetrics(topic, self.peaks)
+        run._context_token = _current_run.set(run)
+        return run
+
+    def finish_run(self, run: RunMetrics, result: dict) -> dict:
+        """Emit the run's JSONL record."""
+        try:
+            _current_run.reset(run._context_token)
+        except ValueError:
+            pass   # finished from a different context — nothing to restore
+        run.finish_peak()
+        return self.add_record(run.record(result))
+
+    def add_record(self, record: dict) -> dict:
+        """Count (and write) a finished record — e.g. one made in another process."""
+        with self._lock:
+            self._tally(record)
+            if self.keep_records:
+                self._records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._file.flush()
+        return record
+
+    def _tally(self, record: dict) -> None:
+        self._runs += 1
+        self._failed += not record["ok"]
+        self._latency.add(record["latency_s"])
+        if record.get("first_token_s") is not None:
+            self._first_token.add(record["first_token_s"])
+        self._tokens["input"] += record["input_tokens"]
+        self._tokens["output"] += record["output_tokens"]
+        self._tokens["saved"] += record.get("tokens_saved", 0)
+        for name, sample in record["nodes"].items():
+            totals = self._nodes.setdefault(name, _node_totals())
+            for key in ("wall_s", "llm_s", "ttft_s", "tokens_per_s"):
+                if sample.get(key) is not None:
+                    totals[key].add(sample[key])
+            for key in ("input_tokens", "output_tokens", "tokens_saved"):
+                totals[key] += sample.get(key, 0)
+
+    def drain(self) -> list[dict]:
+        """Hand over the records kept so far and forget them."""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    @property
+    def records(self) -> list[dict]:
+        if not self.keep_records:
+            raise RuntimeError("records are only kept with MetricsRecorder(keep_records=True)")
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> dict:
+        """p50 / p95 / p99 of run latency and of every node's wall and LLM time
+        (and, for streamed runs, of time to first token)."""
+        with self._lock:
+            out = {
+                "runs": self._runs,
+                "failed": self._failed,
+                "latency_s": self._latency.percentiles(),
+                "streamed_runs": self._first_token.count,
+                "first_token_s": self._first_token.percentiles(),
+                "tokens": dict(self._tokens),
+                "nodes": {},
+            }
+            for name in sorted(self._nodes):
+                totals = self._nodes[name]
+                ttfts, rates = totals["ttft_s"], totals["tokens_per_s"]
+                out["nodes"][name] = {
+                    "wall_s": totals["wall_s"].percentiles(),
+                    "llm_s": totals["llm_s"].percentiles(),
+                    "input_tokens": totals["input_tokens"],
+                    "output_tokens": totals["output_tokens"],
+                    "tokens_saved": totals["tokens_saved"],
+                    "ttft_s": ttfts.percentiles() if ttfts.count else None,
+                    "tokens_per_s": percentile(rates.values, 50) if rates.count else None,
+                }
+        return out
+
+    def format_summary(self) -> str:
+        s = self.summary()
+        lat = s["latency_s"]
+        lines = [
+            "═" * 55,
+            f"📊  {s['runs']} runs ({s['failed']} failed) · "
+            f"tokens {s['tokens']['input']} in / {s['tokens']['output']} out"
+            + (f" ({s['tokens']['saved']} saved)" if s["tokens"]["saved"] else ""),
+            f"⏱️   run latency  p50 {lat['p50']:.3f}s  p95 {lat['p95']:.3f}s  p99 {lat['p99']:.3f}s",
+        ]
+        if s["streamed_runs"]:
+            first = s["first_token_s"]
+            lines.append(f"⚡  first token  p50 {first['p50']:.3f}s  p95 {first['p95']:.3f}s  "
+                         f"p99 {first['p99']:.3f}s")
+        for name, node in s["nodes"].items():
+            wall, llm = node["wall_s"], node["llm_s"]
+            line = (
+                f"    {name:<8} wall p50 {wall['p50']:.3f}s p95 {wall['p95']:.3f}s p99 {wall['p99']:.3f}s"
+                f" · llm p95 {llm['p95']:.3f}s · {node['input_tokens']}/{node['output_tokens']} tok"
+            )
+            if node["ttft_s"] is not None:
+                line += f" · ttft p95 {node['ttft_s']['p95']:.3f}s"
+            if node["tokens_per_s"] is not None:
+                line += f" · {node['tokens_per_s']:.0f} tok/s"
+            lines.append(line)
+        lines.append("═" * 55)
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
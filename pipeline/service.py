@@ -0,0 +1,389 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/service.py  —  Long-Running Digest Service        ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  Shelling out to `python main.py` for every topic pays interpreter
+  startup, imports and workflow.compile() each time. The service
+  compiles the graph ONCE and answers digest requests over HTTP on
+  one asyncio event loop (the async node twins, like pipeline/aio.py):
+
+    POST /digest   {"topic": "..."}  → the usual result dict
+    GET  /digest?topic=...           → same, handy for curl
+                                       (both take an optional
+                                       "deadline_ms", see below)
+    GET  /stats                      → queue depth, runs, latency
+    GET  /healthz                    → {"ok": true}
+
+  A result whose run failed comes back with status 502 and its
+  "error" filled in, so callers can tell without parsing the body.
+  A request that isn't readable HTTP gets a 4xx and the connection is
+  closed; a bug while answering gets a 500 and the connection stays
+  up for the next request.
+
+  Deadlines: "deadline_ms" (or the service-wide deadline_s) bounds
+  the request from the moment it arrives, queueing included. Nodes
+  that run out of time fall back to local output and the result
+  lists them in "degraded" (pipeline/deadline.py).
+
+  Single-flight: callers asking for the same topic (whitespace
+  aside) while its run is in flight all wait on THAT run instead of
+  starting their own — one LLM bill, one answer for everybody. A
+  caller that hangs up does not cancel the run for the others.
+  A caller without a deadline only ever shares a run without one,
+  so it never gets somebody else's degraded output. A caller with a
+  deadline shares whichever run is in flight, but waits no longer
+  than its own budget; past it, it gets the all-fallback result.
+
+  At most max_concurrency pipelines run at once; the rest wait in
+  line and show up as "queued" in /stats.
+
+  Plain HTTP/1.1 with keep-alive, on the standard library — no web
+  framework to install.
+
+HOW TO RUN:
+  python main.py --serve 8080                   ← Gemini
+  python main.py --serve 127.0.0.1:8080 --fake-llm   ← offline stub LLM
+
+  curl -s localhost:8080/digest -d '{"topic": "Mars rover finds ice"}'
+  curl -s localhost:8080/stats
+"""
+
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from pipeline.batch import DEFAULT_CONCURRENCY
+from pipeline.metrics import percentile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# Request latencies kept for the /stats percentiles.
+LATENCY_WINDOW = 1000
+# Larger request bodies are refused with 413.
+MAX_BODY_BYTES = 64 * 1024
+# More header lines than this are refused with 431. (A single line over
+# the stream's 64 KiB limit gets 414 or 431 too.)
+MAX_HEADERS = 100
+
+
+# ─── SINGLE-FLIGHT ────────────────────────────────────────────────────────────
+class SingleFlight:
+    """At most one in-flight call per key; later callers share its outcome."""
+
+    def __init__(self):
+        self._calls = {}        # key → asyncio.Task
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key) -> bool:
+        return key in self._calls
+
+    async def do(self, key, factory, timeout: float = None):
+        """Await ``factory()`` for ``key``, or the call already running for it.
+
+        Returns (result, shared) — shared is True when this caller
+        joined a call somebody else started. A joiner waits at most
+        ``timeout`` seconds (asyncio.TimeoutError); the call itself
+        carries on for the others.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # shield: one caller going away must not cancel the others' run.
+        if not shared or timeout is None:
+            return await asyncio.shield(task), shared
+        return await asyncio.wait_for(asyncio.shield(task), timeout), shared
+
+
+def topic_key(topic: str) -> str:
+    """Topics that differ only in whitespace share one run."""
+    return " ".join(topic.split())
+
+
+# ─── THE SERVICE ──────────────────────────────────────────────────────────────
+class DigestService:
+    """Serves digests from one compiled graph, one run per distinct topic."""
+
+    def __init__(self, app, max_concurrency: int = DEFAULT_CONCURRENCY, metrics=None,
+                 checkpoint=None, deadline_s: float = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.metrics = metrics
+        self.checkpoint = checkpoint
+        self.deadline_s = deadline_s
+        self._flights = SingleFlight()
+        self._slots = None          # asyncio.Semaphore, made on the serving loop
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.requests = 0
+        self.coalesced = 0          # requests that joined a run already in flight
+        self.runs = 0
+        self.failed = 0
+        self.degraded = 0
+        self.queued = 0             # runs waiting for a free slot
+        self.running = 0
+
+    async def digest(self, topic: str, deadline_s: float = None) -> dict:
+        """The result for ``topic``, sharing any run already in flight for it.
+
+        ``deadline_s`` (default: the service's) counts from now.
+        Flights are keyed on (topic, bounded): runs with a deadline
+        may come back degraded, so callers without one never join them.
+        """
+        from pipeline.deadline import deadline_in
+
+        started = time.perf_counter()
+        self.requests += 1
+        key = topic_key(topic)
+        deadline = deadline_in(self.deadline_s if deadline_s is None else deadline_s)
+        if deadline is None:
+            result, shared = await self._flights.do((key, False), lambda: self._run(key, None))
+        else:
+            result, shared = await self._bounded(key, deadline)
+        self.coalesced += shared
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    async def _bounded(self, topic: str, deadline: float):
+        """(result, shared) for a caller with a deadline: join any run, within budget.
+
+        A run without a deadline is preferred — its answer is never
+        degraded. If the joined run isn't done by this caller's
+        deadline, the caller gets the all-fallback result instead.
+        """
+        flight = (topic, False) if (topic, False) in self._flights else (topic, True)
+        try:
+            return await self._flights.do(flight, lambda: self._run(topic, deadline),
+                                          timeout=max(0.0, deadline - time.time()))
+        except asyncio.TimeoutError:
+            return await self._out_of_time(topic, deadline), True
+
+    async def _out_of_time(self, topic: str, deadline: float) -> dict:
+        from pipeline.aio import adigest_topic
+
+        # The deadline has passed, so every node falls back without an LLM call
+        # (unless the checkpoint already holds the finished digest).
+        result = await adigest_topic(self.app, topic, self.metrics, self.checkpoint, deadline)
+        self.degraded += bool(result.get("degraded"))
+        return result
+
+    async def _run(self, topic: str, deadline) -> dict:
+        from pipeline.aio import adigest_topic
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            result = await adigest_topic(self.app, topic, self.metrics, self.checkpoint, deadline)
+        finally:
+            self.running -= 1
+            self._slots.release()
+        self.runs += 1
+        self.failed += result["error"] is not None
+        self.degraded += bool(result.get("degraded"))
+        return result
+
+    def stats(self) -> dict:
+        latencies = list(self._latencies)
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "runs": self.runs,
+            "failed": self.failed,
+            "degraded": self.degraded,
+            "queued": self.queued,
+            "running": self.running,
+            "in_flight_topics": len(self._flights),
+            "max_concurrency": self.max_concurrency,
+            "latency_s": {f"p{q}": round(percentile(latencies, q), 4) for q in (50, 95, 99)},
+        }
+
+    # ── HTTP ─────────────────────────────────────────────────────────────────
+    async def handle(self, method: str, target: str, body: bytes):
+        """Route one request: (status, JSON-able payload)."""
+        url = urlsplit(target)
+        if url.path == "/healthz":
+            return 200, {"ok": True}
+        if url.path == "/stats":
+            return 200, self.stats()
+        if url.path != "/digest":
+            return 404, {"error": f"no such endpoint: {url.path}"}
+
+        if method == "GET":
+            request = {key: values[0] for key, values in parse_qs(url.query).items()}
+        elif method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                return 400, {"error": "body must be a JSON object like {\"topic\": \"...\"}"}
+        else:
+            return 405, {"error": f"{method} not allowed"}
+
+        topic = request.get("topic")
+        if not isinstance(topic, str) or not topic.strip():
+            return 400, {"error": "missing \"topic\""}
+        deadline_s = None
+        if request.get("deadline_ms") is not None:
+            deadline_s = _seconds(request["deadline_ms"])
+            if deadline_s is None:
+                return 400, {"error": "\"deadline_ms\" must be a number >= 0"}
+
+        result = await self.digest(topic, deadline_s)
+        return (502 if result["error"] is not None else 200), result
+
+    async def serve_connection(self, reader, writer) -> None:
+        """One client connection: requests in, responses out, until it closes."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except _BadRequest as exc:
+                    writer.write(_response(exc.status, {"error": str(exc)}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    status, payload = await self.handle(method, target, body)
+                except _BadRequest as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    print(f"💥 {method} {target} failed: {type(exc).__name__}: {exc}",
+                          file=sys.stderr)
+                    status, payload = 500, {"error": f"internal error: {type(exc).__name__}"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass        # client went away; its run (if any) carries on for the others
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """Start listening; returns the asyncio server (port 0 picks a free one)."""
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+
+def _seconds(milliseconds):
+    """A deadline_ms value in seconds, or None if it isn't a number >= 0."""
+    try:
+        seconds = float(milliseconds) / 1000
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None      # NaN fails this too
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_line(reader, status: int, what: str) -> bytes:
+    try:
+        return await reader.readline()
+    except (asyncio.LimitOverrunError, ValueError):
+        # readline() turns an over-long line into ValueError; the rest of
+        # it is still in the buffer, so this connection can't go on.
+        raise _BadRequest(status, f"{what} too long") from None
+
+
+async def _read_request(reader):
+    """(method, target, headers, body), or None when the client closed."""
+    line = await _read_line(reader, 414, "request line")
+    if not line.strip():
+        return None
+    try:
+        method, target, _version = line.decode("latin-1").split()
+    except ValueError:
+        raise _BadRequest(400, "malformed request line") from None
+
+    headers = {}
+    while True:
+        header = await _read_line(reader, 431, "header line")
+        if header in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise _BadRequest(431, f"more than {MAX_HEADERS} headers")
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise _BadRequest(400, "bad Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise _BadRequest(413, f"body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+# ─── ENTRY POINT ──────────────────────────────────────────────────────────────
+def parse_address(address: str) -> tuple[str, int]:
+    """"8080" or "0.0.0.0:8080" → (host, port)."""
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def run_service(app, address: str = str(DEFAULT_PORT), max_concurrency: int = DEFAULT_CONCURRENCY,
+                metrics=None, checkpoint=None, deadline_s: float = None) -> DigestService:
+    """Serve until Ctrl-C; returns the service so the caller can print its stats."""
+    host, port = parse_address(address)
+    service = DigestService(app, max_concurrency, metrics, checkpoint, deadline_s)
+
+    async def serve():
+        server = await service.start(host, port)
+        bound = server.sockets[0].getsockname()
+        print(f"🌐 Serving digests on http://{bound[0]}:{bound[1]} "
+              f"({max_concurrency} pipelines at a time) — Ctrl-C to stop", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    stats = service.stats()
+    print(f"\n🛑 Service stopped: {stats['requests']} requests, {stats['runs']} runs "
+          f"({stats['coalesced']} coalesced), {stats['failed']} failed, "
+          f"{stats['degraded']} degraded", file=sys.stderr)
+    return service
@@ -0,0 +1,286 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/shard.py  —  Multi-Process Sharded Runner         ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  However many runs are in flight, one Python process tops out at
+  one core's worth of JSON parsing, prompt formatting and LangGraph
+  bookkeeping. For overnight backfills, shard_batch() spreads the
+  topics over a pool of worker processes:
+
+    workers  → every process starts clean (spawn), builds its OWN
+               graph, LLM client, cache, rate limiter… once from a
+               WorkerSetup, and runs each chunk it gets through
+               run_batch() / arun_batch() with max_concurrency
+               pipelines in flight
+    chunks   → the parent reads topics lazily and cuts them into
+               chunks; a worker takes the next chunk as soon as it
+               finishes one, so a slow shard never holds the others
+               up (work-stealing from one shared queue). When the
+               input has a length, chunks shrink as the end nears
+               (guided scheduling), so the workers finish together
+    results  → yielded as each chunk completes, or in input order
+               with ordered=True; the workers' metrics records and
+               checkpoint counters are merged in the parent
+    Ctrl-C   → workers ignore SIGINT; the parent stops handing out
+               chunks, drops the queued ones, waits for the ones in
+               flight and re-raises. With a checkpoint, re-running
+               the same command resumes where it stopped.
+
+  Per-process state stays per process: with a rate limit, each
+  worker gets 1/workers of the budget so together they stay under
+  the quota, and every worker has its own in-memory cache tier.
+
+USAGE:
+  from pipeline.batch import iter_topics
+  from pipeline.shard import WorkerSetup, shard_batch
+
+  setup = WorkerSetup(mode="chain", quiet=True)
+  for result in shard_batch(setup, iter_topics("topics.txt"), workers=8, max_concurrency=32):
+      print(json.dumps(result))
+"""
+
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pipeline.batch import DEFAULT_CONCURRENCY
+from pipeline.stream import REORDER_WINDOW, _Collector
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Chunks queued per worker, so a worker that finishes one never waits on the parent.
+CHUNKS_PER_WORKER = 2
+# Chunk sizes, in multiples of a worker's max_concurrency: fixed size
+# for inputs of unknown length, bounds for guided scheduling otherwise.
+CHUNK_FACTOR = 4
+MIN_CHUNK_FACTOR = 1
+MAX_CHUNK_FACTOR = 16
+# Guided scheduling: a chunk takes at most 1 / (workers × GUIDED_SPLIT) of what is left.
+GUIDED_SPLIT = 4
+
+
+class WorkerSetup:
+    """Everything a worker process needs to build its own pipeline.
+
+    It is pickled into every worker, so ``llm_factory`` (called once
+    per worker, e.g. functools.partial(FakeChatModel, latency_ms=0))
+    must be importable. Without it, workers build the Gemini client.
+    """
+
+    def __init__(self, mode: str = "chain", tagger: str = "llm", quiet: bool = True,
+                 node_models: dict = None, llm_factory=None, cache: str = None,
+                 rpm: float = None, tpm: float = None, hedge: float = None,
+                 hedge_budget: float = 0.1, metrics: bool = False, trace_memory: bool = False,
+                 checkpoint: str = None, fingerprint: str = "", use_async: bool = False,
+                 deadline_s: float = None, token_budget: bool = False, dedup: float = None):
+        self.mode = mode
+        self.tagger = tagger
+        self.quiet = quiet
+        self.node_models = node_models or {}
+        self.llm_factory = llm_factory
+        self.cache = cache
+        self.rpm = rpm              # whole-batch budget; None → no rate limit
+        self.tpm = tpm
+        self.hedge = hedge          # percentile; None → no hedging
+        self.hedge_budget = hedge_budget
+        self.metrics = metrics
+        self.trace_memory = trace_memory
+        self.checkpoint = checkpoint
+        self.fingerprint = fingerprint  # pipeline.checkpoint.run_fingerprint(), from the parent
+        self.use_async = use_async
+        self.deadline_s = deadline_s
+        self.token_budget = token_budget
+        self.dedup = dedup          # similarity threshold; None → no dedup
+
+
+class ShardStats:
+    """What the workers did, merged in the parent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.topics = 0
+        self.checkpoint = {"topics_skipped": 0, "nodes_replayed": 0, "nodes_saved": 0}
+
+    def add_chunk(self, size: int, checkpoint_counts: dict) -> None:
+        with self._lock:
+            self.chunks += 1
+            self.topics += size
+            for key, value in checkpoint_counts.items():
+                self.checkpoint[key] = self.checkpoint.get(key, 0) + value
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {"chunks": self.chunks, "topics": self.topics,
+                    "avg_chunk": self.topics / self.chunks if self.chunks else 0.0,
+                    "checkpoint": dict(self.checkpoint)}
+
+
+# ─── WORKER SIDE ──────────────────────────────────────────────────────────────
+# This process's pipeline, built once by _start_worker.
+_worker = {}
+
+
+def _start_worker(setup: WorkerSetup, workers: int, max_concurrency: int) -> None:
+    # Ctrl-C reaches the whole process group: only the parent reacts,
+    # the workers finish their chunk and exit when told to.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    import config.settings as settings
+    from main import build_graph
+
+    settings.VERBOSE = not setup.quiet
+    settings.NODE_MODELS.update(setup.node_models)
+    if setup.llm_factory is not None:
+        settings.set_llm(setup.llm_factory())
+
+    hooks, metrics, checkpoint = [], None, None
+    if setup.cache:
+        from clients.cache import enable_llm_cache
+        enable_llm_cache(setup.cache)
+    hedging = None
+    if setup.hedge:
+        from clients.hedge import enable_hedging
+        hedging = enable_hedging(setup.hedge, setup.hedge_budget)
+    if setup.rpm or setup.tpm:
+        from clients.ratelimit import enable_rate_limit
+        from config.settings import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+        limiter = enable_rate_limit((setup.rpm or LLM_REQUESTS_PER_MINUTE) / workers,
+                                    (setup.tpm or LLM_TOKENS_PER_MINUTE) / workers)
+        if hedging is not None:
+            hedging.limiter = limiter
+    if setup.deadline_s:
+        from pipeline.deadline import enable_request_timeouts
+        enable_request_timeouts()
+    if setup.token_budget:
+        from pipeline.budget import TokenBudget, cap_output_tokens
+        cap_output_tokens()
+        hooks.append(TokenBudget().node_hook)
+    if setup.metrics:
+        from pipeline.metrics import MetricsRecorder, instrument_node
+        metrics = MetricsRecorder(trace_memory=setup.trace_memory, keep_records=True,
+                                  concurrency=max_concurrency)    # drained after every chunk
+        hooks.append(instrument_node)
+    if setup.checkpoint:
+        from pipeline.checkpoint import CheckpointStore
+        checkpoint = CheckpointStore(setup.checkpoint, setup.fingerprint)
+        hooks.append(checkpoint.node_hook)
+
+    app = build_graph(setup.mode, hooks, setup.tagger)
+    if setup.dedup:
+        from pipeline.dedup import DedupGraph
+        app = DedupGraph(app, setup.dedup)      # per worker: duplicates across workers still run
+
+    _worker.update(app=app, metrics=metrics,
+                   checkpoint=checkpoint, max_concurrency=max_concurrency,
+                   use_async=setup.use_async, deadline_s=setup.deadline_s)
+
+
+def _run_chunk(topics: list[str]):
+    """Digest one chunk in this worker: (results, metrics records, checkpoint counts)."""
+    from pipeline.aio import arun_batch
+    from pipeline.batch import run_batch
+
+    app, metrics, checkpoint = _worker["app"], _worker["metrics"], _worker["checkpoint"]
+    before = checkpoint.counts() if checkpoint else {}
+    options = dict(max_concurrency=_worker["max_concurrency"], metrics=metrics,
+                   checkpoint=checkpoint, deadline_s=_worker["deadline_s"])
+    if _worker["use_async"]:
+        results = asyncio.run(arun_batch(app, topics, **options))
+    else:
+        results = run_batch(app, topics, **options)
+
+    records = metrics.drain() if metrics else []
+    counts = {}
+    if checkpoint:
+        counts = {key: value - before[key] for key, value in checkpoint.counts().items()}
+    return results, records, counts
+
+
+# ─── PARENT SIDE ──────────────────────────────────────────────────────────────
+def chunk_topics(topics, workers: int, max_concurrency: int):
+    """Cut ``topics`` into chunks, lazily.
+
+    Inputs with a length get guided chunks — large at first, smaller
+    towards the end so no worker is left with a big last chunk.
+    Other iterators get fixed-size chunks.
+    """
+    smallest = max_concurrency * MIN_CHUNK_FACTOR
+    largest = max_concurrency * MAX_CHUNK_FACTOR
+    remaining = len(topics) if hasattr(topics, "__len__") else None
+    source = iter(topics)
+    while True:
+        if remaining is None:
+            size = max_concurrency * CHUNK_FACTOR
+        else:
+            size = min(largest, max(smallest, math.ceil(remaining / (workers * GUIDED_SPLIT))))
+        chunk = list(itertools.islice(source, size))
+        if not chunk:
+            return
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
+
+def shard_batch(setup: WorkerSetup, topics, workers: int = DEFAULT_WORKERS,
+                max_concurrency: int = DEFAULT_CONCURRENCY, ordered: bool = False,
+                metrics=None, stats: ShardStats = None):
+    """Yield one result per topic, digested across ``workers`` processes.
+
+    Same result dicts as run_batch; see the module docstring for ordering.
+    Pass a pipeline.metrics.MetricsRecorder to collect the workers'
+    per-run records, and a ShardStats for chunk and checkpoint counts.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    # Chunks handed out but not yet yielded; in ordered mode that
+    # includes the ones waiting in the reorder buffer.
+    limit = workers * CHUNKS_PER_WORKER * (REORDER_WINDOW if ordered else 1)
+    pool = ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_start_worker,
+                               initargs=(setup, workers, max_concurrency))
+    chunks = enumerate(chunk_topics(topics, workers, max_concurrency))
+    running = {}        # future → chunk number
+    collector = _Collector(ordered)
+    outstanding = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and outstanding < limit:
+                seq, chunk = next(chunks, (None, None))
+                if chunk is None:
+                    exhausted = True
+                    break
+                running[pool.submit(_run_chunk, chunk)] = seq
+                outstanding += 1
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                seq = running.pop(future)
+                results, records, counts = future.result()
+                if metrics is not None:
+                    for record in records:
+                        metrics.add_record(record)
+                if stats is not None:
+                    stats.add_chunk(len(results), counts)
+                for ready in collector.add(seq, results):
+                    outstanding -= 1
+                    yield from ready
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted — waiting for the chunks in flight...", file=sys.stderr)
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,202 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/stream.py  —  Streaming Batch Runner              ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  run_batch() wants the whole topic list up front and hands back
+  the whole result list at the end. For a feed of a million topics
+  that means a million topics AND a million results in memory.
+
+  stream_batch() / astream_batch() take any iterator of topics
+  (e.g. pipeline.batch.iter_topics reading stdin line by line) and
+  yield each result as soon as it is ready:
+
+    backpressure → a topic is pulled from the input only when a
+                   worker slot is free, so a fast reader never runs
+                   ahead of the pipelines
+    completion   → results come out in the order runs finish
+                   (default: a slow topic holds nobody up)
+    ordered=True → results come out in input order; finished runs
+                   wait in a reorder buffer of at most
+                   max_concurrency × REORDER_WINDOW entries, and the
+                   reader pauses when it is full
+
+  Memory stays flat whatever the input size: at most the window of
+  in-flight runs plus the reorder buffer.
+
+USAGE:
+  from pipeline.batch import iter_topics
+  from pipeline.stream import stream_batch
+
+  for result in stream_batch(app, iter_topics("-"), max_concurrency=32):
+      print(json.dumps(result), flush=True)
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline.batch import DEFAULT_CONCURRENCY, digest_topic
+from pipeline.deadline import deadline_in, reserve_node_threads
+
+# In ordered mode, how many slots per worker the reorder buffer may hold.
+REORDER_WINDOW = 4
+
+
+def _window(max_concurrency: int, ordered: bool) -> int:
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    return max_concurrency * REORDER_WINDOW if ordered else max_concurrency
+
+
+class _Collector:
+    """Turns (seq, result) arrivals into the order the caller asked for."""
+
+    def __init__(self, ordered: bool):
+        self.ordered = ordered
+        self.buffered = {}
+        self.next_seq = 0
+        self.emitted = 0
+
+    def add(self, seq: int, result: dict) -> list[dict]:
+        if not self.ordered:
+            ready = [result]
+        else:
+            self.buffered[seq] = result
+            ready = []
+            while self.next_seq in self.buffered:
+                ready.append(self.buffered.pop(self.next_seq))
+                self.next_seq += 1
+        self.emitted += len(ready)
+        return ready
+
+
+def stream_batch(app, topics, max_concurrency: int = DEFAULT_CONCURRENCY, ordered: bool = False,
+                 metrics=None, checkpoint=None, deadline_s: float = None):
+    """Yield one result per topic while later topics are still being read.
+
+    Same result dicts as run_batch; see the module docstring for ordering.
+    A reader thread pulls topics, so a slow input never delays output.
+    """
+    window = _window(max_concurrency, ordered)
+    slots = threading.Semaphore(window)       # topics read but not yet yielded
+    arrivals = queue.Queue()    # ("result", seq, result) | ("end", count, _) | ("error", exc, _)
+    stop = threading.Event()
+    if deadline_s is not None:
+        reserve_node_threads(max_concurrency)
+    pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="digest")
+
+    def run(seq: int, topic: str):
+        # Whatever happens, something reaches the queue — or the consumer waits forever.
+        try:
+            result = digest_topic(app, topic, metrics, checkpoint, deadline_in(deadline_s))
+        except BaseException as exc:
+            arrivals.put(("error", exc, None))
+            return
+        arrivals.put(("result", seq, result))
+
+    def read():
+        source, end = iter(topics), object()
+        count = 0
+        try:
+            while True:
+                slots.acquire()
+                topic = next(source, end)
+                if topic is end or stop.is_set():
+                    break
+                pool.submit(run, count, topic)
+                count += 1
+        except Exception as exc:
+            arrivals.put(("error", exc, None))
+        arrivals.put(("end", count, None))
+
+    reader = threading.Thread(target=read, name="digest-reader", daemon=True)
+    reader.start()
+    collector = _Collector(ordered)
+    total = None
+    try:
+        while total is None or collector.emitted < total:
+            kind, value, result = arrivals.get()
+            if kind == "error":
+                raise value
+            if kind == "end":
+                total = value
+                continue
+            for ready in collector.add(value, result):
+                yield ready
+                slots.release()
+    finally:
+        # Consumer stopped early (or input failed): drop queued runs.
+        stop.set()
+        slots.release()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def astream_batch(app, topics, max_concurrency: int = DEFAULT_CONCURRENCY,
+                        ordered: bool = False, metrics=None, checkpoint=None,
+                        deadline_s: float = None):
+    """The asyncio twin of stream_batch; ``topics`` may be sync or async."""
+    from pipeline.aio import adigest_topic
+
+    window = _window(max_concurrency, ordered)
+    slots = asyncio.Semaphore(window)
+    gate = asyncio.Semaphore(max_concurrency)
+    arrivals = asyncio.Queue()
+    running = set()
+
+    async def run(seq: int, topic: str):
+        try:
+            async with gate:
+                result = await adigest_topic(app, topic, metrics, checkpoint,
+                                             deadline_in(deadline_s))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:
+            arrivals.put_nowait(("error", exc, None))
+            return
+        arrivals.put_nowait(("result", seq, result))
+
+    async def next_topic(source, end):
+        if hasattr(source, "__anext__"):
+            return await anext(source, end)
+        # A plain iterator may block on I/O (stdin) — read it off the loop.
+        return await asyncio.to_thread(next, source, end)
+
+    async def read():
+        source = aiter(topics) if hasattr(topics, "__aiter__") else iter(topics)
+        end = object()
+        count = 0
+        try:
+            while True:
+                await slots.acquire()
+                topic = await next_topic(source, end)
+                if topic is end:
+                    break
+                task = asyncio.create_task(run(count, topic))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                count += 1
+        except Exception as exc:
+            arrivals.put_nowait(("error", exc, None))
+        arrivals.put_nowait(("end", count, None))
+
+    reader = asyncio.create_task(read())
+    collector = _Collector(ordered)
+    total = None
+    try:
+        while total is None or collector.emitted < total:
+            kind, value, result = await arrivals.get()
+            if kind == "error":
+                raise value
+            if kind == "end":
+                total = value
+                continue
+            for ready in collector.add(value, result):
+                yield ready
+                slots.release()
+    finally:
+        reader.cancel()
+        for task in list(running):
+            task.cancel()
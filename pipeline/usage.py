@@ -0,0 +1,124 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  pipeline/usage.py  —  LLM Call & Token Counter             ║
+╚══════════════════════════════════════════════════════════════╝
+
+ROLE:
+  A LangChain callback handler that counts what one pipeline run
+  spent on the LLM: how many calls, how long they took and how many
+  tokens went in and out (from the response's usage_metadata).
+
+  Hand a fresh tracker to each run through the graph config:
+
+    tracker = UsageTracker()
+    app.invoke(state, config={"callbacks": [tracker]})
+    tracker.totals()  # {'llm_calls': 3, 'llm_seconds': ..., 'input_tokens': ...}
+"""
+
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def usage_from_result(response) -> tuple[int, int]:
+    """(input_tokens, output_tokens) reported in an LLMResult."""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for gen in generations:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+            input_tokens += usage.get("input_tokens", 0)
+            output_tokens += usage.get("output_tokens", 0)
+    return input_tokens, output_tokens
+
+
+class UsageTracker(BaseCallbackHandler):
+    """Counts LLM calls, LLM wall time and token usage for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}   # run_id → perf_counter at start
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        input_tokens, output_tokens = usage_from_result(response)
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                self.llm_seconds += time.perf_counter() - started
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                self.llm_seconds += time.perf_counter() - started
+
+    def totals(self) -> dict:
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "llm_seconds": round(self.llm_seconds, 4),
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+
+class RunningUsage:
+    """summarize_usage() for a stream: add results one by one, keep no list.
+
+    ``topics`` counts every result; ``runs`` only the ones that carry a
+    "usage" block, which the averages are taken over. Results handed
+    back by a checkpoint have none and are counted in ``resumed``.
+    """
+
+    def __init__(self):
+        self.topics = self.runs = self.failed = self.degraded = self.resumed = 0
+        self._sums = {"latency_s": 0.0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0}
+
+    def add(self, result: dict) -> None:
+        self.topics += 1
+        if result.get("from_checkpoint"):
+            self.resumed += 1
+        if result.get("error"):
+            self.failed += 1
+        if result.get("degraded"):
+            self.degraded += 1
+        usage = result.get("usage")
+        if not usage:
+            return
+        self.runs += 1
+        for key in self._sums:
+            self._sums[key] += usage[key]
+
+    def summary(self) -> dict:
+        if not self.runs:
+            return {"runs": 0}
+        return {
+            "runs": self.runs,
+            "avg_latency_s": self._sums["latency_s"] / self.runs,
+            "avg_llm_calls": self._sums["llm_calls"] / self.runs,
+            "avg_input_tokens": self._sums["input_tokens"] / self.runs,
+            "avg_output_tokens": self._sums["output_tokens"] / self.runs,
+        }
+
+
+def summarize_usage(results: list[dict]) -> dict:
+    """Per-topic averages over the "usage" blocks of a batch's results."""
+    running = RunningUsage()
+    for result in results:
+        running.add(result)
+    return running.summary()
@@ -0,0 +1,103 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_aio.py  —  Tests for the Asyncio Runner         ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_aio.py -v
+
+WHAT THESE TESTS CHECK:
+  1. app.ainvoke awaits the async node twins (llm.ainvoke, not invoke)
+  2. Results keep input order and failures stay per-topic
+  3. Hundreds of runs overlap on a single event loop
+  4. astream_digest reports every node as it finishes
+"""
+
+import asyncio
+import time
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_async_echo_llm(delay: float = 0.0, fail_on: str = None):
+    """A mock llm whose .ainvoke() echoes the prompt back (after ``delay``)."""
+    async def ainvoke(prompt):
+        if delay:
+            await asyncio.sleep(delay)
+        if fail_on and fail_on in prompt:
+            raise RuntimeError("LLM exploded")
+        response = MagicMock()
+        response.content = f"echo: {prompt}"
+        return response
+
+    mock_llm = MagicMock()
+    mock_llm.ainvoke.side_effect = ainvoke
+    mock_llm.invoke.side_effect = AssertionError("sync invoke used on the async path")
+    return mock_llm
+
+
+def patch_all_agents(mock_llm):
+    stack = ExitStack()
+    for module in ("agents.fetcher", "agents.tagger", "agents.editor"):
+        stack.enter_context(patch(f"{module}.llm", mock_llm))
+    return stack
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestArunBatch:
+
+    def test_uses_async_nodes_and_keeps_order(self):
+        from main import app
+        from pipeline.aio import arun_batch
+
+        topics = [f"topic {i}" for i in range(10)]
+        mock_llm = make_async_echo_llm()
+        with patch_all_agents(mock_llm):
+            results = asyncio.run(arun_batch(app, topics, max_concurrency=3))
+
+        assert [r["topic"] for r in results] == topics
+        assert all(r["error"] is None for r in results)
+        assert mock_llm.ainvoke.call_count == 30
+        mock_llm.invoke.assert_not_called()
+
+    def test_one_failure_does_not_sink_the_batch(self):
+        from main import app
+        from pipeline.aio import arun_batch
+
+        with patch_all_agents(make_async_echo_llm(fail_on="BOOM")):
+            results = asyncio.run(arun_batch(app, ["ok", "BOOM", "ok too"]))
+
+        assert results[1]["error"] == "RuntimeError: LLM exploded"
+        assert results[0]["error"] is None and results[2]["error"] is None
+
+    def test_hundreds_of_runs_share_one_loop(self):
+        """200 runs x 3 calls x 0.05s is 30s serially — 200-wide must take well under 5s."""
+        from main import app
+        from pipeline.aio import arun_batch
+
+        topics = [f"t{i}" for i in range(200)]
+        with patch_all_agents(make_async_echo_llm(delay=0.05)):
+            start = time.perf_counter()
+            results = asyncio.run(arun_batch(app, topics, max_concurrency=200))
+            elapsed = time.perf_counter() - start
+
+        assert len(results) == 200
+        assert elapsed < 5, f"async batch took {elapsed:.2f}s — runs are not overlapping"
+
+
+class TestAstreamDigest:
+
+    def test_yields_each_node_in_order(self):
+        from main import app
+        from pipeline.aio import astream_digest
+
+        async def collect():
+            return [node async for node, _ in astream_digest(app, "a topic")]
+
+        with patch_all_agents(make_async_echo_llm()):
+            nodes = asyncio.run(collect())
+
+        assert nodes == ["fetcher", "tagger", "editor"]
@@ -0,0 +1,233 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_archive.py  —  Tests for the Digest Archive     ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_archive.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A digest comes back by its topic, however it is spelled, from
+     sealed segments and from the buffer, and after reopening
+  2. A topic appended again returns its latest digest
+  3. scan() streams one category, with only the fields asked for
+  4. The archive compresses, and the index keeps up as it grows
+  5. A crash loses no appended digest, and a lost index is rebuilt
+  6. Closing seals nothing: short runs keep filling one segment
+  7. A second writer is turned away, but read-only opens query the
+     archive while it is being written, and change nothing on disk
+  8. A batch run with an archive keeps its finished digests
+"""
+
+import os
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+CATEGORIES = ("Science", "Politics", "Business")
+
+
+def digest(i: int, category: str = None) -> dict:
+    category = category or CATEGORIES[i % len(CATEGORIES)]
+    return {
+        "topic": f"Story number {i}",
+        "summary": f"A long summary of story {i}. It goes on for a while about what happened.",
+        "tags": f"Keywords: story, number {i}. Category: {category}",
+        "headline": f"Headline {i}",
+        "error": None,
+        "usage": {"latency_s": 0.5, "llm_calls": 3, "input_tokens": 90, "output_tokens": 60},
+    }
+
+
+@pytest.fixture
+def archive(tmp_path):
+    from pipeline.archive import DigestArchive
+
+    with DigestArchive(str(tmp_path / "digests"), segment_rows=100) as archive:
+        yield archive
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestLookup:
+
+    def test_get_by_normalized_topic(self, archive, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        for i in range(250):
+            archive.append(digest(i))
+
+        assert archive.stats()["segments"] == 2 and archive.stats()["buffered"] == 50
+        assert archive.get("Story number 7") == digest(7)           # sealed
+        assert archive.get("  STORY number 230! ") == digest(230)   # still buffered
+        assert archive.get("Story number 999") is None
+        assert "story number 42" in archive
+
+        archive.close()
+        with DigestArchive(str(tmp_path / "digests")) as reopened:
+            assert len(reopened) == 250
+            assert reopened.get("story number 230") == digest(230)
+
+    def test_latest_append_wins(self, archive):
+        for i in range(150):
+            archive.append(digest(i))
+        archive.append({**digest(3), "headline": "Corrected headline"})
+        archive.flush()
+
+        assert archive.get("Story number 3")["headline"] == "Corrected headline"
+        assert len(archive) == 151
+
+
+class TestScan:
+
+    def test_scan_streams_one_category(self, archive):
+        for i in range(300):
+            archive.append(digest(i))
+        archive.append(digest(300, category="Entertainment"))
+
+        science = list(archive.scan("science", fields=["headline"]))
+
+        assert len(science) == 100
+        assert science[0] == {"topic": "Story number 0", "headline": "Headline 0"}
+        assert [d["topic"] for d in archive.scan("Entertainment")] == ["Story number 300"]
+        assert archive.categories() == {"Science": 100, "Politics": 100, "Business": 100,
+                                        "Entertainment": 1}
+
+    def test_scan_reads_extra_fields(self, archive):
+        for i in range(120):
+            archive.append(digest(i))
+
+        usage = [d["usage"]["llm_calls"] for d in archive.scan(fields=["usage"])]
+
+        assert usage == [3] * 120
+
+
+class TestStorage:
+
+    def test_compresses_and_index_grows(self, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        with DigestArchive(str(tmp_path / "digests"), segment_rows=1000) as archive:
+            for i in range(3000):
+                archive.append(digest(i))
+            archive.flush()
+
+            assert all(archive.get(f"story number {i}")["headline"] == f"Headline {i}"
+                       for i in range(0, 3000, 37))
+            stats = archive.stats()
+            assert stats["compression"] > 5
+            assert stats["bytes"] < stats["raw_bytes"]
+
+    def test_crash_loses_nothing(self, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        path = str(tmp_path / "digests")
+        crashed = DigestArchive(path, segment_rows=100)
+        for i in range(130):
+            crashed.append(digest(i))
+        # No close(): 100 digests are sealed, 30 only in the tail log.
+        del crashed                       # the process is gone, and its lock with it
+
+        with DigestArchive(path, segment_rows=100) as recovered:
+            assert len(recovered) == 130
+            assert recovered.get("story number 120") == digest(120)
+        os.remove(os.path.join(path, "index.bin"))
+        with DigestArchive(path) as rebuilt:
+            assert rebuilt.get("story number 5") == digest(5)
+
+    def test_close_leaves_rows_in_the_tail(self, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        path = str(tmp_path / "digests")
+        for run in range(5):
+            with DigestArchive(path, segment_rows=100) as archive:
+                for i in range(run * 30, run * 30 + 30):
+                    archive.append(digest(i))
+
+        with DigestArchive(path, segment_rows=100) as archive:
+            stats = archive.stats()
+            assert (stats["segments"], stats["buffered"]) == (1, 50)
+            assert archive.get("story number 140") == digest(140)
+
+    @pytest.mark.skipif(os.name != "posix", reason="the writer lock needs fcntl")
+    def test_second_writer_is_refused(self, archive, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        with pytest.raises(RuntimeError, match="already open"):
+            DigestArchive(str(tmp_path / "digests"))
+        archive.close()
+        with DigestArchive(str(tmp_path / "digests")) as reopened:
+            assert len(reopened) == 0
+
+
+class TestReadOnly:
+
+    def test_reads_while_a_writer_is_open(self, archive, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        for i in range(130):
+            archive.append(digest(i))                  # 100 sealed, 30 in the tail
+
+        with DigestArchive(str(tmp_path / "digests"), readonly=True) as reader:
+            assert len(reader) == 130
+            assert reader.get("story number 42") == digest(42)
+            assert reader.get("story number 120") == digest(120)
+            assert len(list(reader.scan("Science"))) == 44
+            with pytest.raises(RuntimeError, match="read-only"):
+                reader.append(digest(999))
+
+        archive.append(digest(130))                    # the writer carries on
+        assert len(archive) == 131
+
+    def test_changes_nothing_on_disk(self, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        path = tmp_path / "digests"
+        crashed = DigestArchive(str(path), segment_rows=100)
+        for i in range(230):
+            crashed.append(digest(i))
+        del crashed
+        os.remove(path / "index.bin")                  # left for the next writer to rebuild
+        with open(path / "tail-000002.jsonl", "a", encoding="utf-8") as tail:
+            tail.write('{"topic": "cut sho')            # a torn last line
+        before = {name: (path / name).read_bytes() for name in os.listdir(path)}
+
+        with DigestArchive(str(path), readonly=True) as reader:
+            assert len(reader) == 230
+            assert reader.get("story number 150") == digest(150)    # indexed in memory
+            assert reader.get("story number 222") == digest(222)    # from the tail
+
+        assert {name: (path / name).read_bytes() for name in os.listdir(path)} == before
+
+    def test_missing_archive_is_an_error(self, tmp_path):
+        from pipeline.archive import DigestArchive
+
+        with pytest.raises(FileNotFoundError):
+            DigestArchive(str(tmp_path / "nowhere"), readonly=True)
+        assert not (tmp_path / "nowhere").exists()
+
+
+class TestBatchRun:
+
+    def test_run_topics_archives_finished_digests(self, tmp_path):
+        import config.settings as settings
+        from clients.fake import FakeChatModel
+        from main import build_graph, run_topics
+        from pipeline.archive import DigestArchive
+
+        topics = tmp_path / "topics.txt"
+        topics.write_text("Mars rover finds ice\nCentral bank holds rates\n", encoding="utf-8")
+        previous = settings.set_llm(FakeChatModel(latency_ms=0))
+        try:
+            with DigestArchive(str(tmp_path / "digests")) as archive:
+                run_topics(build_graph(), str(topics), 2, str(tmp_path / "out.jsonl"),
+                           archive=archive)
+                saved = archive.get("mars rover finds ice")
+                assert len(archive) == 2
+        finally:
+            settings.set_llm(previous)
+
+        assert saved["error"] is None and saved["headline"]
+        assert saved["usage"]["llm_calls"] == 3
@@ -0,0 +1,108 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_batch.py  —  Tests for the Batch Runner         ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_batch.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Results come back in the same order as the topics
+  2. One failing topic does not take down the rest of the batch
+  3. Runs really overlap (wall time follows the concurrency cap)
+  4. Topic files skip blank lines and comments
+"""
+
+import time
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_echo_llm(delay: float = 0.0, fail_on: str = None):
+    """A mock llm whose .invoke() echoes the prompt back (after ``delay``)."""
+    def invoke(prompt):
+        if delay:
+            time.sleep(delay)
+        if fail_on and fail_on in prompt:
+            raise RuntimeError("LLM exploded")
+        response = MagicMock()
+        response.content = f"echo: {prompt}"
+        return response
+
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    return mock_llm
+
+
+def patch_all_agents(mock_llm):
+    stack = ExitStack()
+    for module in ("agents.fetcher", "agents.tagger", "agents.editor"):
+        stack.enter_context(patch(f"{module}.llm", mock_llm))
+    return stack
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestRunBatch:
+
+    def test_results_keep_input_order(self):
+        """Result i must belong to topic i, whatever finishes first."""
+        from main import app
+        from pipeline.batch import run_batch
+
+        topics = [f"topic number {i}" for i in range(12)]
+        with patch_all_agents(make_echo_llm()):
+            results = run_batch(app, topics, max_concurrency=4)
+
+        assert [r["topic"] for r in results] == topics
+        assert all(r["error"] is None for r in results)
+        assert all(r["headline"].startswith("echo: ") for r in results)
+
+    def test_one_failure_does_not_sink_the_batch(self):
+        """A topic whose run raises is reported, the others still finish."""
+        from main import app
+        from pipeline.batch import run_batch
+
+        topics = ["fine topic", "BOOM topic", "another fine topic"]
+        with patch_all_agents(make_echo_llm(fail_on="BOOM")):
+            results = run_batch(app, topics, max_concurrency=3)
+
+        assert results[1]["error"] == "RuntimeError: LLM exploded"
+        assert results[0]["error"] is None
+        assert results[2]["error"] is None
+        assert results[2]["headline"] != ""
+
+    def test_runs_overlap_up_to_the_concurrency_cap(self):
+        """8 topics x 3 calls x 0.1s is 2.4s serially — 8-wide must be far faster."""
+        from main import app
+        from pipeline.batch import run_batch
+
+        topics = [f"t{i}" for i in range(8)]
+        with patch_all_agents(make_echo_llm(delay=0.1)):
+            start = time.perf_counter()
+            run_batch(app, topics, max_concurrency=8)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.2, f"batch took {elapsed:.2f}s — runs are not overlapping"
+
+    def test_rejects_zero_concurrency(self):
+        from main import app
+        from pipeline.batch import run_batch
+
+        with pytest.raises(ValueError):
+            run_batch(app, ["t"], max_concurrency=0)
+
+
+class TestLoadTopics:
+
+    def test_skips_blank_lines_and_comments(self, tmp_path):
+        from pipeline.batch import load_topics
+
+        path = tmp_path / "topics.txt"
+        path.write_text("# today's feed\nfirst topic\n\n   \nsecond topic  \n", encoding="utf-8")
+
+        assert load_topics(str(path)) == ["first topic", "second topic"]
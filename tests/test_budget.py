@@ -0,0 +1,146 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_budget.py  —  Tests for Prompt Token Budgets    ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_budget.py -v
+
+WHAT THESE TESTS CHECK:
+  1. compact() strips LLM boilerplate and normalizes whitespace
+  2. compact() keeps whole sentences within the budget
+  3. Downstream agents get compacted prompts, while the digest keeps
+     the full summary (sync and async)
+  4. Saved tokens show up in the run's metrics record
+  5. cap_output_tokens() fills NODE_MODELS without overriding a node
+"""
+
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_mock_llm(return_text: str):
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value = MagicMock(content=return_text)
+    mock_llm.ainvoke = AsyncMock(return_value=MagicMock(content=return_text))
+    return mock_llm
+
+
+def patch_agents(fetcher, tagger, editor):
+    stack = ExitStack()
+    for module, mock_llm in (("fetcher", fetcher), ("tagger", tagger), ("editor", editor)):
+        stack.enter_context(patch(f"agents.{module}.llm", mock_llm))
+    return stack
+
+
+CHATTY = (
+    "Sure! Here's a summary of the news:\n\n"
+    "**Summary:** Scientists   have discovered a new deep-sea creature near volcanic vents.\n"
+    + "It was found at a depth of two thousand metres by a research vessel. " * 20
+    + "\nLet me know if you would like more details!"
+)
+# Also the topic: the fetcher's summary is CHATTY whether or not its bug is fixed.
+TOPIC = CHATTY
+
+
+def prompt_of(mock_llm) -> str:
+    return str(mock_llm.invoke.call_args[0][0])
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestCompact:
+
+    def test_boilerplate_and_whitespace_go(self):
+        from pipeline.budget import compact
+
+        text = "Sure! Here's the summary:\n\n**Summary:**  Ice   found on Mars.\nHope this helps!"
+        assert compact(text, 100) == "Ice found on Mars."
+
+    def test_cut_keeps_whole_sentences(self):
+        from pipeline.budget import compact, count_tokens
+
+        text = "First sentence here. Second sentence here. Third sentence here."
+        short = compact(text, count_tokens("First sentence here. Second sentence here."))
+        assert short == "First sentence here. Second sentence here."
+
+    def test_one_long_sentence_is_cut_on_a_word(self):
+        from pipeline.budget import compact, count_tokens
+
+        short = compact("word " * 100, 10)
+        assert short.endswith("word…")
+        assert count_tokens(short) <= 10
+
+    def test_text_within_budget_is_kept(self):
+        from pipeline.budget import compact
+
+        assert compact("Keywords: ice, Mars. Category: Science", 60) == \
+            "Keywords: ice, Mars. Category: Science"
+
+
+class TestBudgetHook:
+
+    def test_downstream_prompts_shrink_but_digest_keeps_summary(self):
+        from main import build_graph
+        from pipeline.batch import digest_topic
+        from pipeline.budget import TokenBudget
+
+        budget = TokenBudget({"tagger": {"topic": 40, "summary": 40}, "editor": {"summary": 40}})
+        tagger, editor = make_mock_llm("Keywords: a. Category: Science"), make_mock_llm("H")
+        with patch_agents(make_mock_llm(CHATTY), tagger, editor):
+            result = digest_topic(build_graph(hooks=[budget.node_hook]), TOPIC)
+
+        assert result["summary"] == CHATTY
+        assert "Let me know" not in prompt_of(editor)
+        assert "Scientists have discovered" in prompt_of(editor)
+        assert len(prompt_of(editor)) < len(CHATTY) / 4
+        stats = budget.stats()
+        assert "Let me know" not in prompt_of(tagger)
+        assert stats["compacted"] == 3 and stats["tokens_saved"] > 0
+
+    def test_async_nodes_are_compacted_too(self):
+        from main import build_graph
+        from pipeline.aio import adigest_topic
+        from pipeline.budget import TokenBudget
+
+        budget = TokenBudget({"editor": {"summary": 40}})
+        editor = make_mock_llm("H")
+        with patch_agents(make_mock_llm(CHATTY), make_mock_llm("t"), editor):
+            result = asyncio.run(adigest_topic(build_graph(hooks=[budget.node_hook]), TOPIC))
+
+        assert result["headline"] == "H"
+        assert "Let me know" not in str(editor.ainvoke.call_args[0][0])
+
+    def test_saved_tokens_reach_the_metrics(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.budget import TokenBudget
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        budget = TokenBudget({"editor": {"summary": 40}})
+        with MetricsRecorder(trace_memory=False, keep_records=True) as metrics, \
+                patch_agents(make_mock_llm(CHATTY), make_mock_llm("t"), make_mock_llm("H")):
+            run_batch(build_graph(hooks=[budget.node_hook, instrument_node]), [TOPIC],
+                      metrics=metrics)
+            [record] = metrics.records
+            summary = metrics.summary()
+
+        assert record["tokens_saved"] == budget.stats()["tokens_saved"] > 0
+        assert record["nodes"]["editor"]["tokens_saved"] == record["tokens_saved"]
+        assert record["nodes"]["fetcher"]["tokens_saved"] == 0
+        assert summary["tokens"]["saved"] == record["tokens_saved"]
+
+
+class TestOutputCaps:
+
+    def test_caps_fill_node_models_without_overriding(self):
+        import config.settings as settings
+        from pipeline.budget import cap_output_tokens
+
+        with patch.dict(settings.NODE_MODELS, {"tagger": {"max_output_tokens": 32}}, clear=True):
+            cap_output_tokens({"tagger": 256, "editor": 128})
+            assert settings.NODE_MODELS == {"tagger": {"max_output_tokens": 32},
+                                            "editor": {"max_output_tokens": 128}}
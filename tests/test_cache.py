@@ -0,0 +1,138 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_cache.py  —  Tests for the LLM Response Cache   ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_cache.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A repeated prompt is answered from the cache, not the model
+  2. The key follows model + temperature + prompt (and nothing else)
+  3. The SQLite tier survives a fresh process (new memory tier)
+  4. TTL expiry and LRU size eviction
+  5. Per-call request timeouts (run deadlines) still hit the cache
+  6. is_cached() sees a coming hit through layers, without counting it
+"""
+
+import json
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def llm_string(model="gemini-2.5-flash", temperature=0.3, max_retries=6):
+    config = {"id": ["x"], "kwargs": {"model": model, "temperature": temperature,
+                                      "max_retries": max_retries}}
+    return json.dumps(config) + "---[('stop', None)]"
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestTieredLLMCache:
+
+    def test_repeated_prompt_skips_the_model(self, tmp_path):
+        """The second identical call must come back from the cache."""
+        from clients.cache import TieredLLMCache
+
+        cache = TieredLLMCache(str(tmp_path / "llm.sqlite"))
+        model = FakeListChatModel(responses=["first answer", "second answer"], cache=cache)
+
+        assert model.invoke("same prompt").content == "first answer"
+        assert model.invoke("same prompt").content == "first answer"
+        assert model.invoke("other prompt").content == "second answer"
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_key_uses_model_temperature_and_prompt_only(self):
+        from clients.cache import cache_key
+
+        base = cache_key("prompt", llm_string())
+        assert cache_key("prompt", llm_string(max_retries=2)) == base
+        assert cache_key("prompt", llm_string(temperature=0.9)) != base
+        assert cache_key("prompt", llm_string(model="gemini-2.5-pro")) != base
+        assert cache_key("prompt!", llm_string()) != base
+
+    def test_disk_tier_survives_a_new_process(self, tmp_path):
+        from clients.cache import TieredLLMCache
+
+        path = str(tmp_path / "llm.sqlite")
+        first = TieredLLMCache(path)
+        FakeListChatModel(responses=["stored answer"], cache=first).invoke("topic")
+        first.close()
+
+        second = TieredLLMCache(path)
+        assert second.stats()["memory_size"] == 0
+        model = FakeListChatModel(responses=["stored answer"], cache=second)
+
+        assert model.invoke("topic").content == "stored answer"
+        assert second.stats()["disk_hits"] == 1
+        assert second.stats()["misses"] == 0
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        from clients.cache import TieredLLMCache
+
+        cache = TieredLLMCache(str(tmp_path / "llm.sqlite"), ttl=60)
+        model = FakeListChatModel(responses=["old", "new"], cache=cache)
+        with patch("clients.cache.time.time", return_value=1_000.0):
+            model.invoke("p")
+        with patch("clients.cache.time.time", return_value=1_030.0):
+            assert model.invoke("p").content == "old"
+        with patch("clients.cache.time.time", return_value=1_061.0):
+            assert model.invoke("p").content == "new"
+
+        assert cache.stats()["expired"] == 1
+
+    def test_request_timeouts_still_hit(self):
+        """Every call under a deadline has its own timeout; none may miss for it."""
+        import time
+
+        from clients.cache import TieredLLMCache, cache_key
+        from pipeline.deadline import RequestTimeoutLLM, _node_deadline
+
+        assert (cache_key("p", "[('stop', None), ('timeout', 1.5)]")
+                == cache_key("p", "[('stop', None)]"))
+
+        cache = TieredLLMCache(path=None)
+        model = RequestTimeoutLLM(FakeListChatModel(responses=["a", "b"], cache=cache))
+        token = _node_deadline.set(time.time() + 30)
+        try:
+            answers = [model.invoke("same prompt").content for _ in range(3)]
+        finally:
+            _node_deadline.reset(token)
+
+        assert answers == ["a", "a", "a"]
+        assert cache.stats()["memory_hits"] == 2
+
+    def test_lru_evicts_oldest_entries(self):
+        from clients.cache import TieredLLMCache
+
+        cache = TieredLLMCache(path=None, memory_entries=2)
+        model = FakeListChatModel(responses=["a", "b", "c", "a-again"], cache=cache)
+        for prompt in ("p1", "p2", "p3"):
+            model.invoke(prompt)
+
+        assert cache.stats()["memory_size"] == 2
+        assert model.invoke("p1").content == "a-again"   # p1 was evicted
+        assert model.invoke("p3").content == "c"         # p3 still cached
+
+    def test_is_cached_looks_through_layers(self):
+        from clients.base import LLMWrapper
+        from clients.cache import TieredLLMCache, is_cached
+        from clients.routing import LatencyRouter
+
+        cache = TieredLLMCache(path=None)
+        primary = FakeListChatModel(responses=["a"], cache=cache)
+        fallback = FakeListChatModel(responses=["b"], cache=cache, sleep=None)
+        layered = LLMWrapper(primary)
+
+        assert not is_cached(layered, "p")
+        layered.invoke("p")
+        assert is_cached(layered, "p") and not is_cached(layered, "q")
+        assert not is_cached(LatencyRouter(primary, fallback, 1.0), "p"), \
+            "the fallback model may answer, and it hasn't seen the prompt"
+        assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 0
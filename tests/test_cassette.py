@@ -0,0 +1,183 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_cassette.py  —  Tests for LLM Cassettes         ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_cassette.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A recorded run replays to the same digests and token counts,
+     without calling the recorded model (sync and async)
+  2. Replay answers at once, or with the recorded latencies
+  3. A prompt missing from the cassette fails the run loudly
+  4. Recording into an existing cassette adds to it
+  5. Batched and streamed calls are recorded one entry per prompt
+  6. A recording that never stopped cleanly (crash, Ctrl-C) is kept
+
+  Recording runs against the offline FakeChatModel — no API key,
+  no network.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+
+import pytest
+
+TOPICS = ["Mars rover finds ice", "New chip doubles AI speed", "Central bank holds rates"]
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+@pytest.fixture
+def llm_slot():
+    """Restore the shared client after the test."""
+    import config.settings as settings
+
+    previous = settings.set_llm(None)
+    yield settings
+    settings.set_llm(previous)
+
+
+def record(settings, path, topics=TOPICS, latency_ms=0):
+    from clients.cassette import disable_recording, enable_recording
+    from clients.fake import FakeChatModel
+    from main import build_graph
+    from pipeline.batch import run_batch
+
+    settings.set_llm(FakeChatModel(latency_ms=latency_ms))
+    cassette = enable_recording(str(path))
+    try:
+        return run_batch(build_graph(), topics)
+    finally:
+        disable_recording(cassette)
+
+
+def digests(results):
+    return [(r["topic"], r["summary"], r["tags"], r["headline"],
+             r["usage"]["llm_calls"], r["usage"]["input_tokens"], r["usage"]["output_tokens"])
+            for r in results]
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestRecordAndReplay:
+
+    def test_replay_matches_the_recording(self, llm_slot, tmp_path):
+        from clients.cassette import replay_cassette
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        recorded = record(llm_slot, tmp_path / "run.cassette")
+        model = replay_cassette(str(tmp_path / "run.cassette"))
+        replayed = run_batch(build_graph(), TOPICS)
+
+        assert digests(replayed) == digests(recorded)
+        assert model.cassette.stats()["hits"] == 3 * len(TOPICS)
+
+    def test_async_replay(self, llm_slot, tmp_path):
+        from clients.cassette import replay_cassette
+        from main import build_graph
+        from pipeline.aio import arun_batch
+
+        recorded = record(llm_slot, tmp_path / "run.cassette")
+        replay_cassette(str(tmp_path / "run.cassette"))
+        replayed = asyncio.run(arun_batch(build_graph(), TOPICS))
+
+        assert digests(replayed) == digests(recorded)
+
+    def test_replay_with_recorded_latency(self, llm_slot, tmp_path):
+        from clients.cassette import replay_cassette
+        from main import build_graph
+        from pipeline.batch import digest_topic
+
+        record(llm_slot, tmp_path / "run.cassette", TOPICS[:1], latency_ms=60)
+        graph = build_graph()
+
+        replay_cassette(str(tmp_path / "run.cassette"))
+        instant = digest_topic(graph, TOPICS[0])["usage"]["latency_s"]
+        replay_cassette(str(tmp_path / "run.cassette"), latency_scale=1.0)
+        paced = digest_topic(graph, TOPICS[0])["usage"]["latency_s"]
+
+        assert instant < 0.1
+        assert paced >= 3 * 0.06
+
+    def test_missing_prompt_fails_the_run(self, llm_slot, tmp_path):
+        from clients.cassette import replay_cassette
+        from main import build_graph
+        from pipeline.batch import digest_topic
+
+        record(llm_slot, tmp_path / "run.cassette", TOPICS[:1])
+        model = replay_cassette(str(tmp_path / "run.cassette"))
+        result = digest_topic(build_graph(), "A topic nobody recorded")
+
+        assert result["error"].startswith("CassetteMiss")
+        assert model.cassette.stats()["misses"] == 1
+
+
+class TestCassetteFile:
+
+    def test_recording_adds_to_an_existing_cassette(self, llm_slot, tmp_path):
+        from clients.cassette import Cassette
+
+        path = tmp_path / "run.cassette"
+        record(llm_slot, path, TOPICS[:1])
+        record(llm_slot, path, TOPICS[:2])
+
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline())
+            entries = [json.loads(line) for line in file]
+        assert header == {"cassette": 1, "entries": 6}
+        assert {e["node"] for e in entries} == {"fetcher", "tagger", "editor"}
+        assert len(Cassette(str(path))) == 6
+
+    def test_batches_are_recorded_per_prompt(self, tmp_path):
+        from clients.cassette import Cassette, CassetteChatModel, RecordingLLM
+        from clients.fake import FakeChatModel
+
+        cassette = Cassette(str(tmp_path / "batch.cassette"))
+        answers = RecordingLLM(FakeChatModel(latency_ms=0), cassette).batch(["one", "two"])
+        cassette.save()
+
+        replay = CassetteChatModel.from_file(str(tmp_path / "batch.cassette"))
+        started = time.perf_counter()
+        assert replay.invoke("two").content == answers[1].content
+        assert time.perf_counter() - started < 0.1
+        assert len(cassette) == 2
+
+    def test_streamed_calls_are_recorded(self, tmp_path):
+        from clients.cassette import Cassette, CassetteChatModel, RecordingLLM
+        from clients.fake import FakeChatModel
+
+        cassette = Cassette(str(tmp_path / "stream.cassette"))
+        chunks = list(RecordingLLM(FakeChatModel(latency_ms=0), cassette).stream("hello"))
+        cassette.save()
+
+        replay = CassetteChatModel.from_file(str(tmp_path / "stream.cassette"))
+        answer = replay.invoke("hello")
+        assert len(chunks) > 1
+        assert answer.content == "".join(c.content for c in chunks)
+        assert answer.usage_metadata["output_tokens"] > 0
+
+    def test_unsaved_recording_survives_a_crash(self, llm_slot, tmp_path):
+        from clients.cassette import Cassette, enable_recording
+        from clients.fake import FakeChatModel
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        path = tmp_path / "run.cassette"
+        llm_slot.set_llm(FakeChatModel(latency_ms=0))
+        cassette = enable_recording(str(path))
+        try:
+            run_batch(build_graph(), TOPICS[:2])
+        finally:
+            llm_slot.remove_llm_layer(cassette.layer)     # "crash": never saved
+
+        assert not path.exists()
+        recovered = Cassette(str(path))
+        assert len(recovered) == 6
+        recovered.save()
+        assert not (tmp_path / "run.cassette.journal").exists()
+        assert len(Cassette(str(path))) == 6
@@ -0,0 +1,187 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_checkpoint.py  —  Tests for Resumable Batches   ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_checkpoint.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Every finished node is saved as soon as it finishes
+  2. A re-run resumes a half-finished topic at its first unfinished
+     node — the finished ones make no LLM call
+  3. Completed topics are skipped entirely, also from a new process —
+     their saved result carries no usage, so it is not counted twice
+  4. The async runner resumes the same way
+  5. A run with another fingerprint (mode, models, prompts) reuses
+     nothing the store holds
+"""
+
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_mock_llm(text: str, fail: bool = False):
+    """A mock llm that answers ``text`` (or raises when ``fail``)."""
+    response = MagicMock()
+    response.content = text
+    mock_llm = MagicMock()
+    if fail:
+        mock_llm.invoke.side_effect = RuntimeError("quota exhausted")
+        mock_llm.ainvoke = AsyncMock(side_effect=RuntimeError("quota exhausted"))
+    else:
+        mock_llm.invoke.return_value = response
+        mock_llm.ainvoke = AsyncMock(return_value=response)
+    return mock_llm
+
+
+def patch_agents(**llms):
+    stack = ExitStack()
+    for name, mock_llm in llms.items():
+        stack.enter_context(patch(f"agents.{name}.llm", mock_llm))
+    return stack
+
+
+@pytest.fixture
+def store(tmp_path):
+    from pipeline.checkpoint import CheckpointStore
+
+    with CheckpointStore(str(tmp_path / "checkpoints.sqlite")) as store:
+        yield store
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestCheckpointedBatch:
+
+    def test_resume_skips_finished_nodes(self, store):
+        """The crash happens in the tagger; the re-run must not call the fetcher again."""
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        graph = build_graph(hooks=[store.node_hook])
+        fetcher = make_mock_llm("A summary.")
+        with patch_agents(fetcher=fetcher, tagger=make_mock_llm("", fail=True),
+                          editor=make_mock_llm("Headline")):
+            first = run_batch(graph, ["topic"], checkpoint=store)
+
+        assert first[0]["error"] == "RuntimeError: quota exhausted"
+        assert store.finished_nodes("topic") == ["fetcher"]
+        assert store.result("topic") is None, "failed runs must not count as completed"
+
+        tagger, editor = make_mock_llm("Keywords: x"), make_mock_llm("Headline")
+        with patch_agents(fetcher=fetcher, tagger=tagger, editor=editor):
+            second = run_batch(graph, ["topic"], checkpoint=store)
+
+        assert fetcher.invoke.call_count == 1, "the fetcher's saved output should have been reused"
+        assert tagger.invoke.call_count == 1
+        assert second[0]["error"] is None
+        assert second[0]["tags"] == "Keywords: x"
+        assert store.stats()["nodes_replayed"] == 1
+
+    def test_completed_topics_are_skipped(self, store):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.checkpoint import CheckpointStore
+
+        graph = build_graph(hooks=[store.node_hook])
+        with patch_agents(fetcher=make_mock_llm("S"), tagger=make_mock_llm("T"),
+                          editor=make_mock_llm("H")):
+            first = run_batch(graph, ["one", "two"], checkpoint=store)
+
+        # A brand-new store on the same file, as after a restart.
+        reopened = CheckpointStore(store.path)
+        llm = make_mock_llm("should not be used")
+        with patch_agents(fetcher=llm, tagger=llm, editor=llm):
+            again = run_batch(build_graph(hooks=[reopened.node_hook]), ["one", "two", "three"],
+                              checkpoint=reopened)
+        skipped = reopened.stats()["topics_skipped"]
+        reopened.close()
+
+        assert again[:2] == [{**{k: v for k, v in r.items() if k != "usage"},
+                              "from_checkpoint": True} for r in first], \
+            "completed topics should return their saved results, without the old usage"
+        assert llm.invoke.call_count == 3, "only the new topic should reach the LLM"
+        assert skipped == 2
+
+    def test_stats_count_completed_and_partial(self, store):
+        store.save_node("half", "fetcher", {"summary": "s"})
+        store.save_node("done", "fetcher", {"summary": "s"})
+        store.save_result("done", {"topic": "done", "error": None})
+        store.save_result("failed", {"topic": "failed", "error": "RuntimeError: x"})
+
+        stats = store.stats()
+        assert stats["completed"] == 1
+        assert stats["partial"] == 1
+
+    def test_resumed_results_are_not_counted_twice(self, store):
+        from pipeline.usage import RunningUsage
+
+        store.save_result("done", {"topic": "done", "error": None,
+                                   "usage": {"latency_s": 9.0, "llm_calls": 3,
+                                             "input_tokens": 90, "output_tokens": 60}})
+        fresh = {"topic": "new", "error": None,
+                 "usage": {"latency_s": 1.0, "llm_calls": 3, "input_tokens": 30, "output_tokens": 20}}
+        usage = RunningUsage()
+        usage.add(store.result("done"))
+        usage.add(fresh)
+
+        assert "usage" not in store.result("done")
+        assert (usage.topics, usage.runs, usage.resumed) == (2, 1, 1)
+        assert usage.summary()["avg_latency_s"] == 1.0
+
+
+class TestFingerprint:
+
+    def test_other_fingerprint_reuses_nothing(self, tmp_path):
+        from pipeline.checkpoint import CheckpointStore, run_fingerprint
+
+        path = str(tmp_path / "checkpoints.sqlite")
+        chain, fused = run_fingerprint("chain", "llm"), run_fingerprint("fused")
+        with CheckpointStore(path, chain) as store:
+            store.save_node("topic", "fetcher", {"summary": "s"})
+            store.save_result("done", {"topic": "done", "error": None})
+
+        with CheckpointStore(path, fused) as other:
+            assert other.result("done") is None
+            assert other.node_output("topic", "fetcher") is None
+            assert other.stats()["completed"] == 0 and other.stats()["partial"] == 0
+        with CheckpointStore(path, chain) as same:
+            assert same.result("done") == {"topic": "done", "error": None, "from_checkpoint": True}
+
+    def test_fingerprint_follows_models_and_settings(self, monkeypatch):
+        import config.settings as settings
+        from pipeline.checkpoint import run_fingerprint
+
+        base = run_fingerprint("chain", "llm")
+        assert run_fingerprint("chain", "llm") == base
+        assert run_fingerprint("chain", "local") != base
+        assert run_fingerprint("chain", "llm", token_budget=True) != base
+        assert run_fingerprint("chain", "llm", llm="fake") != base
+        monkeypatch.setattr(settings, "NODE_MODELS", {"editor": {"model": "gemini-2.5-pro"}})
+        assert run_fingerprint("chain", "llm") != base
+
+
+class TestCheckpointedAsyncBatch:
+
+    def test_async_resume_skips_finished_nodes(self, store):
+        from main import build_graph
+        from pipeline.aio import arun_batch
+
+        graph = build_graph(hooks=[store.node_hook])
+        fetcher = make_mock_llm("A summary.")
+        with patch_agents(fetcher=fetcher, tagger=make_mock_llm("", fail=True),
+                          editor=make_mock_llm("H")):
+            asyncio.run(arun_batch(graph, ["topic"], checkpoint=store))
+
+        with patch_agents(fetcher=fetcher, tagger=make_mock_llm("T"), editor=make_mock_llm("H")):
+            results = asyncio.run(arun_batch(graph, ["topic"], checkpoint=store))
+
+        assert fetcher.ainvoke.await_count == 1
+        assert results[0]["error"] is None
+        assert store.finished_nodes("topic") == ["fetcher", "tagger", "editor"]
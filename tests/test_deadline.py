@@ -0,0 +1,187 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_deadline.py  —  Tests for Per-Run Deadlines     ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_deadline.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A node that outlives the run's deadline is cut off, and the
+     run finishes on time with local fallbacks (sync and async)
+  2. The result lists the degraded nodes
+  3. The LLM request gets the remaining budget as its timeout, so it
+     stops at the deadline too
+  4. Runs without a deadline are untouched
+  5. Degraded output is never checkpointed
+  6. A batch wider than the node pool doesn't degrade from queueing
+"""
+
+import asyncio
+import time
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_slow_llm(return_text: str, delay: float = 0.0):
+    """A mock llm answering ``return_text`` after ``delay`` seconds (sync and async)."""
+    def invoke(prompt):
+        time.sleep(delay)
+        return MagicMock(content=return_text)
+
+    async def ainvoke(prompt):
+        await asyncio.sleep(delay)
+        return MagicMock(content=return_text)
+
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    mock_llm.ainvoke.side_effect = ainvoke
+    return mock_llm
+
+
+def patch_agents(fetcher, tagger, editor):
+    stack = ExitStack()
+    for module, mock_llm in (("fetcher", fetcher), ("tagger", tagger), ("editor", editor)):
+        stack.enter_context(patch(f"agents.{module}.llm", mock_llm))
+    return stack
+
+
+TOPIC = "Scientists discover a new deep-sea creature near volcanic vents in the Pacific Ocean"
+STUCK = 2.0
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestDeadlineRuns:
+
+    def test_slow_node_is_cut_off(self):
+        from main import build_graph
+        from pipeline.batch import digest_topic
+        from pipeline.deadline import deadline_in
+
+        editor = make_slow_llm("Editor headline")
+        with patch_agents(make_slow_llm("summary"), make_slow_llm("tags", STUCK), editor):
+            started = time.perf_counter()
+            result = digest_topic(build_graph(), TOPIC, deadline=deadline_in(0.3))
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < STUCK / 2, "the run must not wait for the stuck tagger"
+        assert result["error"] is None
+        assert result["degraded"] == ["tagger", "editor"]
+        assert result["headline"] and result["headline"] != "Editor headline"
+        editor.invoke.assert_not_called()
+
+    def test_async_slow_node_is_cut_off(self):
+        from main import build_graph
+        from pipeline.aio import arun_batch
+
+        with patch_agents(make_slow_llm("s", STUCK), make_slow_llm("t"), make_slow_llm("h")):
+            started = time.perf_counter()
+            results = asyncio.run(arun_batch(build_graph(), [TOPIC] * 3, deadline_s=0.2))
+
+        assert time.perf_counter() - started < STUCK / 2
+        for result in results:
+            assert result["degraded"] == ["fetcher", "tagger", "editor"]
+            assert result["summary"] == TOPIC
+            assert result["tags"].endswith("Category: Science"), "local tags are used when sure"
+
+    def test_request_gets_the_remaining_budget_as_timeout(self):
+        """The LLM call itself stops at the deadline — not just the wait for it."""
+        import config.settings as settings
+        from clients.fake import FakeChatModel
+        from main import build_graph
+        from pipeline.batch import digest_topic
+        from pipeline.deadline import deadline_in, disable_request_timeouts, enable_request_timeouts
+
+        calls = []
+
+        class SpyModel(FakeChatModel):
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                try:
+                    return super()._generate(messages, stop, run_manager, **kwargs)
+                finally:
+                    calls.append((kwargs.get("timeout"), time.perf_counter()))
+
+        previous = settings.set_llm(SpyModel(latency_ms=STUCK * 1000))
+        layer = enable_request_timeouts()
+        try:
+            started = time.perf_counter()
+            result = digest_topic(build_graph(), TOPIC, deadline=deadline_in(0.3))
+            time.sleep(0.1)
+        finally:
+            disable_request_timeouts(layer)
+            settings.set_llm(previous)
+
+        assert result["degraded"] == ["fetcher", "tagger", "editor"]
+        [(timeout, finished)] = calls
+        assert 0 < timeout <= 0.3
+        assert finished - started < STUCK / 2, "the request kept running past the deadline"
+
+    def test_no_time_left_means_no_llm_calls(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        mock_llm = make_slow_llm("never")
+        with patch_agents(mock_llm, mock_llm, mock_llm):
+            [result] = run_batch(build_graph(mode="fused"), [TOPIC], deadline_s=0)
+
+        assert result["degraded"] == ["fused"]
+        assert result["usage"]["llm_calls"] == 0
+        mock_llm.invoke.assert_not_called()
+
+    def test_wide_batch_does_not_queue_for_node_threads(self, monkeypatch):
+        """Runs beyond the pool's size must not spend their budget waiting for a thread."""
+        import pipeline.deadline as deadline
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        monkeypatch.setattr(deadline, "_node_threads", 2)
+        monkeypatch.setattr(deadline, "_node_pool", None)
+        mock_llm = make_slow_llm("answer", delay=0.1)
+        with patch_agents(mock_llm, mock_llm, mock_llm):
+            results = run_batch(build_graph(), [f"{TOPIC} {i}" for i in range(6)],
+                                max_concurrency=6, deadline_s=0.6)
+
+        assert [r["degraded"] for r in results] == [[]] * 6
+        assert deadline._node_threads == 6
+
+    def test_runs_without_a_deadline_are_untouched(self):
+        from main import build_graph
+        from pipeline.batch import digest_topic
+
+        mock_llm = make_slow_llm("answer")
+        with patch_agents(mock_llm, mock_llm, mock_llm):
+            result = digest_topic(build_graph(), TOPIC)
+
+        assert "degraded" not in result and "deadline" not in result
+        assert result["headline"] == "answer"
+
+
+class TestFallbacks:
+
+    def test_clip_keeps_whole_words(self):
+        from pipeline.deadline import clip
+
+        assert clip("short  text", 80) == "short text"
+        clipped = clip("one two three four five", 12)
+        assert clipped == "one two…"
+        assert len(clipped) <= 12
+
+    def test_degraded_output_is_not_checkpointed(self, tmp_path):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.checkpoint import CheckpointStore
+
+        mock_llm = make_slow_llm("answer")
+        with CheckpointStore(str(tmp_path / "ck.sqlite")) as store, \
+                patch_agents(mock_llm, mock_llm, mock_llm):
+            graph = build_graph(hooks=[store.node_hook])
+            [rushed] = run_batch(graph, [TOPIC], checkpoint=store, deadline_s=0)
+            [relaxed] = run_batch(graph, [TOPIC], checkpoint=store)
+            stats = store.stats()
+
+        assert rushed["degraded"] == ["fetcher", "tagger", "editor"]
+        assert relaxed["headline"] == "answer"
+        assert stats["topics_skipped"] == 0 and stats["nodes_replayed"] == 0
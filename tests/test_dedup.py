@@ -0,0 +1,170 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_dedup.py  —  Tests for Near-Duplicate Topics    ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_dedup.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Rephrasings of one story score above the threshold, different
+     stories below it
+  2. A near-duplicate reuses the earlier digest with no LLM call,
+     and says which topic it came from
+  3. A duplicate of a topic still running waits for it (sync and async)
+  4. A failed original is not reused
+  5. The threshold is tunable and the index forgets old topics
+"""
+
+import asyncio
+import time
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_slow_llm(return_text: str, delay: float = 0.0):
+    """A mock llm answering ``return_text`` after ``delay`` seconds (sync and async)."""
+    def invoke(prompt):
+        time.sleep(delay)
+        return MagicMock(content=return_text)
+
+    async def ainvoke(prompt):
+        await asyncio.sleep(delay)
+        return MagicMock(content=return_text)
+
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    mock_llm.ainvoke.side_effect = ainvoke
+    return mock_llm
+
+
+def patch_agents(mock_llm):
+    stack = ExitStack()
+    for module in ("fetcher", "tagger", "editor"):
+        stack.enter_context(patch(f"agents.{module}.llm", mock_llm))
+    return stack
+
+
+ORIGINAL = "Scientists discover a new deep-sea creature near volcanic vents"
+REPHRASED = "New deep-sea creature discovered near volcanic vents"
+SAME_WORDS = "Scientists discovered new deep sea creature near a volcanic vent"
+OTHER = "Central bank holds interest rates steady"
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestSimilarity:
+
+    def test_rephrasings_score_high_and_other_stories_low(self):
+        from pipeline.dedup import DEFAULT_THRESHOLD, jaccard, shingles
+
+        def score(a, b):
+            return jaccard(shingles(a), shingles(b))
+
+        assert score(ORIGINAL, SAME_WORDS) == 1.0
+        assert score(ORIGINAL, REPHRASED) >= DEFAULT_THRESHOLD
+        assert score(ORIGINAL, OTHER) < 0.2
+        assert score("Apple unveils new iPhone", "Apple unveils new iPad") < DEFAULT_THRESHOLD
+
+    def test_index_finds_near_duplicates(self):
+        from pipeline.dedup import TopicIndex
+
+        index = TopicIndex()
+        _, original, _ = index.claim(ORIGINAL)
+        assert original is None
+        _, original, similarity = index.claim(REPHRASED)
+        assert original == ORIGINAL and similarity >= 0.7
+        _, original, _ = index.claim(OTHER)
+        assert original is None
+
+
+class TestDedupGraph:
+
+    def test_duplicate_reuses_the_digest(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.dedup import DedupGraph
+
+        mock_llm = make_slow_llm("answer")
+        graph = DedupGraph(build_graph())
+        with patch_agents(mock_llm):
+            results = run_batch(graph, [ORIGINAL, OTHER, REPHRASED, SAME_WORDS], max_concurrency=1)
+
+        assert mock_llm.invoke.call_count == 6, "two pipelines, not four"
+        original, other, rephrased, same = results
+        assert rephrased["topic"] == REPHRASED
+        assert rephrased["duplicate_of"] == ORIGINAL
+        assert rephrased["headline"] == original["headline"]
+        assert rephrased["usage"]["llm_calls"] == 0
+        assert "duplicate_of" not in other
+        stats = graph.index.stats()
+        assert (stats["reused"], stats["exact"], stats["near"]) == (2, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_duplicate_waits_for_a_running_original(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.dedup import DedupGraph
+
+        mock_llm = make_slow_llm("answer", delay=0.05)
+        graph = DedupGraph(build_graph())
+        with patch_agents(mock_llm):
+            results = run_batch(graph, [ORIGINAL, REPHRASED, SAME_WORDS], max_concurrency=3)
+
+        assert mock_llm.invoke.call_count == 3
+        assert [r.get("duplicate_of") for r in results] == [None, ORIGINAL, ORIGINAL]
+        assert graph.index.stats()["waited"] == 2
+
+    def test_async_duplicates_share_one_run(self):
+        from main import build_graph
+        from pipeline.aio import arun_batch
+        from pipeline.dedup import DedupGraph
+
+        mock_llm = make_slow_llm("answer", delay=0.05)
+        graph = DedupGraph(build_graph())
+        with patch_agents(mock_llm):
+            results = asyncio.run(arun_batch(graph, [ORIGINAL, REPHRASED, OTHER]))
+
+        assert mock_llm.ainvoke.call_count == 6
+        assert results[1]["duplicate_of"] == ORIGINAL
+        assert results[1]["error"] is None
+
+    def test_failed_original_is_not_reused(self):
+        from main import build_graph
+        from pipeline.batch import digest_topic
+        from pipeline.dedup import DedupGraph
+
+        broken = MagicMock()
+        broken.invoke.side_effect = RuntimeError("503")
+        graph = DedupGraph(build_graph())
+        with patch_agents(broken):
+            failed = digest_topic(graph, ORIGINAL)
+        with patch_agents(make_slow_llm("answer")):
+            retried = digest_topic(graph, REPHRASED)
+
+        assert failed["error"] is not None
+        assert retried["error"] is None and "duplicate_of" not in retried
+        assert graph.index.stats()["rerun"] == 1
+
+
+class TestTuning:
+
+    def test_stricter_threshold_keeps_rephrasings_apart(self):
+        from pipeline.dedup import TopicIndex
+
+        index = TopicIndex(threshold=0.9)
+        index.claim(ORIGINAL)
+        assert index.claim(REPHRASED)[1] is None
+        assert index.claim(SAME_WORDS)[1] == ORIGINAL
+
+    def test_old_topics_are_forgotten(self):
+        from pipeline.dedup import TopicIndex
+
+        index = TopicIndex(max_topics=2)
+        for topic in (ORIGINAL, OTHER, "Mars rover finds ice"):
+            index.claim(topic)
+
+        assert len(index) == 2
+        assert index.claim(REPHRASED)[1] is None
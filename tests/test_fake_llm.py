@@ -0,0 +1,120 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_fake_llm.py  —  Tests for the Fake LLM & Bench  ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_fake_llm.py -v
+
+WHAT THESE TESTS CHECK:
+  1. The same prompt always gets the same answer; its n-th call the
+     same latency and outcome — so a retry of a failed call can succeed,
+     and reset_calls() replays a run from its first call
+  2. Error rate, latency and response size follow the settings
+  3. Answers are shaped for each agent (tags, JSON for fused mode)
+  4. The benchmark runs the real graph end to end, offline
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestFakeChatModel:
+
+    def test_is_deterministic_per_prompt(self):
+        from clients.fake import FakeChatModel
+
+        a = FakeChatModel(latency_ms=0, seed=7)
+        b = FakeChatModel(latency_ms=0, seed=7)
+        assert a.invoke("same prompt").content == b.invoke("same prompt").content
+        assert a.invoke("same prompt").content != a.invoke("other prompt").content
+
+    def test_retries_get_a_fresh_draw(self):
+        from clients.fake import FakeChatModel, FakeLLMError
+
+        def outcomes(fake, prompt):
+            seen = []
+            for _ in range(8):
+                try:
+                    fake.invoke(prompt)
+                    seen.append("ok")
+                except FakeLLMError:
+                    seen.append("error")
+            return seen
+
+        runs = [outcomes(FakeChatModel(latency_ms=0, error_rate=0.5), f"prompt {i}")
+                for i in range(10)]
+        again = [outcomes(FakeChatModel(latency_ms=0, error_rate=0.5), f"prompt {i}")
+                 for i in range(10)]
+
+        assert runs == again, "the n-th call of a prompt must replay exactly"
+        assert any(seen[0] == "error" and "ok" in seen for seen in runs), \
+            "a prompt that failed once should be able to succeed on retry"
+
+        fake = FakeChatModel(latency_ms=0, error_rate=0.5)
+        first = [outcomes(fake, f"prompt {i}") for i in range(10)]
+        fake.reset_calls()
+        assert [outcomes(fake, f"prompt {i}") for i in range(10)] == first == runs, \
+            "after reset_calls() the same model replays from the first call"
+
+    def test_error_rate_is_honoured(self):
+        from clients.fake import FakeChatModel, FakeLLMError
+
+        fake = FakeChatModel(latency_ms=0, error_rate=0.3, error_code=429)
+        failures = 0
+        for i in range(300):
+            try:
+                fake.invoke(f"prompt {i}")
+            except FakeLLMError as exc:
+                assert exc.code == 429
+                failures += 1
+
+        assert 50 < failures < 130, f"{failures}/300 failed for a 30% error rate"
+
+    def test_latency_and_usage(self):
+        from clients.fake import FakeChatModel
+
+        fake = FakeChatModel(latency_ms=50, response_words=10)
+        start = time.perf_counter()
+        message = fake.invoke("Write a 2-3 sentence news summary about: cats")
+        assert time.perf_counter() - start >= 0.05
+        assert len(message.content.split()) == 10
+        assert message.usage_metadata["input_tokens"] > 0
+
+        async_message = asyncio.run(fake.ainvoke("Write a 2-3 sentence news summary about: cats"))
+        assert async_message.content == message.content
+
+    def test_answers_are_shaped_for_each_agent(self):
+        from clients.fake import FakeChatModel
+
+        fake = FakeChatModel(latency_ms=0)
+        tags = fake.invoke("From this text, extract 3 keywords and assign one category").content
+        assert tags.startswith("Keywords: ") and ". Category: " in tags
+
+        fused = json.loads(fake.invoke("reply with ONLY a JSON object").content)
+        assert set(fused) == {"summary", "tags", "headline"}
+
+    def test_rejects_unknown_distribution(self):
+        from clients.fake import FakeChatModel
+
+        with pytest.raises(ValueError):
+            FakeChatModel(latency_dist="bimodal").invoke("x")
+
+
+class TestPipelineBench:
+
+    def test_runs_the_real_graph_offline(self):
+        from bench.pipeline_bench import run_bench
+        from clients.fake import FakeChatModel
+
+        rows = run_bench([1, 4], [6], FakeChatModel(latency_ms=1))
+
+        assert [(r["topics"], r["concurrency"]) for r in rows] == [(6, 1), (6, 4)]
+        assert all(r["errors"] == 0 and r["runs_per_s"] > 0 for r in rows)
+        assert all(r["p50"] <= r["p95"] <= r["p99"] for r in rows)
@@ -0,0 +1,95 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_fused.py  —  Tests for the Fused "Fast" Mode    ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_fused.py -v
+
+WHAT THESE TESTS CHECK:
+  1. The JSON answer is unpacked into summary / tags / headline
+  2. Code fences and chatter around the JSON are tolerated
+  3. Unparseable answers still produce a summary
+  4. Fused mode makes ONE LLM call where the chain makes three,
+     and the batch results report it
+"""
+
+import json
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+ANSWER = {
+    "summary": "Researchers found a new species near hydrothermal vents.",
+    "tags": "Keywords: deep-sea, vents, biology. Category: Science",
+    "headline": "New Species Thrives Beside Boiling Vents",
+}
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_mock_llm(return_text: str):
+    mock_response = MagicMock()
+    mock_response.content = return_text
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value = mock_response
+    return mock_llm
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestParseFusedResponse:
+
+    def test_plain_json(self):
+        from agents.fused import parse_fused_response
+
+        assert parse_fused_response(json.dumps(ANSWER)) == ANSWER
+
+    def test_code_fence_and_chatter(self):
+        from agents.fused import parse_fused_response
+
+        text = "Sure! Here it is:\n```json\n" + json.dumps(ANSWER, indent=2) + "\n```"
+        assert parse_fused_response(text) == ANSWER
+
+    def test_unparseable_answer_becomes_the_summary(self):
+        from agents.fused import parse_fused_response
+
+        result = parse_fused_response("Just a plain paragraph of news.")
+        assert result == {"summary": "Just a plain paragraph of news.", "tags": "", "headline": ""}
+
+
+class TestFusedNode:
+
+    def test_fills_all_three_fields_with_one_call(self):
+        mock_llm = make_mock_llm(json.dumps(ANSWER))
+        with patch("agents.fused.llm", mock_llm):
+            from agents.fused import fused_node
+            state = {"topic": "TOPIC_SENTINEL", "summary": "", "tags": "", "headline": ""}
+            result = fused_node(state)
+
+        assert result == ANSWER
+        mock_llm.invoke.assert_called_once()
+        assert "TOPIC_SENTINEL" in str(mock_llm.invoke.call_args)
+
+
+class TestModesReportUsage:
+
+    def test_fused_graph_costs_one_call_and_chain_three(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        fused_llm = FakeListChatModel(responses=[json.dumps(ANSWER)])
+        with patch("agents.fused.llm", fused_llm):
+            [fused] = run_batch(build_graph("fused"), ["topic"])
+
+        chain_llm = FakeListChatModel(responses=["some text"])
+        with ExitStack() as stack:
+            for module in ("agents.fetcher", "agents.tagger", "agents.editor"):
+                stack.enter_context(patch(f"{module}.llm", chain_llm))
+            [chained] = run_batch(build_graph("chain"), ["topic"])
+
+        assert fused["headline"] == ANSWER["headline"]
+        assert fused["usage"]["llm_calls"] == 1
+        assert chained["usage"]["llm_calls"] == 3
+        assert fused["usage"]["latency_s"] >= 0
@@ -0,0 +1,192 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_hedge.py  —  Tests for Hedged Requests          ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_hedge.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A call stuck past the recent latency percentile is duplicated,
+     and the faster duplicate's answer is returned
+  2. The async loser is cancelled, and the time it ran still counts
+     toward the latency window
+  3. No hedging until there is enough latency history, and never
+     beyond the extra-request budget
+  4. Under the rate limiter: time queued for quota never triggers a
+     hedge, and the duplicate books its own request
+  5. Per-run usage still reaches the right run through the hedge
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_scripted_llm(delays: list[float]):
+    """A mock client whose n-th call (sync or async) takes delays[n] seconds
+    and answers "call n". Calls past the script answer at once."""
+    lock = threading.Lock()
+    state = {"calls": 0, "cancelled": 0}
+
+    def next_call():
+        with lock:
+            n = state["calls"]
+            state["calls"] += 1
+        return n, delays[n] if n < len(delays) else 0.0
+
+    def invoke(prompt, config=None):
+        n, delay = next_call()
+        time.sleep(delay)
+        return MagicMock(content=f"call {n}", usage_metadata=None)
+
+    async def ainvoke(prompt, config=None):
+        n, delay = next_call()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+        return MagicMock(content=f"call {n}", usage_metadata=None)
+
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    mock_llm.ainvoke.side_effect = ainvoke
+    return mock_llm, state
+
+
+def make_hedged(delays, **options):
+    from clients.hedge import HedgedLLM, HedgePolicy
+
+    inner, state = make_scripted_llm(delays)
+    options = {"percentile": 50, "max_extra": 1.0, "min_samples": 3, "min_delay_s": 0.01,
+               **options}
+    return HedgedLLM(inner, HedgePolicy(**options)), state
+
+
+# Three quick calls to build up history, then one stuck call.
+HISTORY = [0.01, 0.01, 0.01]
+STUCK = 2.0
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestHedgedLLM:
+
+    def test_slow_call_is_hedged_and_the_hedge_wins(self):
+        llm, _ = make_hedged(HISTORY + [STUCK])
+        for _ in HISTORY:
+            llm.invoke("warm-up")
+
+        started = time.perf_counter()
+        answer = llm.invoke("slow one").content
+
+        assert answer == "call 4", "the duplicate (5th call) should answer first"
+        assert time.perf_counter() - started < STUCK / 2
+        stats = llm.policy.stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+    def test_async_loser_is_cancelled(self):
+        llm, state = make_hedged(HISTORY + [STUCK])
+
+        async def run():
+            for _ in HISTORY:
+                await llm.ainvoke("warm-up")
+            return (await llm.ainvoke("slow one")).content
+
+        assert asyncio.run(run()) == "call 4"
+        assert state["cancelled"] == 1
+        assert llm.policy.stats()["hedge_wins"] == 1
+        assert len(llm._latencies) == len(HISTORY) + 2, "the cancelled loser is timed too"
+
+    def test_fast_primary_is_never_duplicated(self):
+        # A floor well above the scripted latency: scheduler jitter mustn't hedge.
+        llm, state = make_hedged([0.01] * 10, min_delay_s=0.2)
+
+        for _ in range(10):
+            llm.invoke("quick")
+
+        assert state["calls"] == 10
+        assert llm.policy.stats()["hedged"] == 0
+
+    def test_no_hedge_without_history(self):
+        llm, state = make_hedged([0.3], min_samples=3)
+
+        assert llm.hedge_delay() is None
+        assert llm.invoke("first ever").content == "call 0"
+        assert state["calls"] == 1
+
+    def test_budget_caps_the_extra_requests(self):
+        llm, state = make_hedged(HISTORY + [0.2], max_extra=0.0)
+        for _ in HISTORY:
+            llm.invoke("warm-up")
+
+        assert llm.invoke("slow one").content == "call 3", "no budget: wait for the original"
+        stats = llm.policy.stats()
+        assert stats["hedged"] == 0 and stats["denied"] == 1
+        assert state["calls"] == 4
+
+    def test_rejects_bad_percentile(self):
+        from clients.hedge import HedgePolicy
+
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=100)
+
+
+class TestUnderTheRateLimiter:
+
+    def test_queueing_for_quota_is_not_hedged(self):
+        from clients.ratelimit import RateLimitedLLM, RateLimiter
+
+        llm, state = make_hedged([0.01] * 8, min_delay_s=0.05)   # still below the 0.1s queueing
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9,
+                              burst_seconds=0.1)                      # 0.1s apart
+        limited = RateLimitedLLM(llm, limiter)
+
+        for _ in range(8):
+            limited.invoke("quick")
+
+        assert limiter.stats()["waited_s"] > 0.5, "the calls should have queued for quota"
+        assert llm.policy.stats()["hedged"] == 0
+        assert state["calls"] == 8
+        assert llm.hedge_delay() < 0.1
+
+    def test_duplicate_books_its_own_request(self):
+        from clients.ratelimit import RateLimitedLLM, RateLimiter
+
+        limiter = RateLimiter(requests_per_minute=60_000, tokens_per_minute=10**9)
+        llm, _ = make_hedged(HISTORY + [STUCK], limiter=limiter)
+        limited = RateLimitedLLM(llm, limiter)
+        for _ in HISTORY:
+            limited.invoke("warm-up")
+
+        assert limited.invoke("slow one").content == "call 4"
+        assert limiter.stats()["calls"] == len(HISTORY) + 2
+
+
+class TestHedgedGraph:
+
+    def test_usage_still_reaches_each_run(self):
+        import config.settings as settings
+        from clients.fake import FakeChatModel
+        from clients.hedge import disable_hedging, enable_hedging
+        from main import build_graph
+        from pipeline.batch import run_batch
+
+        previous = settings.set_llm(FakeChatModel(latency_ms=5))
+        # min_samples=0: every call takes the threaded hedging path.
+        policy = enable_hedging(percentile=99, max_extra=0.0, min_samples=0, min_delay_s=1.0)
+        try:
+            results = run_batch(build_graph(), [f"topic {i}" for i in range(6)], max_concurrency=3)
+        finally:
+            disable_hedging(policy)
+            settings.set_llm(previous)
+
+        assert all(r["error"] is None for r in results)
+        assert [r["usage"]["llm_calls"] for r in results] == [3] * 6
+        assert policy.stats()["calls"] == 18
@@ -0,0 +1,158 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_live.py  —  Tests for Token Streaming           ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_live.py -v
+
+WHAT THESE TESTS CHECK:
+  1. stream_digest() hands over each node's answer token by token,
+     before the node's update (sync and async)
+  2. The first token arrives long before the run ends
+  3. Metrics record time to first token and tokens/s per node
+  4. Runs that don't stream leave those fields empty
+  5. A model that can't stream still ends up in the digest
+  6. --stream is refused for the fused graph, which has nothing to
+     stream
+
+  Everything runs against the offline FakeChatModel — no API key,
+  no network.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+@pytest.fixture
+def fake_llm():
+    import config.settings as settings
+    from clients.fake import FakeChatModel
+
+    fake = FakeChatModel(latency_ms=80, latency_dist="constant", response_words=12)
+    previous = settings.set_llm(fake)
+    yield fake
+    settings.set_llm(previous)
+
+
+TOPIC = "Mars rover finds ice"
+
+
+def collect(events):
+    """(tokens per node, update per node, order of (kind, node) changes)."""
+    tokens, updates, order = {}, {}, []
+    for kind, node, data in events:
+        if kind == "token":
+            tokens[node] = tokens.get(node, "") + data
+        else:
+            updates[node] = data
+        if not order or order[-1] != (kind, node):
+            order.append((kind, node))
+    return tokens, updates, order
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestStreamDigest:
+
+    def test_tokens_arrive_before_each_update(self, fake_llm):
+        from main import build_graph
+        from pipeline.live import stream_digest
+
+        tokens, updates, order = collect(stream_digest(build_graph(), TOPIC))
+
+        assert order == [("token", "fetcher"), ("update", "fetcher"),
+                         ("token", "tagger"), ("update", "tagger"),
+                         ("token", "editor"), ("update", "editor")]
+        assert tokens["tagger"] == updates["tagger"]["tags"]
+        assert tokens["editor"] == updates["editor"]["headline"]
+
+    def test_async_twin_streams_too(self, fake_llm):
+        from main import build_graph
+        from pipeline.live import astream_digest
+
+        async def run():
+            return [event async for event in astream_digest(build_graph(), TOPIC)]
+
+        tokens, updates, _ = collect(asyncio.run(run()))
+
+        assert tokens["editor"] == updates["editor"]["headline"]
+        assert len(tokens) == 3
+
+    def test_first_token_comes_early(self, fake_llm):
+        from main import build_graph
+        from pipeline.live import stream_digest
+
+        started = time.perf_counter()
+        first = None
+        for kind, _, _ in stream_digest(build_graph(), TOPIC):
+            if kind == "token" and first is None:
+                first = time.perf_counter() - started
+        total = time.perf_counter() - started
+
+        assert first < total / 3, "the reader sees text after one node's first token, not three nodes"
+
+    def test_model_that_cannot_stream_still_fills_the_digest(self):
+        from main import build_graph
+        from pipeline.live import stream_digest
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="answer")
+        with patch("agents.fetcher.llm", mock_llm), patch("agents.tagger.llm", mock_llm), \
+                patch("agents.editor.llm", mock_llm):
+            _, updates, _ = collect(stream_digest(build_graph(), TOPIC))
+
+        assert updates["editor"] == {"headline": "answer"}
+
+
+class TestStreamingMetrics:
+
+    def test_ttft_and_tokens_per_second_per_node(self, fake_llm):
+        from main import build_graph
+        from pipeline.live import stream_digest
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        with MetricsRecorder(trace_memory=False, keep_records=True) as metrics:
+            run = metrics.start_run(TOPIC)
+            list(stream_digest(build_graph(hooks=[instrument_node]), TOPIC, [run]))
+            record = metrics.finish_run(run, {"error": None, "usage": {"latency_s": 0.3, **run.totals()}})
+            summary = metrics.summary()
+
+        for name in ("fetcher", "tagger", "editor"):
+            node = record["nodes"][name]
+            assert 0 < node["ttft_s"] < node["llm_s"]
+            assert node["tokens_per_s"] > 0
+        assert 0 < record["first_token_s"] < 0.08
+        assert summary["streamed_runs"] == 1
+        assert summary["nodes"]["editor"]["ttft_s"]["p50"] > 0
+
+    def test_runs_without_streaming_leave_them_empty(self, fake_llm):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        with MetricsRecorder(trace_memory=False, keep_records=True) as metrics:
+            run_batch(build_graph(hooks=[instrument_node]), [TOPIC], metrics=metrics)
+            [record] = metrics.records
+            summary = metrics.summary()
+
+        assert record["first_token_s"] is None
+        assert all(node["ttft_s"] is None for node in record["nodes"].values())
+        assert summary["streamed_runs"] == 0
+        assert "first token" not in metrics.format_summary()
+
+
+class TestStreamFlag:
+
+    def test_fused_mode_is_refused(self, capsys):
+        from main import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(["--stream", "--mode", "fused"])
+        assert "--stream needs --mode chain" in capsys.readouterr().err
+        assert parse_args(["--stream"]).stream
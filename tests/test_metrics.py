@@ -0,0 +1,185 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_metrics.py  —  Tests for Per-Node Metrics       ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_metrics.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Every run writes one JSONL record with a per-node breakdown
+  2. LLM calls are attributed to the node that made them
+  3. The async path is instrumented the same way
+  4. Percentiles and the batch summary, kept in bounded memory
+  5. Headless runs silence the agent banners
+  6. Memory tracing is opt-in; overlapping runs get per-run peaks
+     and never reset the process-wide peak under each other
+"""
+
+import asyncio
+import json
+import tracemalloc
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def patch_all_agents(fake_llm):
+    stack = ExitStack()
+    for module in ("agents.fetcher", "agents.tagger", "agents.editor"):
+        stack.enter_context(patch(f"{module}.llm", fake_llm))
+    return stack
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestMetricsRecorder:
+
+    def test_one_record_per_run_with_every_node(self, tmp_path):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        path = tmp_path / "metrics.jsonl"
+        graph = build_graph(hooks=[instrument_node])
+        with patch_all_agents(FakeListChatModel(responses=["llm text"])):
+            with MetricsRecorder(str(path)) as metrics:
+                run_batch(graph, ["one", "two", "three"], max_concurrency=2, metrics=metrics)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert sorted(r["topic"] for r in records) == ["one", "three", "two"]
+        for record in records:
+            assert record["ok"] is True
+            assert record["llm_calls"] == 3
+            assert set(record["nodes"]) == {"fetcher", "tagger", "editor"}
+            for node in record["nodes"].values():
+                assert node["llm_calls"] == 1
+                assert node["prompt_chars"] > 0
+                assert node["response_chars"] == len("llm text")
+                assert node["wall_s"] >= node["llm_s"] >= 0
+
+    def test_async_runs_are_instrumented_too(self):
+        from main import build_graph
+        from pipeline.aio import arun_batch
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        graph = build_graph(hooks=[instrument_node])
+        with patch_all_agents(FakeListChatModel(responses=["x"])):
+            with MetricsRecorder(keep_records=True) as metrics:
+                asyncio.run(arun_batch(graph, ["a", "b"], metrics=metrics))
+
+        assert len(metrics.records) == 2
+        assert all(set(r["nodes"]) == {"fetcher", "tagger", "editor"} for r in metrics.records)
+
+    def test_summary_reports_percentiles_per_node(self):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        graph = build_graph("fused", hooks=[instrument_node])
+        with patch("agents.fused.llm", FakeListChatModel(responses=["{}"])):
+            with MetricsRecorder() as metrics:
+                run_batch(graph, ["a", "b", "c"], metrics=metrics)
+                summary = metrics.summary()
+                text = metrics.format_summary()
+
+        assert summary["runs"] == 3
+        assert set(summary["latency_s"]) == {"p50", "p95", "p99"}
+        assert set(summary["nodes"]) == {"fused"}
+        assert "p99" in text
+
+
+class TestMemoryTracing:
+
+    def run(self, **options):
+        from main import build_graph
+        from pipeline.batch import run_batch
+        from pipeline.metrics import MetricsRecorder, instrument_node
+
+        graph = build_graph(hooks=[instrument_node])
+        with patch_all_agents(FakeListChatModel(responses=["text"])):
+            with MetricsRecorder(keep_records=True, **options) as metrics:
+                tracing = tracemalloc.is_tracing()
+                run_batch(graph, ["a", "b", "c"], max_concurrency=options.get("concurrency", 1),
+                          metrics=metrics)
+        return tracing, metrics.records
+
+    def test_off_by_default(self):
+        tracing, records = self.run()
+
+        assert not tracing
+        assert all(r["peak_alloc_bytes"] == 0 for r in records)
+
+    def test_sequential_runs_get_per_node_peaks(self):
+        tracing, records = self.run(trace_memory=True)
+
+        assert tracing
+        for record in records:
+            peaks = [node["peak_alloc_bytes"] for node in record["nodes"].values()]
+            assert all(isinstance(peak, int) for peak in peaks)
+            assert record["peak_alloc_bytes"] == max(peaks) > 0
+
+    def test_overlapping_runs_get_per_run_peaks(self):
+        with patch("pipeline.metrics.tracemalloc.reset_peak") as reset_peak:
+            tracing, records = self.run(trace_memory=True, concurrency=3)
+
+        assert tracing
+        reset_peak.assert_not_called()
+        for record in records:
+            assert record["peak_alloc_bytes"] > 0
+            assert all(node["peak_alloc_bytes"] is None for node in record["nodes"].values())
+
+
+class TestPercentile:
+
+    def test_nearest_rank(self):
+        from pipeline.metrics import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) == 0.0
+
+
+class TestBoundedSummary:
+
+    def test_memory_stays_bounded_and_records_are_opt_in(self):
+        import pytest
+
+        from pipeline.metrics import MetricsRecorder
+
+        def record(i):
+            node = {"wall_s": i / 1000, "llm_s": i / 2000, "input_tokens": 1, "output_tokens": 2}
+            return {"ok": i % 10 != 0, "latency_s": i / 1000, "input_tokens": 1,
+                    "output_tokens": 2, "nodes": {"fetcher": node}}
+
+        with MetricsRecorder(trace_memory=False) as metrics:
+            for i in range(1, 20_001):
+                metrics.add_record(record(i))
+            summary = metrics.summary()
+
+            assert len(metrics._latency.values) == metrics._latency.size
+            with pytest.raises(RuntimeError):
+                metrics.records
+
+        assert summary["runs"] == 20_000 and summary["failed"] == 2_000
+        assert summary["tokens"]["output"] == 40_000
+        assert abs(summary["latency_s"]["p50"] - 10.0) < 1.0, "a fair sample, not the first runs"
+        assert summary["nodes"]["fetcher"]["input_tokens"] == 20_000
+
+
+class TestHeadlessBanners:
+
+    def test_announce_is_silent_when_not_verbose(self, capsys):
+        import config.settings as settings
+
+        with patch.object(settings, "VERBOSE", False):
+            settings.announce("BANNER")
+        assert capsys.readouterr().out == ""
+
+        settings.announce("BANNER")
+        assert "BANNER" in capsys.readouterr().out
@@ -0,0 +1,325 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_ratelimit.py  —  Tests for the Rate Limiter     ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_ratelimit.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Calls are spaced to the request AND token budgets
+  2. 429 / 5xx answers are retried with backoff; others are not —
+     the status comes from the error's code or type, never its text
+  3. A 429 slows the shared rate down; successes bring it back
+  4. stream() and batch() are paced and retried too
+  5. The limiter wraps every agent's llm once it is enabled
+  6. Calls the response cache answers book no quota and never wait
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from google.genai.errors import ClientError, ServerError
+
+from clients.fake import FakeLLMError
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+class FakeClock:
+    """A clock that only moves when someone sleeps on it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StatusNameError(RuntimeError):
+    """An error that only carries a gRPC-style status name."""
+    status = "RESOURCE_EXHAUSTED"
+
+
+def make_inner(*outcomes):
+    """A client whose invoke/ainvoke return or raise ``outcomes`` in turn."""
+    inner = MagicMock()
+    inner.invoke.side_effect = list(outcomes)
+    inner.ainvoke = AsyncMock(side_effect=list(outcomes))
+    return inner
+
+
+def reply(text="ok", total_tokens=None):
+    usage = None
+    if total_tokens is not None:
+        usage = {"input_tokens": total_tokens // 2, "output_tokens": total_tokens - total_tokens // 2,
+                 "total_tokens": total_tokens}
+    return AIMessage(content=text, usage_metadata=usage)
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestRateLimiter:
+
+    def test_requests_are_spaced_to_the_request_budget(self):
+        from clients.ratelimit import RateLimiter
+
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10**9, clock=clock)
+        waits = [limiter.reserve(1) for _ in range(4)]
+
+        # One request of burst, then one per second, queued in arrival order.
+        assert waits == pytest.approx([0.0, 1.0, 2.0, 3.0]), f"waits were {waits}"
+
+    def test_token_budget_limits_large_prompts(self):
+        from clients.ratelimit import RateLimiter
+
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=6000, clock=clock)
+        limiter.reserve(100)            # the whole 1s burst (100 tokens/s)
+        wait = limiter.reserve(300)
+
+        assert wait == pytest.approx(3.0), "300 tokens at 100 tokens/s should wait 3s"
+
+    def test_settle_refunds_an_overestimate(self):
+        from clients.ratelimit import RateLimiter
+
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=6000, clock=clock)
+        limiter.reserve(100)            # reserves the whole burst…
+        limiter.settle(estimated=100, actual=40)
+
+        assert limiter.reserve(60) == pytest.approx(0.0), "…but 60 unused tokens come back"
+
+    def test_throttle_halves_the_rate_and_success_recovers_it(self):
+        from clients.ratelimit import RateLimiter
+
+        limiter = RateLimiter(requests_per_minute=60, clock=FakeClock(), increase=0.25)
+        limiter.on_throttled()
+        assert limiter.stats()["requests_per_minute"] == pytest.approx(30)
+
+        limiter.on_success()
+        limiter.on_success()
+        assert limiter.stats()["rate_fraction"] == pytest.approx(1.0)
+
+    def test_rejects_non_positive_budgets(self):
+        from clients.ratelimit import RateLimiter
+
+        with pytest.raises(ValueError):
+            RateLimiter(requests_per_minute=0)
+
+
+class TestStatusOf:
+
+    @pytest.mark.parametrize("exc, status", [
+        (FakeLLMError("slow down", code=429), 429),
+        (ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}), 429),
+        (ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}}), 503),
+        (StatusNameError("quota"), 429),
+        (ValueError("bad prompt"), None),
+        (RuntimeError("processed 503 items, RESOURCE_EXHAUSTED none"), None),
+    ])
+    def test_reads_code_or_type(self, exc, status):
+        from clients.ratelimit import status_of
+
+        assert status_of(exc) == status
+
+    def test_follows_the_cause_chain(self):
+        from clients.ratelimit import status_of
+
+        try:
+            try:
+                raise FakeLLMError("quota", code=429)
+            except FakeLLMError as inner:
+                raise RuntimeError("wrapped") from inner
+        except RuntimeError as outer:
+            assert status_of(outer) == 429
+
+    def test_reads_the_provider_error_behind_langchains(self):
+        from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
+        from clients.ratelimit import status_of
+
+        try:
+            try:
+                raise ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+            except ServerError as inner:
+                raise ChatGoogleGenerativeAIError("Error calling model") from inner
+        except ChatGoogleGenerativeAIError as outer:
+            assert status_of(outer) == 503
+
+
+class TestRateLimitedLLM:
+
+    def make_llm(self, inner, **options):
+        from clients.ratelimit import RateLimitedLLM, RateLimiter
+
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, clock=clock)
+        return RateLimitedLLM(inner, limiter, sleep=clock.sleep, **options), limiter, clock
+
+    def test_retries_429_then_succeeds(self):
+        inner = make_inner(FakeLLMError("quota", code=429), FakeLLMError("quota", code=429), reply())
+        llm, limiter, clock = self.make_llm(inner, base_delay=1.0)
+
+        assert llm.invoke("prompt").content == "ok"
+        assert inner.invoke.call_count == 3
+        stats = limiter.stats()
+        assert stats["throttled"] == 2 and stats["retries"] == 2
+        assert stats["rate_fraction"] < 1.0, "429s should slow the shared rate down"
+
+    def test_retries_5xx_without_slowing_down(self):
+        inner = make_inner(FakeLLMError("unavailable", code=503), reply())
+        llm, limiter, _ = self.make_llm(inner)
+
+        llm.invoke("prompt")
+        assert limiter.stats()["throttled"] == 0
+        assert limiter.stats()["retries"] == 1
+
+    def test_does_not_retry_client_errors(self):
+        inner = make_inner(FakeLLMError("bad request", code=400), reply())
+        llm, _, _ = self.make_llm(inner)
+
+        with pytest.raises(FakeLLMError):
+            llm.invoke("prompt")
+        assert inner.invoke.call_count == 1
+
+    def test_gives_up_after_max_retries(self):
+        errors = [FakeLLMError("quota", code=429) for _ in range(3)]
+        inner = make_inner(*errors)
+        llm, _, _ = self.make_llm(inner, max_retries=2)
+
+        with pytest.raises(FakeLLMError):
+            llm.invoke("prompt")
+        assert inner.invoke.call_count == 3
+
+    def test_backoff_is_jittered_and_capped(self):
+        llm, _, _ = self.make_llm(MagicMock(), base_delay=1.0, max_delay=5.0)
+
+        delays = [llm.backoff(10) for _ in range(200)]
+        assert max(delays) <= 5.0
+        assert len(set(delays)) > 100, "full jitter should spread retries out"
+
+    def test_async_path_retries_too(self):
+        inner = make_inner(FakeLLMError("quota", code=429), reply())
+        llm, limiter, _ = self.make_llm(inner, base_delay=0.001)
+
+        assert asyncio.run(llm.ainvoke("prompt")).content == "ok"
+        assert inner.ainvoke.await_count == 2
+
+    def test_cache_hits_book_nothing(self):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from clients.cache import TieredLLMCache
+
+        cache = TieredLLMCache(path=None)
+        inner = FakeListChatModel(responses=["answer", "other"], cache=cache)
+        llm, limiter, clock = self.make_llm(inner)
+
+        answers = [llm.invoke("same prompt").content for _ in range(4)]
+        answers.append(asyncio.run(llm.ainvoke("same prompt")).content)
+        llm.batch(["same prompt"] * 3)
+
+        assert set(answers) == {"answer"}
+        assert limiter.stats()["calls"] == 1, "only the miss reaches the provider"
+        assert cache.stats()["memory_hits"] == 7 and cache.stats()["misses"] == 1
+
+    def test_passes_other_attributes_through(self):
+        inner = MagicMock()
+        inner.model = "gemini-2.5-flash"
+        llm, _, _ = self.make_llm(inner)
+
+        assert llm.model == "gemini-2.5-flash"
+
+
+class TestStreamsAndBatches:
+
+    def make_llm(self, inner):
+        from clients.ratelimit import RateLimitedLLM, RateLimiter
+
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, clock=clock)
+        return RateLimitedLLM(inner, limiter, sleep=clock.sleep, base_delay=0.001), limiter, clock
+
+    def test_stream_is_retried_before_its_first_chunk(self):
+        from langchain_core.messages import AIMessageChunk
+
+        def stream(prompt, config=None):
+            if inner.stream.call_count == 1:
+                raise FakeLLMError("quota", code=429)
+            yield AIMessageChunk(content="a")
+            yield AIMessageChunk(content="b", usage_metadata={
+                "input_tokens": 5, "output_tokens": 5, "total_tokens": 10})
+
+        inner = MagicMock()
+        inner.stream.side_effect = stream
+        llm, limiter, _ = self.make_llm(inner)
+
+        assert "".join(c.content for c in llm.stream("prompt")) == "ab"
+        assert inner.stream.call_count == 2
+        assert limiter.stats()["calls"] == 2 and limiter.stats()["throttled"] == 1
+
+    def test_astream_is_paced(self):
+        from langchain_core.messages import AIMessageChunk
+
+        async def astream(prompt, config=None):
+            yield AIMessageChunk(content="x")
+
+        inner = MagicMock()
+        inner.astream.side_effect = astream
+        llm, limiter, _ = self.make_llm(inner)
+
+        async def collect():
+            return [c.content async for c in llm.astream("prompt")]
+
+        assert asyncio.run(collect()) == ["x"]
+        assert limiter.stats()["calls"] == 1
+
+    def test_batch_books_every_prompt(self):
+        inner = make_inner(reply("1"), FakeLLMError("quota", code=429), reply("2"), reply("3"))
+        llm, limiter, _ = self.make_llm(inner)
+
+        answers = llm.batch(["a", "b", "c"], {"max_concurrency": 1})
+
+        assert [a.content for a in answers] == ["1", "2", "3"]
+        assert limiter.stats()["calls"] == 4 and limiter.stats()["retries"] == 1
+
+    def test_abatch_returns_exceptions_when_asked(self):
+        inner = make_inner(reply("1"), FakeLLMError("bad request", code=400))
+        llm, limiter, _ = self.make_llm(inner)
+
+        answers = asyncio.run(llm.abatch(["a", "b"], {"max_concurrency": 1},
+                                         return_exceptions=True))
+
+        assert answers[0].content == "1" and isinstance(answers[1], FakeLLMError)
+        assert limiter.stats()["calls"] == 2
+
+
+class TestEnableRateLimit:
+
+    def test_every_agent_goes_through_one_limiter(self):
+        import agents.editor
+        import agents.fetcher
+        import config.settings as settings
+        from clients.ratelimit import RateLimitedLLM, disable_rate_limit, enable_rate_limit
+
+        fake = MagicMock()
+        fake.invoke.return_value = reply(total_tokens=10)
+        previous = settings.set_llm(fake)
+        limiter = enable_rate_limit(requests_per_minute=6000, tokens_per_minute=10**9)
+        try:
+            assert isinstance(settings.get_llm(), RateLimitedLLM)
+            agents.fetcher.llm.invoke("a")
+            agents.editor.llm.invoke("b")
+            assert limiter.stats()["calls"] == 2
+        finally:
+            disable_rate_limit(limiter)
+            settings.set_llm(previous)
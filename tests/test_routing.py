@@ -0,0 +1,191 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_routing.py  —  Tests for Per-Node Models        ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_routing.py -v
+
+WHAT THESE TESTS CHECK:
+  1. A node listed in NODE_MODELS gets its own client — with no
+     change to the agents or the graph
+  2. Nodes without an entry keep the shared client
+  3. set_llm() without a node still replaces every node's client
+  4. The latency router switches to the fallback while the primary's
+     p95 is too high, and probes the primary to notice recovery —
+     for streamed and batched calls too
+  5. --node-model only takes the nodes of the selected mode
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_mock_llm(return_text: str):
+    mock_response = MagicMock()
+    mock_response.content = return_text
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value = mock_response
+    mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+    return mock_llm
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """config.settings with a clean client table, restored afterwards."""
+    import config.settings as settings
+
+    previous = settings.set_llm(None)
+    monkeypatch.setattr(settings, "NODE_MODELS", {})
+    yield settings
+    settings.set_llm(previous)
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestPerNodeClients:
+
+    def test_node_models_entry_builds_its_own_client(self, settings, monkeypatch):
+        built = {}
+
+        def fake_build(**profile):
+            built[profile["model"]] = make_mock_llm(f"from {profile['model']}")
+            return built[profile["model"]]
+
+        monkeypatch.setattr(settings, "_build_client", fake_build)
+        monkeypatch.setattr(settings, "_build_default_client", lambda: make_mock_llm("from shared"))
+        settings.NODE_MODELS["tagger"] = {"model": "small-model", "max_output_tokens": 64}
+
+        from main import build_graph
+        state = build_graph().invoke({"topic": "t", "summary": "", "tags": "", "headline": ""})
+
+        assert state["tags"] == "from small-model"
+        assert state["headline"] == "from shared", "the editor has no entry and keeps the shared client"
+        built["small-model"].invoke.assert_called_once()
+
+    def test_set_llm_for_one_node(self, settings):
+        shared, editor = make_mock_llm("shared"), make_mock_llm("editor only")
+        settings.set_llm(shared)
+        settings.set_llm(editor, node="editor")
+
+        from main import build_graph
+        state = asyncio.run(build_graph().ainvoke({"topic": "t", "summary": "", "tags": "", "headline": ""}))
+
+        assert state["headline"] == "editor only"
+        assert state["tags"] == "shared"
+        editor.ainvoke.assert_awaited_once()
+
+    def test_shared_set_llm_overrides_node_models(self, settings, monkeypatch):
+        monkeypatch.setattr(settings, "_build_client", lambda **_: pytest.fail("must not build"))
+        settings.NODE_MODELS["tagger"] = {"model": "small-model"}
+        fake = make_mock_llm("fake")
+        settings.set_llm(fake)
+
+        assert settings.get_llm("tagger") is fake
+
+    def test_outside_a_graph_llm_is_the_shared_client(self, settings):
+        fake = make_mock_llm("fake")
+        settings.set_llm(fake)
+        settings.set_llm(make_mock_llm("tagger"), node="tagger")
+
+        assert settings.current_node() is None
+        assert settings.llm.invoke("x").content == "fake"
+
+
+class TestNodeModelFlag:
+
+    @pytest.mark.parametrize("argv", [
+        ["--node-model", "taggr=small-model"],
+        ["--mode", "fused", "--node-model", "tagger=small-model"],
+    ])
+    def test_unknown_node_is_refused(self, argv, capsys):
+        from main import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+        assert "--node-model: no node" in capsys.readouterr().err
+
+    def test_nodes_of_the_mode_are_accepted(self):
+        from main import parse_args
+
+        assert parse_args(["--mode", "fused", "--node-model", "fused=small-model"]).node_model \
+            == [("fused", "small-model")]
+
+
+class TestLatencyRouter:
+
+    def make_router(self, primary_delay: float):
+        from clients.routing import LatencyRouter
+
+        primary, fallback = make_mock_llm("primary"), make_mock_llm("fallback")
+        router = LatencyRouter(primary, fallback, p95_threshold_s=0.5, window=10,
+                               min_samples=3, probe_every=4)
+        clock = {"now": 0.0}
+
+        def slow_invoke(*args, **kwargs):
+            clock["now"] += primary_delay
+            return MagicMock(content="primary")
+
+        primary.invoke.side_effect = slow_invoke
+        return router, clock
+
+    def test_fast_primary_keeps_all_traffic(self, monkeypatch):
+        router, clock = self.make_router(primary_delay=0.1)
+        monkeypatch.setattr("clients.routing.time.perf_counter", lambda: clock["now"])
+
+        answers = [router.invoke("p").content for _ in range(10)]
+
+        assert answers == ["primary"] * 10
+        assert router.stats()["to_fallback"] == 0
+
+    def test_slow_primary_fails_over_but_is_probed(self, monkeypatch):
+        router, clock = self.make_router(primary_delay=2.0)
+        monkeypatch.setattr("clients.routing.time.perf_counter", lambda: clock["now"])
+
+        answers = [router.invoke("p").content for _ in range(3 + 8)]
+
+        assert answers[:3] == ["primary"] * 3, "needs min_samples before judging"
+        assert answers[3:].count("fallback") == 6
+        assert answers[3:].count("primary") == 2, "one call in probe_every still tries the primary"
+        assert router.stats()["primary_p95_s"] == pytest.approx(2.0)
+
+    def test_streams_are_routed_and_timed(self, monkeypatch):
+        router, clock = self.make_router(primary_delay=2.0)
+        monkeypatch.setattr("clients.routing.time.perf_counter", lambda: clock["now"])
+
+        def slow_stream(*args, **kwargs):
+            yield MagicMock(content="prim")
+            clock["now"] += 2.0          # the rest of the answer takes its time
+            yield MagicMock(content="ary")
+
+        router.inner.stream.side_effect = slow_stream
+        router.fallback.stream.side_effect = lambda *a, **k: iter([MagicMock(content="fallback")])
+
+        async def astream_fallback(*args, **kwargs):
+            yield MagicMock(content="fallback")
+
+        router.fallback.astream.side_effect = astream_fallback
+
+        async def collect():
+            return "".join([c.content async for c in router.astream("p")])
+
+        answers = ["".join(c.content for c in router.stream("p")) for _ in range(4)]
+        answers.append(asyncio.run(collect()))
+
+        assert answers == ["primary"] * 3 + ["fallback"] * 2
+        assert router.stats()["primary_p95_s"] == pytest.approx(2.0)
+
+    def test_batches_route_every_prompt(self, monkeypatch):
+        router, clock = self.make_router(primary_delay=2.0)
+        monkeypatch.setattr("clients.routing.time.perf_counter", lambda: clock["now"])
+
+        answers = [a.content for a in router.batch(["p"] * 5, {"max_concurrency": 1})]
+        later = asyncio.run(router.abatch(["p"] * 2, {"max_concurrency": 1}))
+
+        assert answers == ["primary"] * 3 + ["fallback"] * 2
+        assert [a.content for a in later] == ["fallback", "primary"], "the probe goes through"
+        assert router.stats() == {"to_primary": 4, "to_fallback": 3, "primary_p95_s": 2.0}
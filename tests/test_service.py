@@ -0,0 +1,256 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_service.py  —  Tests for the Digest Service     ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_service.py -v
+
+WHAT THESE TESTS CHECK:
+  1. POST /digest runs the graph and returns the usual result
+  2. Concurrent requests for the same topic share ONE pipeline run
+  3. A caller hanging up does not cancel the run for the others
+  4. /stats reports queue depth, runs and latency
+  5. Bad requests get 4xx answers, and the connection stays usable
+  6. "deadline_ms" bounds a request and marks a late result degraded,
+     also when it joined somebody else's run — and a caller without a
+     deadline never gets a run's degraded output
+  7. Unreadable requests get 4xx and the connection closes; a crash
+     while answering gets 500 and the connection stays usable
+
+  Everything runs on a real socket against the offline
+  FakeChatModel — no API key, no network.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def loop_time() -> float:
+    return asyncio.get_running_loop().time()
+
+
+@pytest.fixture
+def fake_llm():
+    import config.settings as settings
+    from clients.fake import FakeChatModel
+
+    fake = FakeChatModel(latency_ms=50, latency_dist="constant")
+    previous = settings.set_llm(fake)
+    yield fake
+    settings.set_llm(previous)
+
+
+async def request(port: int, method: str, path: str, payload=None, reader_writer=None):
+    """Send one HTTP/1.1 request and return (status, decoded JSON body)."""
+    reader, writer = reader_writer or await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if reader_writer is None:
+        writer.close()
+    return status, data
+
+
+def serve(test, max_concurrency: int = 4):
+    """Run ``test(service, port)`` against a live service on a free port."""
+    from main import build_graph
+    from pipeline.service import DigestService
+
+    async def main():
+        service = DigestService(build_graph(), max_concurrency)
+        server = await service.start("127.0.0.1", 0)
+        async with server:
+            return await test(service, server.sockets[0].getsockname()[1])
+
+    return asyncio.run(main())
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestDigestEndpoint:
+
+    def test_post_returns_a_digest(self, fake_llm):
+        async def test(service, port):
+            return await request(port, "POST", "/digest", {"topic": "Mars rover finds ice"})
+
+        status, result = serve(test)
+
+        assert status == 200
+        assert result["topic"] == "Mars rover finds ice"
+        assert result["error"] is None
+        assert result["headline"]
+        assert result["usage"]["llm_calls"] == 3
+
+    def test_same_topic_shares_one_run(self, fake_llm):
+        async def test(service, port):
+            answers = await asyncio.gather(
+                *(request(port, "GET", "/digest?topic=Same+topic") for _ in range(5)),
+                request(port, "POST", "/digest", {"topic": "  Same   topic "}),
+                request(port, "POST", "/digest", {"topic": "Other topic"}),
+            )
+            return answers, service.stats()
+
+        answers, stats = serve(test)
+
+        assert all(status == 200 for status, _ in answers)
+        assert len({json.dumps(body) for _, body in answers[:6]}) == 1, "one run, one answer"
+        assert stats["runs"] == 2
+        assert stats["coalesced"] == 5
+        assert stats["requests"] == 7
+
+    def test_hanging_up_does_not_cancel_the_shared_run(self, fake_llm):
+        async def test(service, port):
+            quitter = asyncio.ensure_future(request(port, "GET", "/digest?topic=Shared"))
+            stayer = asyncio.ensure_future(request(port, "GET", "/digest?topic=Shared"))
+            await asyncio.sleep(0.02)
+            quitter.cancel()
+            return await stayer, service.stats()
+
+        (status, result), stats = serve(test)
+
+        assert status == 200 and result["error"] is None
+        assert stats["runs"] == 1
+
+
+class TestStatsAndErrors:
+
+    def test_stats_show_the_queue(self, fake_llm):
+        async def test(service, port):
+            runs = [asyncio.ensure_future(request(port, "GET", f"/digest?topic=t{i}"))
+                    for i in range(4)]
+            await asyncio.sleep(0.03)
+            _, during = await request(port, "GET", "/stats")
+            await asyncio.gather(*runs)
+            _, after = await request(port, "GET", "/stats")
+            return during, after
+
+        during, after = serve(test, max_concurrency=1)
+
+        assert during["running"] == 1
+        assert during["queued"] == 3
+        assert after["queued"] == 0 and after["runs"] == 4
+        assert after["latency_s"]["p95"] >= after["latency_s"]["p50"] > 0
+
+    def test_bad_requests_keep_the_connection(self, fake_llm):
+        async def test(service, port):
+            conn = await asyncio.open_connection("127.0.0.1", port)
+            answers = [
+                await request(port, "POST", "/digest", {"nope": 1}, conn),
+                await request(port, "GET", "/missing", None, conn),
+                await request(port, "DELETE", "/digest", None, conn),
+                await request(port, "GET", "/healthz", None, conn),
+            ]
+            conn[1].close()
+            return [status for status, _ in answers]
+
+        assert serve(test) == [400, 404, 405, 200]
+
+    def test_failed_run_is_a_502(self):
+        import config.settings as settings
+        from clients.fake import FakeChatModel
+
+        previous = settings.set_llm(FakeChatModel(latency_ms=0, error_rate=1.0))
+        try:
+            status, result = serve(lambda service, port: request(port, "GET", "/digest?topic=x"))
+        finally:
+            settings.set_llm(previous)
+
+        assert status == 502
+        assert result["error"].startswith("FakeLLMError")
+
+    def test_deadline_ms_degrades_a_late_run(self, fake_llm):
+        async def test(service, port):
+            late = await request(port, "POST", "/digest", {"topic": "Tight", "deadline_ms": 0})
+            bad = await request(port, "GET", "/digest?topic=x&deadline_ms=soon")
+            return late, bad, service.stats()
+
+        (status, result), (bad_status, _), stats = serve(test)
+
+        assert status == 200
+        assert result["degraded"] == ["fetcher", "tagger", "editor"]
+        assert result["usage"]["llm_calls"] == 0
+        assert bad_status == 400
+        assert stats["degraded"] == 1
+
+    def test_deadline_bounds_a_joined_run(self, fake_llm):
+        """A tight caller joining an unbounded run stops waiting at its own deadline."""
+        async def test(service, port):
+            patient = asyncio.ensure_future(request(port, "GET", "/digest?topic=Shared"))
+            await asyncio.sleep(0.02)
+            started = loop_time()
+            hurried = await request(port, "GET", "/digest?topic=Shared&deadline_ms=40")
+            waited = loop_time() - started
+            return await patient, hurried, waited, service.stats()
+
+        (_, full), (status, hurried), waited, stats = serve(test)
+
+        assert waited < 0.12, f"waited {waited:.2f}s on a 40 ms deadline"
+        assert status == 200
+        assert hurried["degraded"] == ["fetcher", "tagger", "editor"]
+        assert full["error"] is None and not full.get("degraded")
+        assert stats["runs"] == 1
+
+    def test_no_deadline_never_joins_a_bounded_run(self, fake_llm):
+        async def test(service, port):
+            bounded = asyncio.ensure_future(
+                request(port, "GET", "/digest?topic=Shared&deadline_ms=80"))
+            await asyncio.sleep(0.02)
+            patient = await request(port, "GET", "/digest?topic=Shared")
+            return await bounded, patient, service.stats()
+
+        (_, bounded), (status, patient), stats = serve(test)
+
+        assert bounded["degraded"]
+        assert status == 200 and patient["error"] is None
+        assert not patient.get("degraded")
+        assert stats["runs"] == 2 and stats["coalesced"] == 0
+
+    def test_unreadable_requests_are_refused(self, fake_llm):
+        async def send(port, raw: bytes):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(raw)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            rest = await reader.read()          # the service hangs up after a 4xx
+            writer.close()
+            return status, rest.endswith(b"}")
+
+        async def test(service, port):
+            return [
+                await send(port, b"GET /" + b"x" * 70_000 + b" HTTP/1.1\r\n\r\n"),
+                await send(port, b"GET / HTTP/1.1\r\nX-Big: " + b"x" * 70_000 + b"\r\n\r\n"),
+                await send(port, b"POST /digest HTTP/1.1\r\nContent-Length: -5\r\n\r\n"),
+            ]
+
+        assert serve(test) == [(414, True), (431, True), (400, True)]
+
+    def test_crash_while_answering_is_a_500(self, fake_llm, monkeypatch):
+        async def test(service, port):
+            async def broken(topic, deadline_s=None):
+                raise RuntimeError("metrics file vanished")
+
+            monkeypatch.setattr(service, "digest", broken)
+            conn = await asyncio.open_connection("127.0.0.1", port)
+            crashed = await request(port, "GET", "/digest?topic=x", None, conn)
+            healthy = await request(port, "GET", "/healthz", None, conn)
+            conn[1].close()
+            return crashed, healthy
+
+        (status, payload), (health, _) = serve(test)
+
+        assert status == 500 and payload["error"] == "internal error: RuntimeError"
+        assert health == 200
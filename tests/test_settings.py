@@ -0,0 +1,80 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_settings.py  —  Tests for the Lazy LLM Client   ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_settings.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Importing the config, an agent or main pulls in no LLM SDK
+  2. The client is only built when llm is first used
+  3. set_llm() swaps the client behind every agent's llm
+"""
+
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def modules_loaded_after(statement: str, *modules: str) -> dict:
+    """Run ``statement`` in a fresh interpreter; which of ``modules`` got imported?"""
+    check = "; ".join(f"print('{m}' in sys.modules)" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import sys; {statement}; {check}"],
+        capture_output=True, text=True, check=True,
+    )
+    return dict(zip(modules, (line == "True" for line in proc.stdout.split())))
+
+
+@pytest.fixture
+def restore_llm():
+    import config.settings as settings
+
+    previous = settings.set_llm(None)
+    yield settings
+    settings.set_llm(previous)
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestLazyStartup:
+
+    def test_agent_import_does_not_load_the_sdk(self):
+        loaded = modules_loaded_after("import agents.fetcher", "langchain_google_genai", "langchain_core")
+        assert loaded == {"langchain_google_genai": False, "langchain_core": False}
+
+    def test_main_import_does_not_load_langgraph(self):
+        loaded = modules_loaded_after("import main", "langgraph", "langchain_google_genai")
+        assert loaded == {"langgraph": False, "langchain_google_genai": False}
+
+
+class TestLLMAccessor:
+
+    def test_client_is_built_on_first_use(self, restore_llm, monkeypatch):
+        settings = restore_llm
+        built = MagicMock()
+        monkeypatch.setattr(settings, "_build_default_client", lambda: built)
+
+        assert "not built" in repr(settings.llm)
+        settings.llm.invoke("hello")
+
+        built.invoke.assert_called_once_with("hello")
+        assert settings.get_llm() is built
+
+    def test_set_llm_swaps_the_client_for_every_agent(self, restore_llm):
+        settings = restore_llm
+        import agents.editor
+        import agents.fetcher
+
+        fake = MagicMock()
+        assert settings.set_llm(fake) is None
+
+        agents.fetcher.llm.invoke("a")
+        agents.editor.llm.invoke("b")
+        assert [c.args[0] for c in fake.invoke.call_args_list] == ["a", "b"]
+        assert settings.set_llm(None) is fake
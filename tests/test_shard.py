@@ -0,0 +1,113 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_shard.py  —  Tests for the Sharded Runner       ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_shard.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Every topic comes back exactly once from the worker processes,
+     in input order when asked
+  2. The workers' metrics records end up in the parent's recorder
+  3. A second run with the same checkpoint skips every topic
+  4. Chunks shrink towards the end of the input, so workers finish
+     together
+
+  The worker tests start real processes against the offline
+  FakeChatModel, so they take a few seconds.
+"""
+
+import functools
+
+import pytest
+
+from clients.fake import FakeChatModel
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+FAKE_LLM = functools.partial(FakeChatModel, latency_ms=1, response_words=8)
+
+
+def make_setup(**options):
+    from pipeline.shard import WorkerSetup
+
+    return WorkerSetup(llm_factory=FAKE_LLM, **options)
+
+
+def make_topics(count: int) -> list[str]:
+    return [f"shard topic {i}" for i in range(count)]
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestShardBatch:
+
+    def test_every_topic_once_in_order(self):
+        from pipeline.shard import ShardStats, shard_batch
+
+        topics = make_topics(40)
+        stats = ShardStats()
+        results = list(shard_batch(make_setup(), iter(topics), workers=2, max_concurrency=4,
+                                   ordered=True, stats=stats))
+
+        assert [r["topic"] for r in results] == topics
+        assert all(r["error"] is None for r in results)
+        assert all(r["usage"]["llm_calls"] == 3 for r in results)
+        assert stats.summary()["topics"] == 40
+        assert stats.summary()["chunks"] > 1, "the work must be split across chunks"
+
+    def test_metrics_are_merged_in_the_parent(self):
+        from pipeline.metrics import MetricsRecorder
+        from pipeline.shard import shard_batch
+
+        topics = make_topics(12)
+        with MetricsRecorder(trace_memory=False, keep_records=True) as metrics:
+            results = list(shard_batch(make_setup(metrics=True), topics, workers=2,
+                                       max_concurrency=3, metrics=metrics))
+            records = metrics.records
+
+        assert sorted(r["topic"] for r in results) == sorted(topics)
+        assert sorted(r["topic"] for r in records) == sorted(topics)
+        assert set(records[0]["nodes"]) == {"fetcher", "tagger", "editor"}
+
+    def test_checkpoint_resumes_across_workers(self, tmp_path):
+        from pipeline.shard import ShardStats, shard_batch
+
+        setup = make_setup(checkpoint=str(tmp_path / "checkpoints.sqlite"))
+        topics = make_topics(10)
+        first = list(shard_batch(setup, topics, workers=2, max_concurrency=2))
+        stats = ShardStats()
+        second = list(shard_batch(setup, topics, workers=2, max_concurrency=2, stats=stats))
+
+        assert sorted(r["headline"] for r in second) == sorted(r["headline"] for r in first)
+        assert stats.summary()["checkpoint"]["topics_skipped"] == 10
+        assert stats.summary()["checkpoint"]["nodes_saved"] == 0
+
+    def test_rejects_zero_workers(self):
+        from pipeline.shard import shard_batch
+
+        with pytest.raises(ValueError):
+            list(shard_batch(make_setup(), ["t"], workers=0))
+
+
+class TestChunking:
+
+    def test_guided_chunks_shrink_towards_the_end(self):
+        from pipeline.shard import chunk_topics
+
+        sizes = [len(c) for c in chunk_topics(make_topics(1000), workers=4, max_concurrency=4)]
+
+        assert sum(sizes) == 1000
+        assert sizes == sorted(sizes, reverse=True)
+        assert sizes[0] > sizes[-1]
+        assert min(sizes[:-1]) >= 4, "never below one worker's concurrency (but the last)"
+
+    def test_unknown_length_gets_fixed_chunks(self):
+        from pipeline.shard import CHUNK_FACTOR, chunk_topics
+
+        sizes = [len(c) for c in chunk_topics(iter(make_topics(50)), workers=4, max_concurrency=4)]
+
+        assert sizes[:-1] == [4 * CHUNK_FACTOR] * (len(sizes) - 1)
+        assert sum(sizes) == 50
@@ -0,0 +1,230 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  tests/test_stream.py  —  Tests for the Streaming Runner    ║
+╚══════════════════════════════════════════════════════════════╝
+
+HOW TO RUN:
+  From the news_digest/ folder:
+    pytest tests/test_stream.py -v
+
+WHAT THESE TESTS CHECK:
+  1. Results come out in completion order — or input order with ordered=True
+  2. The reader never runs ahead of the workers (backpressure),
+     even on an endless input
+  3. Topic lines can be plain text or {"topic": ...} JSONL; a malformed
+     line is skipped with a warning, and the stream goes on
+  4. The asyncio twin behaves the same
+  5. A failing checkpoint store fails topics or the stream — it never hangs
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+# ─── HELPER ───────────────────────────────────────────────────────────────────
+def make_mock_llm(slow_word: str = "slow", delay: float = 0.2):
+    """A mock llm that echoes the prompt, taking ``delay`` when it contains ``slow_word``."""
+    def answer(prompt):
+        response = MagicMock()
+        response.content = f"echo: {prompt}"
+        return response
+
+    def invoke(prompt):
+        if slow_word in prompt:
+            time.sleep(delay)
+        return answer(prompt)
+
+    async def ainvoke(prompt):
+        if slow_word in prompt:
+            await asyncio.sleep(delay)
+        return answer(prompt)
+
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    mock_llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    return mock_llm
+
+
+def patch_all_agents(mock_llm):
+    stack = ExitStack()
+    for module in ("agents.fetcher", "agents.tagger", "agents.editor"):
+        stack.enter_context(patch(f"{module}.llm", mock_llm))
+    return stack
+
+
+class CountingTopics:
+    """An endless topic feed that counts how far it has been read."""
+
+    def __init__(self):
+        self.pulled = 0
+
+    def __iter__(self):
+        for i in itertools.count():
+            self.pulled += 1
+            yield f"topic {i}"
+
+
+TOPICS = ["slow topic", "quick one", "quick two"]
+
+
+# ─── TESTS ────────────────────────────────────────────────────────────────────
+
+class TestStreamBatch:
+
+    def test_completion_order_by_default(self):
+        """The slow topic must not hold the quick ones back."""
+        from main import app
+        from pipeline.stream import stream_batch
+
+        with patch_all_agents(make_mock_llm()):
+            results = list(stream_batch(app, iter(TOPICS), max_concurrency=3))
+
+        assert [r["topic"] for r in results][-1] == "slow topic"
+        assert sorted(r["topic"] for r in results) == sorted(TOPICS)
+
+    def test_ordered_mode_keeps_input_order(self):
+        from main import app
+        from pipeline.stream import stream_batch
+
+        with patch_all_agents(make_mock_llm()):
+            results = list(stream_batch(app, iter(TOPICS), max_concurrency=3, ordered=True))
+
+        assert [r["topic"] for r in results] == TOPICS
+
+    def test_reader_does_not_run_ahead(self):
+        """With an endless input, only about one window of topics may be read."""
+        from main import app
+        from pipeline.stream import stream_batch
+
+        feed = CountingTopics()
+        with patch_all_agents(make_mock_llm()):
+            stream = stream_batch(app, feed, max_concurrency=2)
+            first = [next(stream) for _ in range(3)]
+            time.sleep(0.05)          # give the reader a chance to misbehave
+            pulled = feed.pulled
+            stream.close()
+
+        assert len(first) == 3
+        assert pulled <= 3 + 2 + 1, f"reader pulled {pulled} topics for 3 results at concurrency 2"
+
+    def test_bad_input_line_is_raised(self):
+        from main import app
+        from pipeline.batch import parse_topic_line
+        from pipeline.stream import stream_batch
+
+        def topics():
+            yield "fine topic"
+            yield parse_topic_line('{"title": "no topic key"}')
+
+        with patch_all_agents(make_mock_llm()), pytest.raises(ValueError):
+            list(stream_batch(app, topics(), max_concurrency=2))
+
+    def test_rejects_zero_concurrency(self):
+        from main import app
+        from pipeline.stream import stream_batch
+
+        with pytest.raises(ValueError):
+            list(stream_batch(app, iter(["t"]), max_concurrency=0))
+
+    def test_broken_checkpoint_store_does_not_hang(self):
+        """A store that can't read fails its topics; one that can't write ends the stream."""
+        import sqlite3
+
+        from main import app
+        from pipeline.stream import stream_batch
+
+        unreadable = MagicMock()
+        unreadable.result.side_effect = sqlite3.OperationalError("disk I/O error")
+        unwritable = MagicMock()
+        unwritable.result.return_value = None
+        unwritable.save_result.side_effect = sqlite3.OperationalError("database is locked")
+
+        with patch_all_agents(make_mock_llm()):
+            results = list(stream_batch(app, iter(TOPICS), max_concurrency=2,
+                                        checkpoint=unreadable))
+            with pytest.raises(sqlite3.OperationalError):
+                list(stream_batch(app, iter(TOPICS), max_concurrency=2, checkpoint=unwritable))
+
+        assert all(r["error"].startswith("OperationalError") for r in results)
+
+
+class TestAstreamBatch:
+
+    def test_completion_and_ordered_modes(self):
+        from main import app
+        from pipeline.stream import astream_batch
+
+        async def collect(ordered):
+            return [r["topic"] async for r in astream_batch(app, iter(TOPICS), 3, ordered=ordered)]
+
+        with patch_all_agents(make_mock_llm()):
+            unordered = asyncio.run(collect(False))
+            ordered = asyncio.run(collect(True))
+
+        assert unordered[-1] == "slow topic"
+        assert ordered == TOPICS
+
+    def test_reader_does_not_run_ahead(self):
+        from main import app
+        from pipeline.stream import astream_batch
+
+        feed = CountingTopics()
+
+        async def take_three():
+            stream = astream_batch(app, feed, max_concurrency=2)
+            first = [await anext(stream) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            await stream.aclose()
+            return first
+
+        with patch_all_agents(make_mock_llm()):
+            first = asyncio.run(take_three())
+
+        assert len(first) == 3
+        assert feed.pulled <= 3 + 2 + 1, f"reader pulled {feed.pulled} topics"
+
+
+class TestTopicLines:
+
+    @pytest.mark.parametrize("line, topic", [
+        ("plain topic\n", "plain topic"),
+        ('{"topic": " json topic ", "id": 7}\n', "json topic"),
+        ("   \n", None),
+        ("# a comment\n", None),
+    ])
+    def test_parse_topic_line(self, line, topic):
+        from pipeline.batch import parse_topic_line
+
+        assert parse_topic_line(line) == topic
+
+    def test_iter_topics_reads_lazily(self, tmp_path):
+        from pipeline.batch import iter_topics
+
+        path = tmp_path / "topics.jsonl"
+        path.write_text('{"topic": "one"}\nplain two\n\n', encoding="utf-8")
+        topics = iter_topics(str(path))
+
+        assert next(topics) == "one"
+        assert list(topics) == ["plain two"]
+
+    def test_malformed_line_does_not_end_the_stream(self, tmp_path, capsys):
+        from main import app
+        from pipeline.batch import iter_topics
+        from pipeline.stream import stream_batch
+
+        path = tmp_path / "topics.jsonl"
+        path.write_text('quick one\n{"topic": "quick two"}\n{"nope": 1}\n{broken\nquick three\n',
+                        encoding="utf-8")
+
+        with patch_all_agents(make_mock_llm()):
+            results = list(stream_batch(app, iter_topics(str(path)), max_concurrency=2))
+
+        assert sorted(r["topic"] for r in results) == ["quick one", "quick three", "quick two"]
+        assert all(r["error"] is None for r in results)
+        warnings = capsys.readouterr().err
+        assert "topics.jsonl:3: skipped" in warnings and "topics.jsonl:4: skipped" in warnings